@@ -0,0 +1,50 @@
+"""Add sensordata table with composite keyset index
+
+Revision ID: 5c1e8a9b3d47
+Revises: 2f0d3934c87b
+Create Date: 2026-10-18 12:04:51.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8a9b3d47'
+down_revision: Union[str, Sequence[str], None] = '2f0d3934c87b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "sensordata",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("data", sa.Float(), nullable=False),
+        sa.Column("sensor_id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["sensor_id"],
+            ["sensor.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Newest-first reads of one sensor are answered straight from the index,
+    # so deep keyset pages cost the same as the first one.
+    op.create_index(
+        "ix_sensordata_sensor_id_created_at",
+        "sensordata",
+        ["sensor_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index("ix_sensordata_sensor_id_created_at", table_name="sensordata")
+    op.drop_table("sensordata")
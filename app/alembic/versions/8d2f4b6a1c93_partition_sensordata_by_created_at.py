@@ -0,0 +1,102 @@
+"""Partition sensordata by created_at
+
+Revision ID: 8d2f4b6a1c93
+Revises: 5c1e8a9b3d47
+Create Date: 2026-10-18 14:27:09.551873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4b6a1c93'
+down_revision: Union[str, Sequence[str], None] = '5c1e8a9b3d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_sensordata_sensor_id_created_at"
+
+
+def _rename_sensordata(new_name: str) -> None:
+    """Moves the table and every schema-wide name it owns out of the way."""
+    op.execute(f"ALTER TABLE sensordata RENAME TO {new_name}")
+    op.execute(f"ALTER SEQUENCE sensordata_id_seq RENAME TO {new_name}_id_seq")
+    op.execute(f"ALTER INDEX {INDEX_NAME} RENAME TO ix_{new_name}_sensor_id_created_at")
+    op.execute(f"ALTER INDEX sensordata_pkey RENAME TO {new_name}_pkey")
+
+
+def _create_sensordata(primary_key: list[str], **kwargs) -> None:
+    op.create_table(
+        "sensordata",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("data", sa.Float(), nullable=False),
+        sa.Column("sensor_id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["sensor_id"],
+            ["sensor.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(*primary_key),
+        **kwargs,
+    )
+
+
+def _copy_rows_from(old_name: str) -> None:
+    op.execute(
+        "INSERT INTO sensordata (id, data, sensor_id, created_at) "
+        f"SELECT id, data, sensor_id, created_at FROM {old_name}"
+    )
+    op.execute(
+        "SELECT setval('sensordata_id_seq', "
+        "COALESCE((SELECT max(id) FROM sensordata), 0) + 1, false)"
+    )
+    op.drop_table(old_name)
+    op.create_index(
+        INDEX_NAME,
+        "sensordata",
+        ["sensor_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    _rename_sensordata("sensordata_unpartitioned")
+    _create_sensordata(
+        ["id", "created_at"], postgresql_partition_by="RANGE (created_at)"
+    )
+
+    # Monthly partitions from the oldest existing row up to the current
+    # month, named like the ones the maintenance task creates. Later
+    # partitions are left to that task; rows outside them go to the default.
+    months = op.get_bind().execute(
+        sa.text(
+            "SELECT month::date, (month + interval '1 month')::date "
+            "FROM generate_series("
+            "  (SELECT date_trunc('month', coalesce(min(created_at), now())) "
+            "   FROM sensordata_unpartitioned), "
+            "  date_trunc('month', now()), "
+            "  interval '1 month'"
+            ") AS month"
+        )
+    ).all()
+    for start, end in months:
+        op.execute(
+            f"CREATE TABLE sensordata_p{start:%Y%m%d} PARTITION OF sensordata "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute("CREATE TABLE sensordata_default PARTITION OF sensordata DEFAULT")
+
+    _copy_rows_from("sensordata_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    _rename_sensordata("sensordata_partitioned")
+    _create_sensordata(["id"])
+    _copy_rows_from("sensordata_partitioned")
@@ -0,0 +1,62 @@
+"""Add sensordata rollup tables
+
+Revision ID: b47e2c1f9a60
+Revises: 8d2f4b6a1c93
+Create Date: 2026-10-18 16:42:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b47e2c1f9a60'
+down_revision: Union[str, Sequence[str], None] = '8d2f4b6a1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_TABLES = ["sensordata_rollup_1m", "sensordata_rollup_1h", "sensordata_rollup_1d"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    for table_name in ROLLUP_TABLES:
+        op.create_table(
+            table_name,
+            sa.Column("sensor_id", sa.UUID(), nullable=False),
+            sa.Column("bucket_start", sa.DateTime(), nullable=False),
+            sa.Column("count", sa.BigInteger(), nullable=False),
+            sa.Column("sum", sa.Float(), nullable=False),
+            sa.Column("min", sa.Float(), nullable=False),
+            sa.Column("max", sa.Float(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["sensor_id"],
+                ["sensor.id"],
+                ondelete="CASCADE",
+            ),
+            sa.PrimaryKeyConstraint("sensor_id", "bucket_start"),
+        )
+
+    op.create_table(
+        "sensordata_rollup_dirty",
+        sa.Column("sensor_id", sa.UUID(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sensor_id", "bucket_start"),
+    )
+
+    # Readings stored before this migration are rolled up on the first refresh
+    op.execute(
+        "INSERT INTO sensordata_rollup_dirty (sensor_id, bucket_start) "
+        "SELECT DISTINCT sensor_id, date_trunc('minute', created_at) FROM sensordata"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_table("sensordata_rollup_dirty")
+    for table_name in reversed(ROLLUP_TABLES):
+        op.drop_table(table_name)
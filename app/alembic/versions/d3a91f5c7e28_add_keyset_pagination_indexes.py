@@ -0,0 +1,35 @@
+"""Add keyset pagination indexes for devices and sensors
+
+Revision ID: d3a91f5c7e28
+Revises: b47e2c1f9a60
+Create Date: 2026-10-18 18:05:12.481930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a91f5c7e28'
+down_revision: Union[str, Sequence[str], None] = 'b47e2c1f9a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_index(
+        "ix_device_user_id_name_id", "device", ["user_id", "name", "id"]
+    )
+    op.create_index(
+        "ix_sensor_device_id_name_id", "sensor", ["device_id", "name", "id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index("ix_sensor_device_id_name_id", table_name="sensor")
+    op.drop_index("ix_device_user_id_name_id", table_name="device")
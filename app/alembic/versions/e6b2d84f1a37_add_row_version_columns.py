@@ -0,0 +1,45 @@
+"""Add row version columns to users, devices and sensors
+
+Revision ID: e6b2d84f1a37
+Revises: d3a91f5c7e28
+Create Date: 2026-10-18 21:40:27.315804
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2d84f1a37'
+down_revision: Union[str, Sequence[str], None] = 'd3a91f5c7e28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("user", "device", "sensor")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.execute(sa.schema.CreateSequence(sa.Sequence("row_version_seq")))
+    # The volatile default gives every existing row its own version
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "version",
+                sa.BigInteger(),
+                server_default=sa.text("nextval('row_version_seq')"),
+                nullable=False,
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    for table in TABLES:
+        op.drop_column(table, "version")
+    op.execute(sa.schema.DropSequence(sa.Sequence("row_version_seq")))
@@ -1,59 +1,139 @@
+import uuid
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, Request
+import redis.asyncio as redis
+from fastapi import Depends, Header, Query, Request
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import ValidationError
-from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.exceptions.server import ErrServiceUnavailable
 from app.api.exceptions.user import ErrNotEnoughPrivileges, ErrUnauthorized, ErrUserNotFound
 from app.core import security
+from app.core.compression import choose_encoding
 from app.core.config import settings
+from app.core.db import EngineRegistry, is_sticky, make_sticky
+from app.core.pagination import PageParams
 from app.models import TokenPayload
 from app.models.domain.user import User
 from app.models.persistence.user import UserTable
 from app.mappers.user import to_domain
+from app.services.user_cache import cache_user, get_cached_user
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
 
-async def get_async_engine(request: Request) -> AsyncEngine:
-    engine = getattr(request.app.state, "db_async_engine", None)
-    if engine is None:
+# Requests with these methods do not write and may be served by the replica
+_READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+async def get_engines(request: Request) -> EngineRegistry:
+    engines = getattr(request.app.state, "db_engines", None)
+    if engines is None:
         raise ErrServiceUnavailable(detail="Database service is unavailable")
-    return engine
+    return engines
+
+
+async def get_redis_client(request: Request) -> redis.Redis | None:
+    return getattr(request.app.state, "redis_client", None)
+
+
+def _client_identity(request: Request) -> str:
+    """The bearer token if any, else the client address."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return authorization
+    return request.client.host if request.client else ""
 
 
 async def get_async_db(
-    engine: AsyncEngine = Depends(get_async_engine),
+    request: Request,
+    engines: EngineRegistry = Depends(get_engines),
+    redis_client: redis.Redis | None = Depends(get_redis_client),
 ) -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSession(engine) as session:
-        yield session
+    """
+    A session on the replica for read-only requests, unless the client
+    committed within POSTGRES_REPLICA_STICKY_SECONDS; on the primary otherwise.
+    A commit on the primary makes the client sticky, so it reads its writes.
+    """
+    client = _client_identity(request)
+    engine = engines.primary
+    info: dict = {}
+    if (
+        engines.replica is not None
+        and request.method in _READ_METHODS
+        and not await is_sticky(redis_client, client)
+    ):
+        engine = engines.replica
+        # For reads that must not lag behind, see primary_engine()
+        info["primary"] = engines.primary
+
+    # Written objects come back through RETURNING and stay loaded after commit
+    async with AsyncSession(engine, expire_on_commit=False, info=info) as session:
+        try:
+            yield session
+        finally:
+            if engines.replica is not None and session.info.get("committed"):
+                await make_sticky(redis_client, client)
+
+
+async def get_page_params(
+    skip: int = 0,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    after: Annotated[
+        str | None, Query(description="next_cursor of the previous page.")
+    ] = None,
+    with_count: Annotated[
+        bool, Query(description="Also return the total row count.")
+    ] = True,
+) -> PageParams:
+    return PageParams(skip=skip, limit=limit, after=after, with_count=with_count)
+
+
+async def get_response_encoding(
+    accept_encoding: Annotated[str | None, Header()] = None,
+) -> str | None:
+    """The content encoding negotiated for a precompressed response body."""
+    return choose_encoding(accept_encoding)
 
 
 AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+IfNoneMatchDep = Annotated[
+    str | None, Header(description="ETag of a cached copy; 304 if it is current.")
+]
+PageParamsDep = Annotated[PageParams, Depends(get_page_params)]
+RedisDep = Annotated[redis.Redis | None, Depends(get_redis_client)]
+ResponseEncodingDep = Annotated[str | None, Depends(get_response_encoding)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-async def get_current_user(session: AsyncSessionDep, token: TokenDep) -> User:
+async def get_current_user(
+    session: AsyncSessionDep, redis_client: RedisDep, token: TokenDep
+) -> User:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
-    except (jwt.InvalidTokenError, ValidationError):
+        user_id = uuid.UUID(token_data.sub)
+    except (jwt.InvalidTokenError, ValidationError, TypeError, ValueError):
         raise ErrUnauthorized(detail="Could not validate credentials")
 
-    user_table = await session.get(UserTable, token_data.sub)
+    user = await get_cached_user(redis_client, user_id)
+    if user is not None:
+        return user
+
+    user_table = await session.get(UserTable, user_id)
     if not user_table:
         raise ErrUserNotFound
 
-    return to_domain(user_table)
+    user = to_domain(user_table)
+    await cache_user(redis_client, user)
+    return user
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
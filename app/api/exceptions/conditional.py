@@ -0,0 +1,8 @@
+from fastapi import HTTPException, status
+
+
+class ErrNotModified(HTTPException):
+    """The client's cached copy, named by If-None-Match, is still current."""
+
+    def __init__(self, etag: str) -> None:
+        super().__init__(status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -22,3 +22,13 @@ class ErrNotDeviceOwner(HTTPException):
 class ErrDeviceNotFound(HTTPException):
     def __init__(self) -> None:
         super().__init__(status.HTTP_404_NOT_FOUND, "Device not found")
+
+
+class ErrDeviceTypeNotFound(HTTPException):
+    def __init__(self, type_ids: list[int] | None = None) -> None:
+        if type_ids:
+            detail = f"Device types {', '.join(map(str, type_ids))} do not exist"
+        else:
+            detail = "Device type not found"
+
+        super().__init__(status.HTTP_400_BAD_REQUEST, detail)
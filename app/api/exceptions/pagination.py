@@ -0,0 +1,6 @@
+from fastapi import HTTPException, status
+
+
+class ErrInvalidCursor(HTTPException):
+    def __init__(self, detail: str = "Invalid pagination cursor") -> None:
+        super().__init__(status.HTTP_400_BAD_REQUEST, detail)
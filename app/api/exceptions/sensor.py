@@ -22,3 +22,23 @@ class ErrNotSensorOwner(HTTPException):
 class ErrSensorNotFound(HTTPException):
     def __init__(self) -> None:
         super().__init__(status.HTTP_404_NOT_FOUND, "Sensor not found")
+
+
+class ErrSensorsNotOnDevice(HTTPException):
+    def __init__(self, sensor_ids: list[str] | None = None) -> None:
+        if sensor_ids:
+            detail = f"Sensors {', '.join(sensor_ids)} do not belong to this device"
+        else:
+            detail = "Some sensors do not belong to this device"
+
+        super().__init__(status.HTTP_400_BAD_REQUEST, detail)
+
+
+class ErrSensorTypeNotFound(HTTPException):
+    def __init__(self, type_ids: list[int] | None = None) -> None:
+        if type_ids:
+            detail = f"Sensor types {', '.join(map(str, type_ids))} do not exist"
+        else:
+            detail = "Sensor type not found"
+
+        super().__init__(status.HTTP_400_BAD_REQUEST, detail)
@@ -0,0 +1,42 @@
+from fastapi import HTTPException, status
+
+
+class ErrUnsupportedImportFormat(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            "Upload a CSV or NDJSON file, or pass the format explicitly",
+        )
+
+
+class ErrInvalidImportFile(HTTPException):
+    def __init__(self, detail: str = "The uploaded file cannot be imported") -> None:
+        super().__init__(status.HTTP_400_BAD_REQUEST, detail)
+
+
+class ErrInvalidTimeRange(HTTPException):
+    def __init__(self, detail: str = "end_time must be after start_time") -> None:
+        super().__init__(status.HTTP_400_BAD_REQUEST, detail)
+
+
+class ErrTooManyBuckets(HTTPException):
+    def __init__(self, limit: int) -> None:
+        super().__init__(
+            status.HTTP_400_BAD_REQUEST,
+            f"The range and resolution would produce more than {limit} buckets",
+        )
+
+
+class ErrTooManySensors(HTTPException):
+    def __init__(self, limit: int) -> None:
+        super().__init__(
+            status.HTTP_400_BAD_REQUEST, f"At most {limit} sensors can be aggregated at once"
+        )
+
+
+class ErrArrowUnavailable(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status.HTTP_406_NOT_ACCEPTABLE,
+            "Arrow responses are not available on this server",
+        )
@@ -7,3 +7,9 @@ class ErrServiceUnavailable(HTTPException):
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=detail,
         )
+
+
+class ErrPasswordHashBusy(ErrServiceUnavailable):
+    def __init__(self):
+        super().__init__(detail="Too many password checks in progress, try again shortly")
+        self.headers = {"Retry-After": "1"}
@@ -22,3 +22,12 @@ class ErrNotEnoughPrivileges(HTTPException):
 class ErrUserNotFound(HTTPException):
     def __init__(self) -> None:
         super().__init__(status.HTTP_404_NOT_FOUND, "User not found")
+
+
+class ErrTooManyLoginAttempts(HTTPException):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            "Too many failed login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import devices, login, sensors, users, utils
+from app.api.routes import devices, login, sensor_data, sensors, users, utils
 
 api_router = APIRouter()
 api_router.include_router(utils.router)
@@ -8,3 +8,4 @@ api_router.include_router(users.router)
 api_router.include_router(login.router)
 api_router.include_router(devices.router)
 api_router.include_router(sensors.router)
+api_router.include_router(sensor_data.router)
@@ -1,11 +1,22 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, status
-
-from app.api.deps import AsyncSessionDep, CurrentUser, get_current_active_superuser
+from fastapi import APIRouter, Depends, Response, status
+
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    IfNoneMatchDep,
+    PageParamsDep,
+    RedisDep,
+    ResponseEncodingDep,
+    get_current_active_superuser,
+)
 from app.schemas.device import (
     DeviceCreate,
     DevicePublic,
+    DevicesBulkUpdate,
+    DevicesProvision,
+    DevicesProvisionedPublic,
     DevicesPublic,
     DeviceTypeCreate,
     DeviceTypePublic,
@@ -17,9 +28,11 @@ from app.services.devices import DeviceService
 router = APIRouter(prefix="/devices", tags=["devices"])
 
 
-async def device_service_dependency(session: AsyncSessionDep) -> DeviceService:
+async def device_service_dependency(
+    session: AsyncSessionDep, redis_client: RedisDep
+) -> DeviceService:
     """Dependency that creates and provides a DeviceService instance, injecting the DB session."""
-    return DeviceService(session=session)
+    return DeviceService(session=session, redis_client=redis_client)
 
 
 DeviceServiceDep = Annotated[DeviceService, Depends(device_service_dependency)]
@@ -27,10 +40,22 @@ DeviceServiceDep = Annotated[DeviceService, Depends(device_service_dependency)]
 
 @router.get("/types", response_model=DeviceTypesPublic)
 async def list_device_types(
-    device_service: DeviceServiceDep, skip: int = 0, limit: int = 100
+    device_service: DeviceServiceDep,
+    params: PageParamsDep,
+    encoding: ResponseEncodingDep,
+    if_none_match: IfNoneMatchDep = None,
 ) -> Any:
-    device_types = await device_service.list_device_types_service(skip, limit)
-    return device_types
+    """
+    Served from the in-memory catalog, as a body precompressed once per page
+    and encoding; 304 when If-None-Match is current.
+    """
+    body, content_encoding, etag = await device_service.list_device_types_service(
+        params, if_none_match, encoding
+    )
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if content_encoding is not None:
+        headers["Content-Encoding"] = content_encoding
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @router.post(
@@ -47,8 +72,18 @@ async def create_device_type(
 
 
 @router.get("/", response_model=DevicesPublic)
-async def list_user_devices(device_service: DeviceServiceDep, user: CurrentUser) -> Any:
-    devices = await device_service.list_user_devices_service(user)
+async def list_user_devices(
+    device_service: DeviceServiceDep,
+    user: CurrentUser,
+    params: PageParamsDep,
+    response: Response,
+    if_none_match: IfNoneMatchDep = None,
+) -> Any:
+    """304 without reading the page when If-None-Match is current."""
+    devices, etag = await device_service.list_user_devices_service(
+        user, params, if_none_match
+    )
+    response.headers["ETag"] = etag
     return devices
 
 
@@ -60,13 +95,46 @@ async def create_user_device(
     return device
 
 
+@router.patch("/", response_model=DevicesPublic)
+async def bulk_update_user_devices(
+    device_service: DeviceServiceDep, user: CurrentUser, devices_in: DevicesBulkUpdate
+) -> Any:
+    """
+    Update several devices in one round trip. Either all listed devices are
+    updated or, if any is missing or not yours, none is.
+    """
+    devices = await device_service.bulk_update_user_devices_service(user, devices_in)
+    return devices
+
+
+@router.post(
+    "/provision",
+    response_model=DevicesProvisionedPublic,
+    status_code=status.HTTP_201_CREATED,
+)
+async def provision_user_devices(
+    device_service: DeviceServiceDep, user: CurrentUser, manifest: DevicesProvision
+) -> Any:
+    """
+    Create many devices, each with its sensors, in one transaction. Nothing
+    is created if any device or sensor type does not exist.
+    """
+    devices = await device_service.provision_user_devices_service(user, manifest)
+    return devices
+
+
 @router.get("/{device_id}", response_model=DevicePublic)
 async def get_device_info(
     device_service: DeviceServiceDep,
     user: CurrentUser,
     device_id: str,
+    response: Response,
+    if_none_match: IfNoneMatchDep = None,
 ) -> Any:
-    device = await device_service.get_device_info_service(user, device_id)
+    device, etag = await device_service.get_device_info_service(
+        user, device_id, if_none_match
+    )
+    response.headers["ETag"] = etag
     return device
 
 
@@ -1,14 +1,13 @@
 from datetime import timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.api.deps import AsyncSessionDep
 from app.api.exceptions.user import ErrUserNotFound
+from app.api.routes.users import UserServiceDep
 from app.core import security
 from app.core.config import settings
-from app.crud import users as user_crud
 from app.models import Token
 
 router = APIRouter(tags=["login"])
@@ -16,13 +15,17 @@ router = APIRouter(tags=["login"])
 
 @router.post("/login/access-token")
 async def login_access_token(
-    session: AsyncSessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+    request: Request,
+    user_service: UserServiceDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
     """
-    OAuth2 compatible token login, get an access token for future requests
+    OAuth2 compatible token login, get an access token for future requests.
+    Repeated failures for an account or from an IP are answered with 429.
     """
-    user = await user_crud.authenticate(
-        session=session, email=form_data.username, password=form_data.password
+    client_ip = request.client.host if request.client else None
+    user = await user_service.authenticate_service(
+        form_data.username, form_data.password, client_ip
     )
     if not user:
         raise ErrUserNotFound
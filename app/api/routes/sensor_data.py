@@ -0,0 +1,318 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Annotated, Any
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import AsyncSessionDep, CurrentUser, RedisDep
+from app.schemas.sensor_data import (
+    DeviceSensorDataBatchCreate,
+    SensorDataAggregate,
+    SensorDataAggregatesPublic,
+    SensorDataBatchCreate,
+    SensorDataBatchPublic,
+    SensorDataBucketsPublic,
+    SensorDataImportPublic,
+    SensorDataPagePublic,
+    SensorLatestReadingsPublic,
+)
+from app.services.sensor_data import SensorDataService
+from app.services.sensor_data_arrow import ARROW_STREAM_MEDIA_TYPE
+from app.services.sensor_data_export import FILE_EXTENSIONS, MEDIA_TYPES, ExportFormat
+from app.services.sensor_data_import import ImportFormat
+
+router = APIRouter(tags=["sensor data"])
+
+
+async def sensor_data_service_dependency(
+    session: AsyncSessionDep, redis_client: RedisDep
+) -> SensorDataService:
+    """Dependency that creates and provides a SensorDataService instance, injecting the DB session and Redis client."""
+    return SensorDataService(session=session, redis_client=redis_client)
+
+
+SensorDataServiceDep = Annotated[
+    SensorDataService, Depends(sensor_data_service_dependency)
+]
+
+
+def _accepts_arrow(accept: str | None) -> bool:
+    """True when the Accept header lists the Arrow stream type with q > 0."""
+    for media_range in (accept or "").split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        if media_type.lower() != ARROW_STREAM_MEDIA_TYPE:
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+@router.get(
+    "/sensors/{sensor_id}/data",
+    response_model=SensorDataPagePublic,
+    responses={
+        200: {
+            "content": {ARROW_STREAM_MEDIA_TYPE: {}},
+            "description": "JSON page, or an Arrow IPC stream with the cursors "
+            "in the X-Next-Cursor and X-Prev-Cursor headers.",
+        },
+        406: {"description": "Arrow was requested but is not available."},
+    },
+)
+async def list_sensor_data(
+    sensor_data_service: SensorDataServiceDep,
+    user: CurrentUser,
+    sensor_id: str,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    reverse: bool = True,
+    skip: int = 0,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    after: str | None = None,
+    before: str | None = None,
+    accept: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Readings of one sensor, newest first unless reverse is false.
+    Follow next_cursor/prev_cursor with 'after'/'before' for constant-cost
+    paging; 'skip' is still supported but gets slower with depth.
+    Send 'Accept: application/vnd.apache.arrow.stream' to get the page as
+    Arrow columns instead of JSON.
+    """
+    if _accepts_arrow(accept):
+        body, next_cursor, prev_cursor = (
+            await sensor_data_service.list_sensor_data_arrow_service(
+                user=user,
+                sensor_id=sensor_id,
+                start_time=start_time,
+                end_time=end_time,
+                reverse=reverse,
+                skip=skip,
+                limit=limit,
+                after=after,
+                before=before,
+            )
+        )
+        headers = {}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        if prev_cursor:
+            headers["X-Prev-Cursor"] = prev_cursor
+        return Response(body, media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+
+    body = await sensor_data_service.list_sensor_data_service(
+        user=user,
+        sensor_id=sensor_id,
+        start_time=start_time,
+        end_time=end_time,
+        reverse=reverse,
+        skip=skip,
+        limit=limit,
+        after=after,
+        before=before,
+    )
+    # Already encoded; response_model only documents the body
+    return Response(body, media_type="application/json")
+
+
+@router.get(
+    "/sensors/{sensor_id}/data/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}
+    },
+)
+async def export_sensor_data(
+    sensor_data_service: SensorDataServiceDep,
+    user: CurrentUser,
+    sensor_id: str,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    file_format: Annotated[ExportFormat | None, Query(alias="format")] = None,
+    accept: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Full history of one sensor as CSV, NDJSON or an Arrow IPC stream, oldest
+    first. Without 'format', Arrow is sent if the Accept header asks for it
+    and CSV otherwise. Rows are streamed from a server-side cursor as they
+    arrive, so the export starts immediately and uses constant memory.
+    The CSV can be imported back.
+    """
+    if file_format is None:
+        file_format = "arrow" if _accepts_arrow(accept) else "csv"
+    chunks = await sensor_data_service.export_sensor_data_service(
+        user=user,
+        sensor_id=sensor_id,
+        file_format=file_format,
+        start_time=start_time,
+        end_time=end_time,
+    )
+    filename = f"sensor-{sensor_id}.{FILE_EXTENSIONS[file_format]}"
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/sensors/{sensor_id}/data/rollup", response_model=SensorDataBucketsPublic)
+async def list_sensor_data_rollup(
+    sensor_data_service: SensorDataServiceDep,
+    user: CurrentUser,
+    sensor_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    resolution: timedelta,
+) -> Any:
+    """
+    Count, min, max, avg and sum of the readings per bucket of the given
+    resolution (seconds or ISO 8601 duration), served from precomputed
+    1-minute, 1-hour or 1-day rollups whenever the range allows it.
+    """
+    buckets = await sensor_data_service.list_sensor_data_buckets_service(
+        user=user,
+        sensor_id=sensor_id,
+        start_time=start_time,
+        end_time=end_time,
+        resolution=resolution,
+    )
+    return buckets
+
+
+@router.get("/sensors/data/latest", response_model=SensorLatestReadingsPublic)
+async def list_latest_readings(
+    sensor_data_service: SensorDataServiceDep, user: CurrentUser
+) -> Any:
+    """Current value of every sensor on the current user's devices."""
+    readings = await sensor_data_service.list_latest_readings_service(user=user)
+    return readings
+
+
+@router.get(
+    "/devices/{device_id}/data/latest", response_model=SensorLatestReadingsPublic
+)
+async def list_device_latest_readings(
+    sensor_data_service: SensorDataServiceDep, user: CurrentUser, device_id: str
+) -> Any:
+    """Current value of every sensor of one device."""
+    readings = await sensor_data_service.list_device_latest_readings_service(
+        user=user, device_id=device_id
+    )
+    return readings
+
+
+@router.get(
+    "/sensors/data/aggregate",
+    response_model=SensorDataAggregatesPublic,
+    # Only the requested aggregates are returned
+    response_model_exclude_unset=True,
+)
+async def aggregate_sensor_data(
+    sensor_data_service: SensorDataServiceDep,
+    user: CurrentUser,
+    sensor_id: Annotated[list[uuid.UUID], Query(min_length=1)],
+    start_time: datetime,
+    end_time: datetime,
+    bucket: Annotated[
+        timedelta, Query(description="Bucket width in seconds or as an ISO 8601 duration.")
+    ],
+    aggregate: Annotated[list[SensorDataAggregate], Query()] = ["avg"],
+) -> Any:
+    """
+    Aggregates of one or more sensors' readings per time bucket, computed
+    in the database. Repeat 'sensor_id' and 'aggregate' to request several.
+    Buckets are aligned to start_time; empty buckets are omitted.
+    """
+    body = await sensor_data_service.aggregate_sensor_data_service(
+        user=user,
+        sensor_ids=sensor_id,
+        start_time=start_time,
+        end_time=end_time,
+        bucket_width=bucket,
+        aggregates=aggregate,
+    )
+    return Response(body, media_type="application/json")
+
+
+@router.post(
+    "/sensors/{sensor_id}/data",
+    response_model=SensorDataBatchPublic,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_sensor_data_batch(
+    sensor_data_service: SensorDataServiceDep,
+    user: CurrentUser,
+    response: Response,
+    sensor_id: str,
+    batch_in: SensorDataBatchCreate,
+) -> Any:
+    """
+    Store a batch of readings of one sensor in a single INSERT.
+    Responds with 202 when the readings were queued instead.
+    """
+    result = await sensor_data_service.create_sensor_data_batch_service(
+        user=user, sensor_id=sensor_id, batch_in=batch_in
+    )
+    if result.queued:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
+
+
+@router.post(
+    "/devices/{device_id}/data",
+    response_model=SensorDataBatchPublic,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_device_sensor_data_batch(
+    sensor_data_service: SensorDataServiceDep,
+    user: CurrentUser,
+    response: Response,
+    device_id: str,
+    batch_in: DeviceSensorDataBatchCreate,
+) -> Any:
+    """
+    Store a batch of readings of any sensors of one device in a single INSERT.
+    Responds with 202 when the readings were queued instead.
+    """
+    result = await sensor_data_service.create_device_sensor_data_batch_service(
+        user=user, device_id=device_id, batch_in=batch_in
+    )
+    if result.queued:
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
+
+
+@router.post(
+    "/sensors/data/import",
+    response_model=SensorDataImportPublic,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_sensor_data(
+    sensor_data_service: SensorDataServiceDep,
+    user: CurrentUser,
+    file: UploadFile,
+    file_format: Annotated[ImportFormat | None, Query(alias="format")] = None,
+) -> Any:
+    """
+    Bulk load historical readings from a CSV or NDJSON file with
+    sensor_id, data and optional created_at columns.
+    """
+    report = await sensor_data_service.import_sensor_data_service(
+        user=user, file=file, file_format=file_format
+    )
+    return report
@@ -1,11 +1,20 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, status
-
-from app.api.deps import AsyncSessionDep, CurrentUser, get_current_active_superuser
+from fastapi import APIRouter, Depends, Response, status
+
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    IfNoneMatchDep,
+    PageParamsDep,
+    RedisDep,
+    ResponseEncodingDep,
+    get_current_active_superuser,
+)
 from app.schemas.sensor import (
     SensorCreate,
     SensorPublic,
+    SensorsBulkUpdate,
     SensorsPublic,
     SensorTypeCreate,
     SensorTypePublic,
@@ -18,10 +27,10 @@ router = APIRouter(prefix="/sensors", tags=["sensors"])
 
 
 async def sensor_service_dependency(
-    session: AsyncSessionDep,
+    session: AsyncSessionDep, redis_client: RedisDep
 ) -> SensorService:
     """Dependency that creates and provides a SensorService instance, injecting the DB session."""
-    return SensorService(session=session)
+    return SensorService(session=session, redis_client=redis_client)
 
 
 SensorServiceDep = Annotated[SensorService, Depends(sensor_service_dependency)]
@@ -29,10 +38,22 @@ SensorServiceDep = Annotated[SensorService, Depends(sensor_service_dependency)]
 
 @router.get("/types", response_model=SensorTypesPublic)
 async def list_sensor_types(
-    sensor_service: SensorServiceDep, skip: int = 0, limit: int = 100
+    sensor_service: SensorServiceDep,
+    params: PageParamsDep,
+    encoding: ResponseEncodingDep,
+    if_none_match: IfNoneMatchDep = None,
 ) -> Any:
-    sensors = await sensor_service.list_sensor_types_service(skip=skip, limit=limit)
-    return sensors
+    """
+    Served from the in-memory catalog, as a body precompressed once per page
+    and encoding; 304 when If-None-Match is current.
+    """
+    body, content_encoding, etag = await sensor_service.list_sensor_types_service(
+        params=params, if_none_match=if_none_match, encoding=encoding
+    )
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if content_encoding is not None:
+        headers["Content-Encoding"] = content_encoding
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @router.post(
@@ -49,8 +70,18 @@ async def create_sensor_type(
 
 
 @router.get("/", response_model=SensorsPublic)
-async def list_user_sensors(sensor_service: SensorServiceDep, user: CurrentUser) -> Any:
-    sensors = await sensor_service.list_user_sensors_service(user=user)
+async def list_user_sensors(
+    sensor_service: SensorServiceDep,
+    user: CurrentUser,
+    params: PageParamsDep,
+    response: Response,
+    if_none_match: IfNoneMatchDep = None,
+) -> Any:
+    """304 without reading the page when If-None-Match is current."""
+    sensors, etag = await sensor_service.list_user_sensors_service(
+        user=user, params=params, if_none_match=if_none_match
+    )
+    response.headers["ETag"] = etag
     return sensors
 
 
@@ -62,13 +93,30 @@ async def create_user_sensor(
     return sensor
 
 
+@router.patch("/", response_model=SensorsPublic)
+async def bulk_update_user_sensors(
+    sensor_service: SensorServiceDep, user: CurrentUser, sensors_in: SensorsBulkUpdate
+) -> Any:
+    """
+    Update several sensors in one round trip. Either all listed sensors are
+    updated or, if any is missing or not on your devices, none is.
+    """
+    sensors = await sensor_service.bulk_update_user_sensors_service(user, sensors_in)
+    return sensors
+
+
 @router.get("/{sensor_id}", response_model=SensorPublic)
 async def get_sensor_info(
     sensor_service: SensorServiceDep,
     user: CurrentUser,
     sensor_id: str,
+    response: Response,
+    if_none_match: IfNoneMatchDep = None,
 ) -> Any:
-    sensor = await sensor_service.get_sensor_info_service(user=user, sensor_id=sensor_id)
+    sensor, etag = await sensor_service.get_sensor_info_service(
+        user=user, sensor_id=sensor_id, if_none_match=if_none_match
+    )
+    response.headers["ETag"] = etag
     return sensor
 
 
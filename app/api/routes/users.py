@@ -1,8 +1,16 @@
+import uuid
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 
-from app.api.deps import AsyncSessionDep, CurrentUser, get_current_active_superuser
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    IfNoneMatchDep,
+    PageParamsDep,
+    RedisDep,
+    get_current_active_superuser,
+)
 from app.api.exceptions.user import ErrUserExists
 from app.schemas.user import UserCreate, UserPublic, UserRegister, UsersPublic, UserUpdate
 from app.services.user import UserService
@@ -10,9 +18,11 @@ from app.services.user import UserService
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-async def user_service_dependency(session: AsyncSessionDep) -> UserService:
-    """Dependency that creates and provides a UserService instance, injecting the DB session."""
-    return UserService(session=session)
+async def user_service_dependency(
+    session: AsyncSessionDep, redis_client: RedisDep
+) -> UserService:
+    """Dependency that creates and provides a UserService instance, injecting the DB session and Redis client."""
+    return UserService(session=session, redis_client=redis_client)
 
 
 UserServiceDep = Annotated[UserService, Depends(user_service_dependency)]
@@ -24,13 +34,17 @@ UserServiceDep = Annotated[UserService, Depends(user_service_dependency)]
     response_model=UsersPublic,
 )
 async def list_users(
-    user_service: UserServiceDep, skip: int = 0, limit: int = 100
+    user_service: UserServiceDep,
+    params: PageParamsDep,
+    response: Response,
+    if_none_match: IfNoneMatchDep = None,
 ) -> Any:
     """
-    Retrieve users. Requires superuser privileges.
+    Retrieve users ordered by email. Requires superuser privileges.
     """
 
-    users = await user_service.list_users_service(skip, limit)
+    users, etag = await user_service.list_users_service(params, if_none_match)
+    response.headers["ETag"] = etag
     return users
 
 
@@ -49,11 +63,18 @@ async def create_user(user_service: UserServiceDep, user_in: UserCreate) -> Any:
 
 
 @router.get("/me/", response_model=UserPublic)
-async def read_user_me(user_service: UserServiceDep, user: CurrentUser) -> Any:
+async def read_user_me(
+    user_service: UserServiceDep,
+    user: CurrentUser,
+    response: Response,
+    if_none_match: IfNoneMatchDep = None,
+) -> Any:
     """
     Get current user.
     """
-    return await user_service.read_user_me_service(user)
+    user_public, etag = await user_service.read_user_me_service(user, if_none_match)
+    response.headers["ETag"] = etag
+    return user_public
 
 
 @router.patch("/me/", response_model=UserPublic)
@@ -66,6 +87,15 @@ async def update_user_me(
     return await user_service.update_user_me_service(user=user, user_in=user_update)
 
 
+@router.delete("/me/")
+async def delete_user_me(user_service: UserServiceDep, user: CurrentUser) -> dict:
+    """
+    Delete own user together with its devices, sensors and readings.
+    """
+    await user_service.delete_user_me_service(user)
+    return {"ok": True}
+
+
 @router.post("/signup", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
 async def register_user(user_service: UserServiceDep, user_in: UserRegister) -> Any:
     """
@@ -73,3 +103,12 @@ async def register_user(user_service: UserServiceDep, user_in: UserRegister) ->
     """
     user = await user_service.register_user_service(user_in=user_in)
     return user
+
+
+@router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
+async def delete_user(user_service: UserServiceDep, user_id: uuid.UUID) -> dict:
+    """
+    Delete a user. Requires superuser privileges.
+    """
+    await user_service.delete_user_service(user_id)
+    return {"ok": True}
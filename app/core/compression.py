@@ -0,0 +1,218 @@
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional, installed with the "compression" extra
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional, installed with the "compression" extra
+    zstandard = None
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Everything compressed so far, with the stream left open."""
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipEncoder:
+    def __init__(self) -> None:
+        self._obj = zlib.compressobj(
+            settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self) -> None:
+        self._obj = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self) -> None:
+        compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL)
+        self._obj = compressor.compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def _available_encoders() -> dict[str, Callable[[], Encoder]]:
+    # In order of preference when the client weighs them equally
+    encoders: dict[str, Callable[[], Encoder]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = _ZstdEncoder
+    if brotli is not None:
+        encoders["br"] = _BrotliEncoder
+    encoders["gzip"] = _GzipEncoder
+    return encoders
+
+
+ENCODERS = _available_encoders()
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """The encoding to use for a request's Accept-Encoding, None for identity."""
+    if not accept_encoding:
+        return None
+
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.lower()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    accepted = [name for name in ENCODERS if weights.get(name, wildcard) > 0]
+    if not accepted:
+        return None
+    # max() keeps the first of equal weights, the server's preference
+    return max(accepted, key=lambda name: weights.get(name, wildcard))
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(data) + encoder.finish()
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if vary is None:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower() and vary.strip() != "*":
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+def _compressible(status: int, headers: Headers) -> bool:
+    if status < 200 or status in (204, 206, 304) or "content-encoding" in headers:
+        return False
+    media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return media_type in settings.COMPRESSION_MEDIA_TYPES
+
+
+class _CompressingSend:
+    """
+    Wraps send for one response. The start message is held back until the
+    first body message shows whether the body is complete: a complete body
+    under COMPRESSION_MIN_SIZE goes out as is, a larger one is compressed in
+    one piece with its Content-Length, and a streamed one is compressed chunk
+    by chunk, each flushed so the client receives it without delay.
+    """
+
+    def __init__(self, send: Send, encoding: str | None) -> None:
+        self._send = send
+        self._encoding = encoding
+        self._start: Message | None = None
+        self._encoder: Encoder | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if _compressible(message["status"], Headers(raw=message["headers"])):
+                _add_vary(MutableHeaders(scope=message))
+                if self._encoding is not None:
+                    self._start = message
+                    return
+            await self._send(message)
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._start is not None:
+            start, self._start = self._start, None
+            if not more_body and len(body) < settings.COMPRESSION_MIN_SIZE:
+                await self._send(start)
+                await self._send(message)
+                return
+            self._encoder = ENCODERS[self._encoding]()  # type: ignore[index]
+            headers = MutableHeaders(scope=start)
+            headers["Content-Encoding"] = self._encoding  # type: ignore[assignment]
+            body = self._encode(body, more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self._send(start)
+        elif self._encoder is not None:
+            body = self._encode(body, more_body)
+        else:
+            await self._send(message)
+            return
+
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _encode(self, body: bytes, more_body: bool) -> bytes:
+        data = self._encoder.compress(body)  # type: ignore[union-attr]
+        return data + (self._encoder.flush() if more_body else self._encoder.finish())  # type: ignore[union-attr]
+
+
+class CompressionMiddleware:
+    """
+    Negotiated zstd, br or gzip compression of COMPRESSION_MEDIA_TYPES
+    responses, streaming ones included. Responses that already carry a
+    Content-Encoding, such as precompressed catalog pages, pass through.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = None
+        if scope["method"] != "HEAD":
+            encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        await self.app(scope, receive, _CompressingSend(send, encoding))
+
+
+def mount_compression(app: FastAPI) -> None:
+    app.add_middleware(CompressionMiddleware)
@@ -1,4 +1,6 @@
 import secrets
+from typing import Literal
+
 from pydantic import PostgresDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -35,9 +37,145 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Optional streaming replica for reads; credentials and database are shared
+    POSTGRES_REPLICA_HOSTNAME: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None
+
+    @computed_field
+    @property
+    def SQLALCHEMY_REPLICA_DATABASE_URL(self) -> PostgresDsn | None:
+        if not self.POSTGRES_REPLICA_HOSTNAME:
+            return None
+        return PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_REPLICA_HOSTNAME,
+            port=self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
+    # Connection pool of each API engine
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 20
+    POSTGRES_POOL_TIMEOUT: float = 30.0
+    POSTGRES_POOL_RECYCLE: int = 30 * 60
+    POSTGRES_POOL_PRE_PING: bool = True
+    # Server-side limit per statement, 0 disables it
+    POSTGRES_STATEMENT_TIMEOUT_MS: int = 30_000
+    # asyncpg prepared statements kept per connection, 0 for pgbouncer
+    # in transaction mode
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 100
+    # After a commit, reads of the same client go to the primary for this long
+    POSTGRES_REPLICA_STICKY_SECONDS: int = 10
+    POSTGRES_REPLICA_STICKY_PREFIX: str = "db:sticky"
+
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 min * 24 hours * 7 days = 7 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
 
+    # bcrypt runs in a dedicated pool; calls beyond MAX_PENDING are rejected
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Failed logins are counted in fixed windows per account and per client IP
+    LOGIN_THROTTLE_PREFIX: str = "login:failures"
+    LOGIN_THROTTLE_WINDOW: int = 15 * 60
+    LOGIN_MAX_FAILURES_PER_ACCOUNT: int = 10
+    LOGIN_MAX_FAILURES_PER_IP: int = 100
+
+    # Authenticated users are cached in process and in Redis; a change
+    # reaches other processes after at most the local TTL
+    USER_CACHE_PREFIX: str = "user"
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_LOCAL_TTL: float = 15.0
+    USER_CACHE_REDIS_TTL: int = 5 * 60
+
+    # Device and sensor type catalogs are served from process memory. Creates
+    # are broadcast over Redis pub/sub; the TTL bounds staleness without Redis
+    CATALOG_CACHE_CHANNEL: str = "catalog:invalidate"
+    CATALOG_CACHE_TTL: float = 60 * 60
+    # Rendered (and compressed) page bodies kept per catalog
+    CATALOG_CACHE_BODIES: int = 64
+
+    # Negotiated response compression; zstd and br need the "compression"
+    # extra, gzip is always there. Smaller complete bodies are sent as is
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_MEDIA_TYPES: list[str] = [
+        "application/json",
+        "application/x-ndjson",
+        "application/vnd.apache.arrow.stream",
+        "text/csv",
+        "text/plain",
+    ]
+
+    # Per-request SQL profiling, a diagnostic that costs a regex pass over
+    # every statement; the header exposes statements, debug use only
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_PROFILER_HEADER: bool = False
+    SQL_PROFILER_QUERY_BUDGET: int = 20
+    SQL_PROFILER_REPEAT_THRESHOLD: int = 5
+    SQL_PROFILER_SLOW_QUERY_MS: float = 200.0
+    SQL_PROFILER_SLOWEST: int = 3
+
+    # Prometheus exposition; Celery broker queues are polled in the background
+    # by one API process per interval and shared with the others through Redis
+    METRICS_PATH: str = "/metrics"
+    METRICS_CELERY_QUEUES: list[str] = ["celery"]
+    METRICS_CELERY_POLL_INTERVAL: float = 15.0
+    METRICS_CELERY_QUEUES_KEY: str = "metrics:celery_queues"
+
+    # Per-process cache of sensor -> device -> user ownership; deletes
+    # elsewhere become visible to other processes after at most the TTL
+    OWNERSHIP_CACHE_SIZE: int = 10_000
+    OWNERSHIP_CACHE_TTL: float = 60.0
+
+    # "direct" writes readings to Postgres on the request path,
+    # "stream" appends them to Redis Streams drained by Celery workers
+    SENSOR_DATA_INGESTION_MODE: Literal["direct", "stream"] = "direct"
+    SENSOR_DATA_STREAM_PREFIX: str = "sensordata"
+    SENSOR_DATA_STREAM_SHARDS: int = 8
+    SENSOR_DATA_STREAM_GROUP: str = "sensordata-writers"
+    SENSOR_DATA_STREAM_MAXLEN: int = 1_000_000
+    SENSOR_DATA_STREAM_BATCH_SIZE: int = 2000
+    SENSOR_DATA_STREAM_MAX_BATCHES: int = 50
+    SENSOR_DATA_STREAM_CLAIM_IDLE_MS: int = 60_000
+    SENSOR_DATA_STREAM_MAX_DELIVERIES: int = 5
+    SENSOR_DATA_STREAM_DRAIN_INTERVAL: float = 1.0
+    # One process drains a shard at a time; the lock is renewed before every
+    # batch. Keep it below CLAIM_IDLE_MS so live work is never claimed
+    SENSOR_DATA_STREAM_LOCK_TTL_MS: int = 30_000
+
+    # Rows parsed, checked and copied per COPY round trip of a bulk import
+    SENSOR_DATA_IMPORT_CHUNK_SIZE: int = 10_000
+    SENSOR_DATA_IMPORT_MAX_REPORTED_ERRORS: int = 100
+
+    # Rows fetched per round trip of the export's server-side cursor
+    SENSOR_DATA_EXPORT_CHUNK_SIZE: int = 5000
+
+    # sensordata is range-partitioned by created_at
+    SENSOR_DATA_PARTITION_INTERVAL: Literal["day", "month"] = "month"
+    SENSOR_DATA_PARTITIONS_AHEAD: int = 3
+    # Partitions older than this are detached (and dropped), None keeps everything
+    SENSOR_DATA_RETENTION_DAYS: int | None = None
+    SENSOR_DATA_RETENTION_ACTION: Literal["detach", "drop"] = "drop"
+    SENSOR_DATA_PARTITION_MAINTENANCE_INTERVAL: float = 60 * 60
+
+    # 1m/1h/1d rollups are refreshed from buckets dirtied by new readings
+    SENSOR_DATA_ROLLUP_INTERVAL: float = 30.0
+    SENSOR_DATA_ROLLUP_BATCH_SIZE: int = 5000
+    SENSOR_DATA_ROLLUP_MAX_BATCHES: int = 20
+
+    # Newest reading of every sensor is cached in a Redis hash, 0 disables expiry
+    SENSOR_DATA_LATEST_PREFIX: str = "sensordata:latest"
+    SENSOR_DATA_LATEST_TTL: int = 7 * 24 * 60 * 60
+
+    # Upper bounds for a single aggregation query
+    SENSOR_DATA_MAX_BUCKETS: int = 10_000
+    SENSOR_DATA_MAX_AGGREGATE_SENSORS: int = 50
+
 
 settings = Settings()  # type: ignore
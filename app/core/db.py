@@ -1,23 +1,145 @@
 import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+
+import redis.asyncio as redis
 from fastapi import FastAPI
 from loguru import logger
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUTS, DB_POOL_CONNECTS, DB_POOL_WAIT, track_pool
+
+
+def _connect_args() -> dict:
+    server_settings = {}
+    if settings.POSTGRES_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.POSTGRES_STATEMENT_TIMEOUT_MS)
+    return {
+        "server_settings": server_settings,
+        # asyncpg's own cache and the dialect's prepared statement cache
+        "statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE,
+    }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Times the wait for a connection, which no pool event covers."""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(self.metrics_name).observe(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        track_pool(self.metrics_name, pool)
+        return pool
+
+
+def create_engine(url: str, pooled: bool = True, name: str = "primary") -> AsyncEngine:
+    """An engine configured from the POSTGRES_* pool and timeout settings."""
+    if not pooled:
+        return create_async_engine(
+            url, poolclass=NullPool, connect_args=_connect_args()
+        )
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+        pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+        connect_args=_connect_args(),
+    )
+    engine.pool.metrics_name = name  # type: ignore[attr-defined]
+    track_pool(name, engine.pool)  # type: ignore[arg-type]
+
+    checkouts = DB_POOL_CHECKOUTS.labels(name)
+    connects = DB_POOL_CONNECTS.labels(name)
+    event.listen(engine.sync_engine, "checkout", lambda *_: checkouts.inc())
+    event.listen(engine.sync_engine, "connect", lambda *_: connects.inc())
+    return engine
+
+
+@dataclass
+class EngineRegistry:
+    primary: AsyncEngine
+    replica: AsyncEngine | None = None
+
+    async def dispose(self) -> None:
+        await self.primary.dispose(close=True)
+        if self.replica is not None:
+            await self.replica.dispose(close=True)
 
-async_engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URL))
+
+def create_engine_registry() -> EngineRegistry:
+    replica_url = settings.SQLALCHEMY_REPLICA_DATABASE_URL
+    return EngineRegistry(
+        primary=create_engine(str(settings.SQLALCHEMY_DATABASE_URL)),
+        replica=create_engine(str(replica_url), name="replica") if replica_url else None,
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_commit(session: Session) -> None:
+    session.info["committed"] = True
+
+
+def primary_engine(session: AsyncSession) -> AsyncEngine | None:
+    """The primary engine behind a session that reads from the replica."""
+    return session.info.get("primary")
+
+
+def _sticky_key(client: str) -> str:
+    digest = hashlib.sha256(client.encode()).hexdigest()[:32]
+    return f"{settings.POSTGRES_REPLICA_STICKY_PREFIX}:{digest}"
+
+
+async def is_sticky(redis_client: redis.Redis | None, client: str) -> bool:
+    """
+    Whether the client committed recently and must read from the primary.
+    Without a working Redis this cannot be known, so the answer is yes.
+    """
+    if redis_client is None:
+        return True
+    try:
+        return bool(await redis_client.exists(_sticky_key(client)))
+    except redis.RedisError as e:
+        logger.warning(f"Could not check replica stickiness: {e}")
+        return True
+
+
+async def make_sticky(redis_client: redis.Redis | None, client: str) -> None:
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(
+            _sticky_key(client), 1, ex=settings.POSTGRES_REPLICA_STICKY_SECONDS
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Could not mark client as sticky: {e}")
 
 
 async def connect_async_db(app: FastAPI):
-    logger.info("🚀 Connecting to Redis...")
+    logger.info("🚀 Connecting to Postgres...")
     logger.debug(f"{settings.SQLALCHEMY_DATABASE_URL = }")
     for attempt in range(5):
         try:
-            async_engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URL))
-
-            app.state.db_async_engine = async_engine
+            app.state.db_engines = create_engine_registry()
             logger.info("✅ Postgres connection successful!")
+            if app.state.db_engines.replica is not None:
+                logger.info("Reads are routed to the Postgres replica")
             return
         except Exception as e:
             logger.error(
@@ -25,27 +147,26 @@ async def connect_async_db(app: FastAPI):
             )
             await asyncio.sleep(2**attempt)
 
-    app.state.db_async_engine = None
+    app.state.db_engines = None
     logger.error("❌ Failed to connect to Postgres after several retries.")
 
 
 async def close_async_db(app: FastAPI):
-    if hasattr(app.state, "db_async_engine") and app.state.db_async_engine:
-        async_engine: AsyncEngine = app.state.db_async_engine
-        await async_engine.dispose(close=True)
+    engines: EngineRegistry | None = getattr(app.state, "db_engines", None)
+    if engines:
+        await engines.dispose()
         logger.info("🛑 Postgres connection closed.")
         return
 
     logger.error("❌ Postgres connection not found.")
 
 
-
 async def db_ready(app: FastAPI):
-    if hasattr(app.state, "db_async_engine") and app.state.db_async_engine:
-        async_engine: AsyncEngine = app.state.db_async_engine
-        async with async_engine.connect() as connection:
+    engines: EngineRegistry | None = getattr(app.state, "db_engines", None)
+    if engines:
+        async with engines.primary.connect() as connection:
             result = await connection.execute(text("SELECT version()"))
             logger.info(f"Postgres version: {result.scalar()}")
         return
 
-    logger.error("❌ Postgres connection not found.") 
+    logger.error("❌ Postgres connection not found.")
@@ -0,0 +1,23 @@
+import hashlib
+
+
+def weak_etag(payload: bytes) -> str:
+    """A weak validator for a representation, from a hash of its bytes."""
+    return f'W/"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of etag against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def version_etag(*parts: object) -> str:
+    """A weak validator from a row version or a listing watermark."""
+    return weak_etag(":".join(map(str, parts)).encode())
@@ -0,0 +1,214 @@
+import asyncio
+import os
+import time
+from collections.abc import Iterator
+
+import redis.asyncio as redis
+from fastapi import FastAPI
+from kombu import Connection
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram, make_asgi_app
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import password_hash_stats
+
+# Metrics live in the registry of each process; with several API workers
+# every worker is scraped on its own.
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce the response start, by route template.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests being handled.", ["method"]
+)
+
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool.", ["engine"]
+)
+DB_POOL_CONNECTS = Counter(
+    "db_pool_connects_total", "New DBAPI connections opened by the pool.", ["engine"]
+)
+
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Round trip of a Redis command or pipeline.",
+    ["command"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+
+CELERY_QUEUE_LENGTH = Gauge(
+    "celery_queue_length", "Messages waiting in a Celery broker queue.", ["queue"]
+)
+
+SENSOR_DATA_INGESTED_ROWS = Counter(
+    "sensor_data_ingested_rows_total",
+    "Readings accepted by the API; rate() gives rows per second.",
+    ["path"],
+)
+
+
+class _PoolCollector(Collector):
+    """Reads the pool counters at scrape time, so requests pay nothing for them."""
+
+    def __init__(self) -> None:
+        self.pools: dict[str, QueuePool] = {}
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size.", labels=["engine"])
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Connections in use.", labels=["engine"]
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow", "Connections open beyond the pool size.", labels=["engine"]
+        )
+        for name, pool in self.pools.items():
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield from (size, checked_out, overflow)
+
+
+class _PasswordHashCollector(Collector):
+    def collect(self) -> Iterator[GaugeMetricFamily | CounterMetricFamily]:
+        stats = password_hash_stats()
+        yield GaugeMetricFamily(
+            "password_hash_pending", "Hash calls running or queued.", value=stats.pending
+        )
+        yield GaugeMetricFamily(
+            "password_hash_queued", "Hash calls waiting for a worker.", value=stats.queued
+        )
+        yield CounterMetricFamily(
+            "password_hash_completed", "Finished hash calls.", value=stats.completed
+        )
+        yield CounterMetricFamily(
+            "password_hash_rejected", "Hash calls shed by the pool.", value=stats.rejected
+        )
+        yield CounterMetricFamily(
+            "password_hash_wait_seconds", "Time spent queued.", value=stats.wait_seconds
+        )
+        yield CounterMetricFamily(
+            "password_hash_seconds", "Time spent hashing.", value=stats.hash_seconds
+        )
+
+
+_pool_collector = _PoolCollector()
+REGISTRY.register(_pool_collector)
+REGISTRY.register(_PasswordHashCollector())
+
+
+def track_pool(name: str, pool: QueuePool) -> None:
+    _pool_collector.pools[name] = pool
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency per route template and requests
+    in flight. The route comes from the scope after routing, so path
+    parameters do not multiply label values; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+        started = time.perf_counter()
+        duration = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, duration
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                duration = time.perf_counter() - started
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method, getattr(route, "path", "<unmatched>"), status
+            ).observe(duration if duration is not None else time.perf_counter() - started)
+
+
+def _queue_lengths() -> dict[str, int]:
+    lengths = {}
+    with Connection(settings.CELERY_BROKER_URL, connect_timeout=5) as connection:
+        channel = connection.default_channel
+        for queue in settings.METRICS_CELERY_QUEUES:
+            lengths[queue] = channel.queue_declare(queue=queue, passive=True).message_count
+    return lengths
+
+
+async def _shared_queue_lengths(redis_client: redis.Redis | None) -> dict[str, int]:
+    """
+    The broker queue lengths, read from the broker by one API process per
+    poll interval and shared with the others through Redis with that TTL.
+    Empty while another process holds this interval's read.
+    """
+    if redis_client is None:
+        # kombu is blocking, keep it off the event loop
+        return await asyncio.to_thread(_queue_lengths)
+
+    key = settings.METRICS_CELERY_QUEUES_KEY
+    ttl_ms = int(settings.METRICS_CELERY_POLL_INTERVAL * 1000)
+    cached = await redis_client.hgetall(key)
+    if cached:
+        return {queue: int(length) for queue, length in cached.items()}
+    if not await redis_client.set(f"{key}:lock", os.getpid(), nx=True, px=ttl_ms):
+        return {}
+
+    lengths = await asyncio.to_thread(_queue_lengths)
+    if lengths:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hset(key, mapping=lengths)
+        pipe.pexpire(key, ttl_ms)
+        await pipe.execute()
+    return lengths
+
+
+async def _poll_celery_queues(redis_client: redis.Redis | None) -> None:
+    while True:
+        try:
+            lengths = await _shared_queue_lengths(redis_client)
+            for queue, length in lengths.items():
+                CELERY_QUEUE_LENGTH.labels(queue).set(length)
+        except Exception as e:
+            logger.warning(f"Could not read Celery queue lengths: {e}")
+        await asyncio.sleep(settings.METRICS_CELERY_POLL_INTERVAL)
+
+
+def mount_metrics(app: FastAPI) -> None:
+    app.add_middleware(MetricsMiddleware)
+    app.mount(settings.METRICS_PATH, make_asgi_app())
+
+
+async def start_metrics(app: FastAPI) -> None:
+    redis_client = getattr(app.state, "redis_client", None)
+    app.state.metrics_task = asyncio.create_task(_poll_celery_queues(redis_client))
+
+
+async def stop_metrics(app: FastAPI) -> None:
+    task: asyncio.Task | None = getattr(app.state, "metrics_task", None)
+    if task:
+        task.cancel()
@@ -0,0 +1,56 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """The cursor was not produced by encode_cursor for this listing."""
+
+
+@dataclass
+class PageParams:
+    skip: int = 0
+    limit: int = 100
+    # Cursor of the last row of the previous page
+    after: str | None = None
+    # Total row count via count(*) OVER (); skipping it keeps the query index-only
+    with_count: bool = True
+
+    def cache_key(self) -> tuple:
+        """Everything that selects the page, for ETags and cached bodies."""
+        return (self.skip, self.limit, self.after, self.with_count)
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    count: int | None
+    next_cursor: str | None
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Packs the sort key of a row into an opaque URL-safe token."""
+    payload = json.dumps(values, default=_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """Raises InvalidCursorError for tokens that were not produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (UnicodeError, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(values, list):
+        raise InvalidCursorError("Malformed cursor")
+    return values
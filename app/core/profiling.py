@@ -0,0 +1,188 @@
+import json
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PROFILE_HEADER = "X-DB-Profile"
+
+# Expanded IN lists and multi-row VALUES differ only in their number of binds
+_BIND_LIST_RE = re.compile(r"\$\d+(?:::[\w\[\]]+)?(?:\s*,\s*\$\d+(?:::[\w\[\]]+)?)+")
+_VALUES_ROWS_RE = re.compile(r"\((?:\$n\.\.\.|\$\d+)\)(?:\s*,\s*\((?:\$n\.\.\.|\$\d+)\))+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace and bind lists collapsed."""
+    shape = _BIND_LIST_RE.sub("$n...", statement)
+    shape = _VALUES_ROWS_RE.sub("($n...)...", shape)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryProfile:
+    count: int = 0
+    # BEGIN, COMMIT and ROLLBACK, each a round trip of its own
+    transaction_events: int = 0
+    seconds: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+    # (seconds, shape), slowest first, at most SQL_PROFILER_SLOWEST entries
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+    # An enclosing profile, which sees everything recorded here as well
+    parent: "QueryProfile | None" = field(default=None, repr=False)
+
+    @property
+    def round_trips(self) -> int:
+        return self.count + self.transaction_events
+
+    def record_transaction_event(self) -> None:
+        self.transaction_events += 1
+        if self.parent is not None:
+            self.parent.record_transaction_event()
+
+    def record(self, statement: str, seconds: float) -> str:
+        """Records a statement here and in every enclosing profile; returns its shape."""
+        shape = statement_shape(statement)
+        profile: QueryProfile | None = self
+        while profile is not None:
+            profile._add(shape, seconds)
+            profile = profile.parent
+        return shape
+
+    def _add(self, shape: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[shape] += 1
+        keep = settings.SQL_PROFILER_SLOWEST
+        if len(self.slowest) < keep or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, shape))
+            self.slowest.sort(key=lambda entry: entry[0], reverse=True)
+            del self.slowest[keep:]
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Statement shapes run more than threshold times, the usual N+1 sign."""
+        return {shape: n for shape, n in self.shapes.items() if n > threshold}
+
+    def summary(self) -> dict:
+        return {
+            "queries": self.count,
+            "round_trips": self.round_trips,
+            "time_ms": round(self.seconds * 1000, 2),
+            "repeated": self.repeated(settings.SQL_PROFILER_REPEAT_THRESHOLD),
+            "slowest": [
+                {"ms": round(seconds * 1000, 2), "statement": shape}
+                for seconds, shape in self.slowest
+            ],
+        }
+
+
+_current_profile: ContextVar[QueryProfile | None] = ContextVar(
+    "current_query_profile", default=None
+)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """
+    Records every statement executed in the current context. Profiles nest:
+    an enclosing profile also records what an inner one sees.
+    """
+    profile = QueryProfile(parent=_current_profile.get())
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+# SQLAlchemy runs async engines in greenlets that share the caller's
+# contextvars, so the hooks see the profile of the request being served
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    shape = profile.record(statement, seconds)
+    if seconds * 1000 >= settings.SQL_PROFILER_SLOW_QUERY_MS:
+        logger.warning(f"Slow query ({seconds * 1000:.1f} ms): {shape[:500]}")
+
+
+def _transaction_event(conn) -> None:
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record_transaction_event()
+
+
+def install_query_hooks() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        for name in ("begin", "commit", "rollback"):
+            event.listen(Engine, name, _transaction_event)
+
+
+class QueryProfilerMiddleware:
+    """
+    Profiles the queries of each request. Warns when a route runs more than
+    SQL_PROFILER_QUERY_BUDGET statements or repeats one statement shape more
+    than SQL_PROFILER_REPEAT_THRESHOLD times. With SQL_PROFILER_HEADER the
+    profile up to the response start is returned in the X-DB-Profile header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.SQL_PROFILER_HEADER:
+                headers = MutableHeaders(scope=message)
+                headers[PROFILE_HEADER] = json.dumps(profile.summary())
+            await send(message)
+
+        with profile_queries() as profile:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._check(scope, profile)
+
+    @staticmethod
+    def _check(scope: Scope, profile: QueryProfile) -> None:
+        route = getattr(scope.get("route"), "path", scope["path"])
+        name = f"{scope['method']} {route}"
+        if profile.count > settings.SQL_PROFILER_QUERY_BUDGET:
+            logger.warning(
+                f"{name} ran {profile.count} queries "
+                f"(budget {settings.SQL_PROFILER_QUERY_BUDGET}) "
+                f"in {profile.seconds * 1000:.1f} ms"
+            )
+        for shape, n in profile.repeated(settings.SQL_PROFILER_REPEAT_THRESHOLD).items():
+            logger.warning(f"{name} ran the same statement {n} times: {shape[:500]}")
+
+
+def mount_query_profiler(app: FastAPI) -> None:
+    install_query_hooks()
+    app.add_middleware(QueryProfilerMiddleware)
@@ -1,10 +1,42 @@
 import asyncio
+import time
 
 import redis.asyncio as redis
 from fastapi import FastAPI
 from loguru import logger
+from redis.asyncio.client import Pipeline
 
 from app.core.config import settings
+from app.core.metrics import REDIS_COMMAND_DURATION
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_DURATION.labels("PIPELINE").observe(
+                time.perf_counter() - started
+            )
+
+
+class InstrumentedRedis(redis.Redis):
+    """Client recording the latency of every command and pipeline."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - started
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
 
 
 async def connect_redis(app: FastAPI):
@@ -12,7 +44,7 @@ async def connect_redis(app: FastAPI):
     logger.debug(f"{settings.REDIS_URL = }")
     for attempt in range(5):
         try:
-            client = redis.from_url(
+            client = InstrumentedRedis.from_url(
                 settings.REDIS_URL, encoding="utf-8", decode_responses=True
             )
             await client.ping()
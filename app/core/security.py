@@ -1,4 +1,10 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
+from typing import TypeVar
 
 import jwt
 from passlib.context import CryptContext
@@ -9,6 +15,74 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+
+class PasswordHashBusyError(RuntimeError):
+    """Too many hash operations are already waiting for the pool."""
+
+
+@dataclass
+class PasswordHashStats:
+    # Submitted and not finished yet, running or queued
+    pending: int = 0
+    completed: int = 0
+    rejected: int = 0
+    # Time spent waiting for a worker and time spent hashing
+    wait_seconds: float = 0.0
+    hash_seconds: float = 0.0
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - settings.PASSWORD_HASH_WORKERS)
+
+
+# bcrypt costs 100-300 ms of CPU per call and releases the GIL, so it runs in
+# its own small pool rather than on the event loop or the default executor
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_stats = PasswordHashStats()
+
+
+def password_hash_stats() -> PasswordHashStats:
+    return replace(_hash_stats)
+
+
+def shutdown_password_hashing() -> None:
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed(func: Callable[..., T], submitted: float, *args) -> tuple[T, float, float]:
+    started = time.perf_counter()
+    result = func(*args)
+    return result, started - submitted, time.perf_counter() - started
+
+
+async def _run_in_hash_pool(func: Callable[..., T], *args) -> T:
+    """
+    Runs func in the hash pool. Raises PasswordHashBusyError instead of
+    queueing once PASSWORD_HASH_MAX_PENDING calls are in flight, so a login
+    burst is shed rather than piling up behind the workers.
+    """
+    if _hash_stats.pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        _hash_stats.rejected += 1
+        raise PasswordHashBusyError
+
+    _hash_stats.pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        result, waited, spent = await loop.run_in_executor(
+            _hash_executor, _timed, func, time.perf_counter(), *args
+        )
+    finally:
+        _hash_stats.pending -= 1
+
+    _hash_stats.completed += 1
+    _hash_stats.wait_seconds += waited
+    _hash_stats.hash_seconds += spent
+    return result
+
 
 def create_access_token(subject: str, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
@@ -23,3 +97,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_hash_pool(get_password_hash, password)
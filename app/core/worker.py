@@ -0,0 +1,66 @@
+import asyncio
+import os
+from collections.abc import AsyncIterator, Coroutine
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.db import create_engine
+from app.core.redis import InstrumentedRedis
+
+T = TypeVar("T")
+
+
+class _WorkerResources:
+    """Event loop, engine and Redis client of one Celery worker process."""
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.engine: AsyncEngine | None = None
+        self.redis: redis.Redis | None = None
+
+
+_resources: _WorkerResources | None = None
+
+
+def _current() -> _WorkerResources:
+    global _resources
+    # A prefork child must not use the loop or connections of its parent
+    if _resources is None or _resources.pid != os.getpid():
+        _resources = _WorkerResources()
+    return _resources
+
+
+def run_task(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Runs a task's coroutine on the worker process's long-lived event loop.
+    The engine and Redis client are bound to that loop, so every task the
+    process runs reuses them instead of connecting afresh.
+    """
+    return _current().loop.run_until_complete(coroutine)
+
+
+@asynccontextmanager
+async def worker_session() -> AsyncIterator[AsyncSession]:
+    """Session for Celery tasks, from the worker process's pooled engine."""
+    resources = _current()
+    if resources.engine is None:
+        resources.engine = create_engine(
+            str(settings.SQLALCHEMY_DATABASE_URL), name="worker"
+        )
+    async with AsyncSession(resources.engine, expire_on_commit=False) as session:
+        yield session
+
+
+def worker_redis() -> redis.Redis:
+    """The worker process's Redis client, for use inside run_task."""
+    resources = _current()
+    if resources.redis is None:
+        resources.redis = InstrumentedRedis.from_url(
+            settings.REDIS_URL, encoding="utf-8", decode_responses=True
+        )
+    return resources.redis
@@ -0,0 +1,38 @@
+from collections.abc import Sequence
+
+from sqlalchemy import ARRAY, bindparam, cast, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel, func, select
+
+
+async def insert_rows(
+    *,
+    session: AsyncSession,
+    table: type[SQLModel],
+    columns: Sequence[str],
+    rows: Sequence[dict],
+) -> None:
+    """
+    Inserts rows with a single INSERT ... SELECT unnest(...), one array
+    parameter per column. Unlike a multi-row VALUES list it is compiled once
+    whatever the row count and never nears asyncpg's bind parameter limit.
+    The caller is responsible for committing.
+    """
+    if not rows:
+        return
+
+    table_columns = table.__table__.c  # type: ignore[attr-defined]
+    arrays = [
+        func.unnest(
+            cast(
+                bindparam(
+                    name,
+                    [row[name] for row in rows],
+                    type_=ARRAY(table_columns[name].type),
+                ),
+                ARRAY(table_columns[name].type),
+            )
+        )
+        for name in columns
+    ]
+    await session.execute(insert(table).from_select(list(columns), select(*arrays)))
@@ -1,33 +1,40 @@
 import uuid
-
+from collections.abc import Sequence
+
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    String,
+    Uuid,
+    cast,
+    column,
+    insert,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import func, select
 
+from app.core.pagination import Page, PageParams
+from app.crud.bulk import insert_rows
+from app.crud.pagination import paginate
 from app.models.persistence.device import DeviceTable, DeviceTypeTable
+from app.models.persistence.row_version import ROW_VERSION
 from app.models.persistence.sensor import SensorTable
 
 
-async def count_device_types(*, session: AsyncSession) -> int | None:
-    statement = select(func.count()).select_from(DeviceTypeTable)
-    result = await session.execute(statement)
-    return result.scalar()
-
-
-async def list_device_types(
-    *, session: AsyncSession, skip: int = 0, limit: int = 100
-) -> list[DeviceTypeTable]:
-    statement = select(DeviceTypeTable).offset(skip).limit(limit)
-    result = await session.execute(statement)
-    return list(result.scalars().all())
+async def list_all_device_types(*, session: AsyncSession) -> Sequence[DeviceTypeTable]:
+    """Every device type ordered by id, for the in-memory catalog."""
+    result = await session.execute(select(DeviceTypeTable).order_by(DeviceTypeTable.id))
+    return result.scalars().all()
 
 
 async def create_device_type(
     *, session: AsyncSession, name: str
 ) -> DeviceTypeTable:
-    db_obj = DeviceTypeTable(name=name)
-    session.add(db_obj)
+    statement = insert(DeviceTypeTable).values(name=name).returning(DeviceTypeTable)
+    db_obj = (await session.execute(statement)).scalar_one()
     await session.commit()
-    await session.refresh(db_obj)
     return db_obj
 
 
@@ -43,12 +50,6 @@ async def get_device_type_by_name(
     return result.scalar_one_or_none()
 
 
-async def count_user_devices(*, session: AsyncSession, user_id: str) -> int | None:
-    statement = select(func.count()).where(DeviceTable.user_id == user_id)
-    result = await session.execute(statement)
-    return result.scalar()
-
-
 async def get_device_by_id(*, session: AsyncSession, device_id: str) -> DeviceTable | None:
     return await session.get(DeviceTable, uuid.UUID(device_id))
 
@@ -61,39 +62,121 @@ async def get_device_by_sensor_id(
     return result.scalar_one_or_none()
 
 
-async def list_user_devices(*, session: AsyncSession, user_id: str):
-    statement = select(DeviceTable).where(DeviceTable.user_id == user_id)
-    result = await session.execute(statement)
-    return list(result.scalars().all())
+async def list_user_devices(
+    *, session: AsyncSession, user_id: uuid.UUID, params: PageParams
+) -> Page[DeviceTable]:
+    """The user's devices ordered by name, served by the (user_id, name, id) index."""
+    return await paginate(
+        session=session,
+        statement=select(DeviceTable).where(DeviceTable.user_id == user_id),
+        sort_columns=(DeviceTable.name, DeviceTable.id),
+        params=params,
+    )
+
+
+async def get_user_devices_watermark(
+    *, session: AsyncSession, user_id: uuid.UUID
+) -> tuple[int, int]:
+    """
+    Count and highest row version of the user's devices. Every insert,
+    update or delete among them changes the pair.
+    """
+    statement = select(
+        func.count(), func.coalesce(func.max(DeviceTable.version), 0)
+    ).where(DeviceTable.user_id == user_id)
+    count, version = (await session.execute(statement)).one()
+    return count, version
 
 
 async def create_device(
     *, session: AsyncSession, user_id: str, name: str, is_active: bool, type_id: int
 ) -> DeviceTable:
-    db_obj = DeviceTable(
-        name=name,
-        is_active=is_active,
-        type_id=type_id,
-        user_id=user_id,
+    statement = (
+        insert(DeviceTable)
+        .values(
+            id=uuid.uuid4(),
+            name=name,
+            is_active=is_active,
+            type_id=type_id,
+            user_id=user_id,
+        )
+        .returning(DeviceTable)
     )
-    session.add(db_obj)
+    db_obj = (await session.execute(statement)).scalar_one()
     await session.commit()
-    await session.refresh(db_obj)
     return db_obj
 
 
+async def create_devices(*, session: AsyncSession, rows: Sequence[dict]) -> None:
+    """
+    Inserts devices given as id, name, is_active, type_id and user_id in
+    one statement. The caller is responsible for committing.
+    """
+    await insert_rows(
+        session=session,
+        table=DeviceTable,
+        columns=("id", "name", "is_active", "type_id", "user_id"),
+        rows=rows,
+    )
+
+
 async def update_device(
     *, session: AsyncSession, db_device: DeviceTable, update_data: dict
 ) -> DeviceTable:
-    for key, value in update_data.items():
-        setattr(db_device, key, value)
-
-    session.add(db_device)
+    if not update_data:
+        return db_device
+
+    statement = (
+        update(DeviceTable)
+        .where(DeviceTable.id == db_device.id)
+        .values(**update_data, version=ROW_VERSION.next_value())
+        .returning(DeviceTable)
+        .execution_options(populate_existing=True)
+    )
+    db_device = (await session.execute(statement)).scalar_one()
     await session.commit()
-    await session.refresh(db_device)
     return db_device
 
 
+async def bulk_update_user_devices(
+    *, session: AsyncSession, user_id: uuid.UUID, updates: Sequence[dict]
+) -> list[DeviceTable]:
+    """
+    Applies per-device changes to the user's devices in one UPDATE ... FROM
+    VALUES ... RETURNING. Each dict holds an id and any of name, is_active
+    and type_id; missing fields keep their value. Devices that do not exist
+    or belong to someone else are not updated nor returned.
+    The caller is responsible for committing.
+    """
+    changes = values(
+        column("id", Uuid()),
+        column("name", String()),
+        column("is_active", Boolean()),
+        column("type_id", Integer()),
+        name="changes",
+    ).data(
+        [
+            (item["id"], item.get("name"), item.get("is_active"), item.get("type_id"))
+            for item in updates
+        ]
+    )
+    statement = (
+        update(DeviceTable)
+        .where(DeviceTable.id == changes.c.id, DeviceTable.user_id == user_id)
+        .values(
+            # An all-NULL VALUES column is typed text, hence the casts
+            name=func.coalesce(cast(changes.c.name, String), DeviceTable.name),
+            is_active=func.coalesce(cast(changes.c.is_active, Boolean), DeviceTable.is_active),
+            type_id=func.coalesce(cast(changes.c.type_id, Integer), DeviceTable.type_id),
+            version=ROW_VERSION.next_value(),
+        )
+        .returning(DeviceTable)
+        .execution_options(synchronize_session="fetch", populate_existing=True)
+    )
+    result = await session.execute(statement)
+    return list(result.scalars().all())
+
+
 async def delete_device(*, session: AsyncSession, db_device: DeviceTable) -> None:
     await session.delete(db_device)
     await session.commit()
@@ -0,0 +1,111 @@
+import uuid
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Integer, Select, Uuid, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased
+from sqlmodel import func, select
+
+from app.core.pagination import (
+    InvalidCursorError,
+    Page,
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+# Cursor values are JSON, so they are converted back by column type
+_KEY_TYPES: dict[type, Callable[[Any], Any]] = {
+    Integer: int,
+    Uuid: uuid.UUID,
+    DateTime: datetime.fromisoformat,
+}
+
+
+def _key_type(column: InstrumentedAttribute) -> Callable[[Any], Any]:
+    for sql_type, convert in _KEY_TYPES.items():
+        if isinstance(column.type, sql_type):
+            return convert
+    return str
+
+
+def _decode_key(
+    cursor: str, sort_columns: Sequence[InstrumentedAttribute]
+) -> tuple[Any, ...]:
+    values = decode_cursor(cursor)
+    if len(values) != len(sort_columns):
+        raise InvalidCursorError("Cursor does not match this listing")
+    try:
+        return tuple(
+            _key_type(column)(value) for column, value in zip(sort_columns, values)
+        )
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+
+async def paginate(
+    *,
+    session: AsyncSession,
+    statement: Select,
+    sort_columns: Sequence[InstrumentedAttribute],
+    params: PageParams,
+) -> Page:
+    """
+    Runs a select of one entity as a single keyset page, ordered by
+    sort_columns, which must end with a unique column.
+
+    With params.with_count the total is computed in the same statement by a
+    count(*) OVER () window over the filtered rows; the keyset bound is then
+    applied outside the window so the total does not shrink page by page.
+    Without it the page is a plain index range scan.
+    Raises InvalidCursorError for cursors of another listing.
+    """
+    key = _decode_key(params.after, sort_columns) if params.after else None
+
+    if params.with_count:
+        windowed = statement.add_columns(
+            func.count().over().label("total_count")
+        ).subquery()
+        entity = aliased(statement.column_descriptions[0]["entity"], windowed)
+        columns = [getattr(entity, column.key) for column in sort_columns]
+        paged = select(entity, windowed.c.total_count)
+    else:
+        entity = None
+        columns = list(sort_columns)
+        paged = statement
+
+    if key:
+        paged = paged.where(tuple_(*columns) > tuple_(*key))
+    # One extra row tells whether there is another page
+    paged = paged.order_by(*columns).offset(params.skip).limit(params.limit + 1)
+
+    result = await session.execute(paged)
+    if entity is not None:
+        rows = result.all()
+        items = [row[0] for row in rows]
+        count = rows[0][1] if rows else None
+    else:
+        items = list(result.scalars().all())
+        count = None
+
+    if params.with_count and count is None:
+        # Nothing at or past the cursor; the window had no row to report on
+        count = 0 if not (key or params.skip) else await _count(session, statement)
+
+    has_more = len(items) > params.limit
+    items = items[: params.limit]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(*(getattr(last, c.key) for c in sort_columns))
+    return Page(items=items, count=count, next_cursor=next_cursor)
+
+
+async def _count(session: AsyncSession, statement: Select) -> int:
+    result = await session.execute(
+        select(func.count()).select_from(statement.order_by(None).subquery())
+    )
+    return result.scalar_one()
@@ -1,23 +1,141 @@
-from datetime import datetime
+import uuid
+from datetime import datetime, timedelta
+from collections.abc import AsyncIterator, Callable, Collection, Sequence
 from typing import List, Optional
 
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Interval,
+    Row,
+    ScalarSelect,
+    Subquery,
+    insert,
+    literal,
+    tuple_,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import asc, func, select, desc
+from sqlmodel import asc, col, func, select, desc
 
-from app.models import SensorData, SensorDataCreate, SensorDataPublic
+from app.crud.sensor_data_rollups import mark_buckets_dirty
+from app.mappers.sensor_data import to_domain, to_public
+from app.models.persistence.sensor_data import SensorDataTable
+from app.schemas.sensor_data import SensorDataCreate, SensorDataPublic
 
 
 async def create_sensor_data(
     *, session: AsyncSession, sensor_data_create: SensorDataCreate
-) -> SensorData:
+) -> SensorDataTable:
     """Creates a new sensor data record in the database."""
-    db_obj = SensorData.model_validate(sensor_data_create)
-    session.add(db_obj)
+    statement = (
+        insert(SensorDataTable)
+        .values(**sensor_data_create.model_dump(), created_at=datetime.now())
+        .returning(SensorDataTable)
+    )
+    db_obj = (await session.execute(statement)).scalar_one()
+    await mark_buckets_dirty(
+        session=session, readings=[(db_obj.sensor_id, db_obj.created_at)]
+    )
     await session.commit()
-    await session.refresh(db_obj)
     return db_obj
 
 
+async def create_sensor_data_batch(
+    *, session: AsyncSession, rows: list[dict]
+) -> int:
+    """
+    Inserts many sensor data records with a single multi-row INSERT
+    in one transaction. Returns the number of inserted rows.
+    """
+    if not rows:
+        return 0
+
+    statement = insert(SensorDataTable).values(rows)
+    result = await session.execute(statement)
+    await mark_buckets_dirty(
+        session=session, readings=((row["sensor_id"], row["created_at"]) for row in rows)
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def copy_sensor_data(
+    *, session: AsyncSession, records: list[tuple[uuid.UUID, float, datetime]]
+) -> int:
+    """
+    Streams (sensor_id, data, created_at) records into the table with the
+    PostgreSQL COPY protocol inside the session's transaction.
+    The caller is responsible for committing.
+    """
+    if not records:
+        return 0
+
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+        SensorDataTable.__tablename__,
+        records=records,
+        columns=["sensor_id", "data", "created_at"],
+    )
+    await mark_buckets_dirty(
+        session=session, readings=((record[0], record[2]) for record in records)
+    )
+    return len(records)
+
+
+_ROW_COLUMNS = (
+    SensorDataTable.id,
+    SensorDataTable.sensor_id,
+    SensorDataTable.data,
+    SensorDataTable.created_at,
+)
+
+
+def _keyset_conditions(key: tuple[datetime, int], older: bool) -> tuple:
+    """
+    Rows strictly older (or newer) than the (created_at, id) key. The plain
+    created_at bound repeats the row comparison so that the planner can prune
+    partitions on the far side of the cursor.
+    """
+    sort_key = tuple_(SensorDataTable.created_at, SensorDataTable.id)
+    if older:
+        return sort_key < tuple_(*key), SensorDataTable.created_at <= key[0]
+    return sort_key > tuple_(*key), SensorDataTable.created_at >= key[0]
+
+
+def _list_statement(
+    columns: tuple,
+    sensor_id: str,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    reverse: bool,
+    skip: int,
+    limit: int,
+    after: Optional[tuple[datetime, int]],
+    before: Optional[tuple[datetime, int]],
+):
+    statement = select(*columns).where(SensorDataTable.sensor_id == sensor_id)
+
+    if start_time:
+        statement = statement.where(SensorDataTable.created_at >= start_time)
+    if end_time:
+        statement = statement.where(SensorDataTable.created_at <= end_time)
+
+    if after:
+        statement = statement.where(*_keyset_conditions(after, older=reverse))
+    if before:
+        statement = statement.where(*_keyset_conditions(before, older=not reverse))
+
+    # A 'before' page is read backwards from the cursor and flipped afterwards
+    descending = reverse != bool(before)
+    order = desc if descending else asc
+    return (
+        statement.order_by(order(SensorDataTable.created_at), order(SensorDataTable.id))
+        .offset(skip)
+        .limit(limit)
+    )
+
+
 async def list_sensor_data_by_sensor_id(
     *,
     session: AsyncSession,
@@ -27,26 +145,121 @@ async def list_sensor_data_by_sensor_id(
     reverse: bool = True,  # Newest first
     skip: int = 0,
     limit: int = 100,
+    after: Optional[tuple[datetime, int]] = None,
+    before: Optional[tuple[datetime, int]] = None,
 ) -> List[SensorDataPublic]:
     """
     Retrieves data points for a given sensor, with optional time-based filtering.
     Orders results by 'created_at' descending (newest first) by default.
+
+    'after' and 'before' are (created_at, id) keys of a row: the page starts
+    right after or ends right before it in the chosen order. Keyset pages use
+    the (sensor_id, created_at, id) index, so their cost does not grow with depth.
+    Rows of a 'before' page are still returned in the chosen order.
     """
-    statement = select(SensorData).where(SensorData.sensor_id == sensor_id)
+    statement = _list_statement(
+        (SensorDataTable,),
+        sensor_id,
+        start_time,
+        end_time,
+        reverse,
+        skip,
+        limit,
+        after,
+        before,
+    )
+    result = await session.execute(statement)
+    db_objects = list(result.scalars().all())
+    if before:
+        db_objects.reverse()
+    return [to_public(to_domain(obj)) for obj in db_objects]
 
-    if start_time:
-        statement = statement.where(SensorData.created_at >= start_time)
-    if end_time:
-        statement = statement.where(SensorData.created_at <= end_time)
 
-    order_expr = desc(SensorData.created_at) if reverse else asc(SensorData.created_at)
-    statement = (
-        statement.order_by(order_expr).offset(skip).limit(limit)
+async def list_sensor_data_rows_by_sensor_id(
+    *,
+    session: AsyncSession,
+    sensor_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    reverse: bool = True,  # Newest first
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[tuple[datetime, int]] = None,
+    before: Optional[tuple[datetime, int]] = None,
+) -> List[Row]:
+    """
+    Same page as list_sensor_data_by_sensor_id, as plain
+    (id, sensor_id, data, created_at) rows for columnar encoders.
+    """
+    statement = _list_statement(
+        _ROW_COLUMNS,
+        sensor_id,
+        start_time,
+        end_time,
+        reverse,
+        skip,
+        limit,
+        after,
+        before,
     )
+    result = await session.execute(statement)
+    rows = list(result.all())
+    if before:
+        rows.reverse()
+    return rows
+
+
+async def list_latest_sensor_data(
+    *, session: AsyncSession, sensor_ids: Collection[uuid.UUID]
+) -> List[SensorDataPublic]:
+    """
+    The newest reading of each given sensor in a single DISTINCT ON query.
+    Sensors without readings are left out.
+    """
+    if not sensor_ids:
+        return []
 
+    statement = (
+        select(SensorDataTable)
+        .where(col(SensorDataTable.sensor_id).in_(list(sensor_ids)))
+        .distinct(SensorDataTable.sensor_id)
+        .order_by(
+            SensorDataTable.sensor_id,
+            desc(SensorDataTable.created_at),
+            desc(SensorDataTable.id),
+        )
+    )
     result = await session.execute(statement)
-    db_objects = result.scalars().all()
-    return [SensorDataPublic.model_validate(obj) for obj in db_objects]
+    return [to_public(to_domain(obj)) for obj in result.scalars().all()]
+
+
+async def stream_sensor_data(
+    *,
+    session: AsyncSession,
+    sensor_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    chunk_size: int = 5000,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Yields (id, sensor_id, data, created_at) rows of a sensor oldest first,
+    chunk_size rows at a time, from a server-side cursor. Only one chunk is
+    held in memory however long the history is.
+    """
+    statement = (
+        select(*_ROW_COLUMNS)
+        .where(SensorDataTable.sensor_id == sensor_id)
+        .order_by(asc(SensorDataTable.created_at), asc(SensorDataTable.id))
+        .execution_options(yield_per=chunk_size)
+    )
+    if start_time:
+        statement = statement.where(SensorDataTable.created_at >= start_time)
+    if end_time:
+        statement = statement.where(SensorDataTable.created_at <= end_time)
+
+    result = await session.stream(statement)
+    async for partition in result.partitions():
+        yield partition
 
 
 async def count_sensor_data_by_sensor_id(
@@ -59,14 +272,111 @@ async def count_sensor_data_by_sensor_id(
     """Counts the number of records for a given sensor within a specified time range."""
     statement = (
         select(func.count())
-        .select_from(SensorData)
-        .where(SensorData.sensor_id == sensor_id)
+        .select_from(SensorDataTable)
+        .where(SensorDataTable.sensor_id == sensor_id)
     )
 
     if start_time:
-        statement = statement.where(SensorData.created_at >= start_time)
+        statement = statement.where(SensorDataTable.created_at >= start_time)
     if end_time:
-        statement = statement.where(SensorData.created_at <= end_time)
+        statement = statement.where(SensorDataTable.created_at <= end_time)
 
     result = await session.execute(statement)
     return result.scalar_one_or_none()
+
+
+# Aggregates the raw readings can answer in the GROUP BY
+AGGREGATES: dict[str, ColumnElement] = {
+    "count": func.count(),
+    "sum": func.sum(SensorDataTable.data),
+    "min": func.min(SensorDataTable.data),
+    "max": func.max(SensorDataTable.data),
+    "avg": func.avg(SensorDataTable.data),
+    "stddev": func.stddev_samp(SensorDataTable.data),
+}
+
+# Aggregates read per bucket with one index probe each, instead of sorting
+# every reading of the bucket; the order by time and id breaks ties by id
+EDGE_AGGREGATES = {"first": asc, "last": desc}
+
+
+def _edge_reading(
+    buckets: Subquery,
+    start_time: datetime,
+    end_time: datetime,
+    bucket_width: timedelta,
+    order: Callable,
+) -> ScalarSelect:
+    return (
+        select(SensorDataTable.data)
+        .where(
+            SensorDataTable.sensor_id == buckets.c.sensor_id,
+            SensorDataTable.created_at >= buckets.c.bucket_start,
+            SensorDataTable.created_at
+            < buckets.c.bucket_start + literal(bucket_width, Interval()),
+            # Constant bounds let the planner prune sensordata partitions
+            SensorDataTable.created_at >= start_time,
+            SensorDataTable.created_at < end_time,
+        )
+        .order_by(order(SensorDataTable.created_at), order(SensorDataTable.id))
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+async def aggregate_sensor_data(
+    *,
+    session: AsyncSession,
+    sensor_ids: Collection[uuid.UUID],
+    start_time: datetime,
+    end_time: datetime,
+    bucket_width: timedelta,
+    aggregates: Sequence[str],
+) -> list[dict]:
+    """
+    Aggregates raw readings of the given sensors into buckets of bucket_width
+    aligned to start_time, in one GROUP BY over date_bin. First and last are
+    then looked up per bucket through the (sensor_id, created_at) index.
+    Returns one dict per non-empty bucket with sensor_id, bucket_start and
+    the aggregates.
+    """
+    bucket = func.date_bin(
+        literal(bucket_width, Interval()),
+        SensorDataTable.created_at,
+        literal(start_time, DateTime()),
+    ).label("bucket_start")
+    statement = (
+        select(
+            SensorDataTable.sensor_id,
+            bucket,
+            *(
+                AGGREGATES[name].label(name)
+                for name in aggregates
+                if name in AGGREGATES
+            ),
+        )
+        .where(
+            col(SensorDataTable.sensor_id).in_(list(sensor_ids)),
+            SensorDataTable.created_at >= start_time,
+            SensorDataTable.created_at < end_time,
+        )
+        .group_by(SensorDataTable.sensor_id, bucket)
+    )
+
+    if any(name in EDGE_AGGREGATES for name in aggregates):
+        buckets = statement.subquery("buckets")
+        columns = [
+            buckets.c[name]
+            if name in AGGREGATES
+            else _edge_reading(
+                buckets, start_time, end_time, bucket_width, EDGE_AGGREGATES[name]
+            ).label(name)
+            for name in aggregates
+        ]
+        statement = select(buckets.c.sensor_id, buckets.c.bucket_start, *columns)
+        statement = statement.order_by(buckets.c.sensor_id, buckets.c.bucket_start)
+    else:
+        statement = statement.order_by(SensorDataTable.sensor_id, bucket)
+
+    result = await session.execute(statement)
+    return [row._asdict() for row in result.all()]
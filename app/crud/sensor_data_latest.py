@@ -0,0 +1,83 @@
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import batched
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+LatestReading = tuple[float, datetime]
+
+# Keeps a hash only if the reading is newer than the cached one, so late or
+# historical readings never replace a fresher value. ARGV[1] is the TTL,
+# followed by (timestamp, data, created_at) for every key.
+_UPDATE_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+local updated = 0
+for i, key in ipairs(KEYS) do
+    local base = 1 + (i - 1) * 3
+    local current = tonumber(redis.call('HGET', key, 'ts'))
+    if not current or current < tonumber(ARGV[base + 1]) then
+        redis.call('HSET', key, 'ts', ARGV[base + 1], 'data', ARGV[base + 2],
+            'created_at', ARGV[base + 3])
+        updated = updated + 1
+    end
+    if ttl > 0 then
+        redis.call('EXPIRE', key, ttl)
+    end
+end
+return updated
+"""
+
+_KEYS_PER_CALL = 1000
+
+
+def latest_key(sensor_id: uuid.UUID) -> str:
+    return f"{settings.SENSOR_DATA_LATEST_PREFIX}:{sensor_id}"
+
+
+def newest_readings(
+    readings: Iterable[tuple[uuid.UUID, float, datetime]],
+    newest: dict[uuid.UUID, LatestReading] | None = None,
+) -> dict[uuid.UUID, LatestReading]:
+    """Reduces (sensor_id, data, created_at) readings to the newest one per sensor."""
+    newest = {} if newest is None else newest
+    for sensor_id, data, created_at in readings:
+        current = newest.get(sensor_id)
+        if current is None or current[1] < created_at:
+            newest[sensor_id] = (data, created_at)
+    return newest
+
+
+async def update_latest_readings(
+    *, redis_client: redis.Redis, readings: dict[uuid.UUID, LatestReading]
+) -> int:
+    """Stores the readings where they are newer than the cached ones."""
+    script = redis_client.register_script(_UPDATE_SCRIPT)
+    updated = 0
+    for chunk in batched(readings.items(), _KEYS_PER_CALL):
+        args: list = [settings.SENSOR_DATA_LATEST_TTL]
+        for _, (data, created_at) in chunk:
+            args.extend([created_at.timestamp(), repr(data), created_at.isoformat()])
+        updated += await script(
+            keys=[latest_key(sensor_id) for sensor_id, _ in chunk], args=args
+        )
+    return updated
+
+
+async def get_latest_readings(
+    *, redis_client: redis.Redis, sensor_ids: Iterable[uuid.UUID]
+) -> dict[uuid.UUID, LatestReading]:
+    """Cached readings of the given sensors in one round trip; misses are left out."""
+    sensor_ids = list(sensor_ids)
+    pipe = redis_client.pipeline(transaction=False)
+    for sensor_id in sensor_ids:
+        pipe.hmget(latest_key(sensor_id), ["data", "created_at"])
+    results = await pipe.execute()
+
+    cached = {}
+    for sensor_id, (data, created_at) in zip(sensor_ids, results):
+        if data is not None and created_at is not None:
+            cached[sensor_id] = (float(data), datetime.fromisoformat(created_at))
+    return cached
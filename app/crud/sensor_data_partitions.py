@@ -0,0 +1,213 @@
+import re
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from typing import Literal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.persistence.sensor_data import SensorDataTable
+
+PartitionInterval = Literal["day", "month"]
+
+PARENT_TABLE = SensorDataTable.__tablename__
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+# Arbitrary key of the advisory lock that serializes partition creation
+CREATE_LOCK_ID = 0x5E7DA7A0
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def partition_start(day: date, interval: PartitionInterval) -> date:
+    return day if interval == "day" else day.replace(day=1)
+
+
+def next_partition_start(start: date, interval: PartitionInterval) -> date:
+    if interval == "day":
+        return start + timedelta(days=1)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_ranges(
+    first_day: date, last_day: date, interval: PartitionInterval
+) -> list[tuple[date, date]]:
+    """Consecutive [start, end) ranges covering first_day..last_day inclusive."""
+    ranges = []
+    start = partition_start(first_day, interval)
+    while start <= last_day:
+        end = next_partition_start(start, interval)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def upcoming_partition_ranges(
+    today: date, interval: PartitionInterval, ahead: int
+) -> list[tuple[date, date]]:
+    """The current partition range plus `ahead` following ones."""
+    last_start = partition_start(today, interval)
+    for _ in range(ahead):
+        last_start = next_partition_start(last_start, interval)
+    return partition_ranges(today, last_start, interval)
+
+
+def covering_ranges(
+    timestamps: Iterable[datetime], interval: PartitionInterval
+) -> set[tuple[date, date]]:
+    """The partition ranges that the given timestamps fall into."""
+    starts = {partition_start(ts.date(), interval) for ts in timestamps}
+    return {(start, next_partition_start(start, interval)) for start in starts}
+
+
+def uncovered_ranges(
+    ranges: Iterable[tuple[date, date]],
+    partitions: Iterable[tuple[str, datetime, datetime]],
+    cutoff: datetime | None = None,
+) -> list[tuple[date, date]]:
+    """
+    The ranges, oldest first, that overlap none of the existing partitions
+    and do not end before the retention cutoff. Rows of expired ranges are
+    left to the default partition, which retention empties.
+    """
+    bounds = [(start, end) for _, start, end in partitions]
+    uncovered = []
+    for start, end in sorted(ranges):
+        start_at, end_at = _midnight(start), _midnight(end)
+        if cutoff is not None and end_at <= cutoff:
+            continue
+        if not any(start_at < b_end and b_start < end_at for b_start, b_end in bounds):
+            uncovered.append((start, end))
+    return uncovered
+
+
+def retention_cutoff(today: date, retention_days: int | None) -> datetime | None:
+    """Readings older than this are expired, None when kept forever."""
+    if retention_days is None:
+        return None
+    return _midnight(today) - timedelta(days=retention_days)
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def partition_name(start: date) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def create_partition_sql(start: date, end: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} "
+        f"PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def create_default_partition_sql() -> str:
+    return f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+
+
+async def create_partition(*, session: AsyncSession, start: date, end: date) -> bool:
+    """
+    Creates the partition for [start, end) unless it exists. Postgres refuses
+    a partition whose range has rows in the default partition, so such rows,
+    from backfills or from before the partition was planned, are moved into
+    the new table before it is attached. Returns whether it was created.
+    The caller is responsible for committing.
+    """
+    name = partition_name(start)
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(:id)"), {"id": CREATE_LOCK_ID}
+    )
+    exists = await session.execute(text("SELECT to_regclass(:name)"), {"name": name})
+    if exists.scalar() is not None:
+        return False
+
+    bounds = {"start": _midnight(start), "end": _midnight(end)}
+    in_default = await session.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end)"
+        ),
+        bounds,
+    )
+    if not in_default.scalar():
+        await session.execute(text(create_partition_sql(start, end)))
+        return True
+
+    await session.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    await session.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    await session.execute(
+        text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
+    return True
+
+
+async def list_default_partition_ranges(
+    *, session: AsyncSession, interval: PartitionInterval
+) -> set[tuple[date, date]]:
+    """The partition ranges of the rows sitting in the default partition."""
+    result = await session.execute(
+        text(f"SELECT DISTINCT date_trunc(:unit, created_at) FROM {DEFAULT_PARTITION}"),
+        {"unit": interval},
+    )
+    return covering_ranges(result.scalars().all(), interval)
+
+
+async def delete_expired_default_rows(*, session: AsyncSession, cutoff: datetime) -> int:
+    """
+    Deletes default partition rows older than the retention cutoff, which
+    retiring range partitions never reaches. The caller is responsible for
+    committing.
+    """
+    result = await session.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+        {"cutoff": cutoff},
+    )
+    return result.rowcount
+
+
+async def list_partitions(
+    *, session: AsyncSession
+) -> list[tuple[str, datetime, datetime]]:
+    """Returns (name, start, end) of every range partition, oldest first."""
+    statement = text(
+        "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+        "FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent"
+    )
+    result = await session.execute(statement, {"parent": PARENT_TABLE})
+
+    partitions = []
+    for name, bound in result.all():
+        match = _BOUND_RE.search(bound or "")
+        if match:  # The default partition has no range
+            start, end = (datetime.fromisoformat(value) for value in match.groups())
+            partitions.append((name, start, end))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+async def detach_partition(*, session: AsyncSession, name: str) -> None:
+    await session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+
+
+async def drop_partition(*, session: AsyncSession, name: str) -> None:
+    await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
@@ -0,0 +1,238 @@
+import uuid
+from collections.abc import Callable, Collection, Iterable, Sequence
+from datetime import datetime, timedelta
+from itertools import batched
+
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    DateTime,
+    Interval,
+    Uuid,
+    and_,
+    cast,
+    column,
+    delete,
+    literal,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, func, select, text
+
+from app.models.persistence.sensor_data import SensorDataTable
+from app.models.persistence.sensor_data_rollup import (
+    SensorDataDirtyBucketTable,
+    SensorDataRollup1dTable,
+    SensorDataRollup1hTable,
+    SensorDataRollup1mTable,
+    SensorDataRollupBase,
+)
+
+BucketKey = tuple[uuid.UUID, datetime]
+
+# Coarsest first; every rollup is refreshed from the next finer one
+ROLLUPS: list[tuple[str, timedelta, str, type[SensorDataRollupBase]]] = [
+    ("1d", timedelta(days=1), "day", SensorDataRollup1dTable),
+    ("1h", timedelta(hours=1), "hour", SensorDataRollup1hTable),
+    ("1m", timedelta(minutes=1), "minute", SensorDataRollup1mTable),
+]
+
+# Arbitrary key of the advisory lock that serializes rollup refreshes
+REFRESH_LOCK_ID = 0x5E750A7A
+
+# Stays well below the bind parameter limit with two columns per key
+_KEYS_PER_STATEMENT = 10_000
+
+
+def truncate(value: datetime, unit: str) -> datetime:
+    """Python twin of date_trunc for the rollup units."""
+    value = value.replace(second=0, microsecond=0)
+    if unit in ("hour", "day"):
+        value = value.replace(minute=0)
+    if unit == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def choose_rollup(
+    start_time: datetime, end_time: datetime, resolution: timedelta
+) -> str | None:
+    """
+    The coarsest rollup whose buckets tile both the requested range and the
+    requested resolution exactly, or None if only raw data can answer.
+    """
+    for name, width, unit, _ in ROLLUPS:
+        if (
+            resolution % width == timedelta(0)
+            and truncate(start_time, unit) == start_time
+            and truncate(end_time, unit) == end_time
+        ):
+            return name
+    return None
+
+
+def _merged_count(table: type[SensorDataRollupBase]) -> ColumnElement:
+    # sum() of a bigint is numeric in Postgres, which would reach Python as Decimal
+    return cast(func.sum(table.count), BigInteger)
+
+
+def _keys_values(keys: list[BucketKey]):
+    return values(
+        column("sensor_id", Uuid()), column("bucket_start", DateTime()), name="affected"
+    ).data(keys)
+
+
+async def mark_buckets_dirty(
+    *, session: AsyncSession, readings: Iterable[tuple[uuid.UUID, datetime]]
+) -> None:
+    """
+    Records the minute buckets touched by newly written readings, in the
+    same transaction as the readings. Late rows simply dirty old buckets.
+    """
+    keys = sorted({(sensor_id, truncate(ts, "minute")) for sensor_id, ts in readings})
+    for chunk in batched(keys, _KEYS_PER_STATEMENT):
+        statement = (
+            pg_insert(SensorDataDirtyBucketTable)
+            .values([{"sensor_id": s, "bucket_start": b} for s, b in chunk])
+            .on_conflict_do_nothing()
+        )
+        await session.execute(statement)
+
+
+async def try_lock_refresh(*, session: AsyncSession) -> bool:
+    """Transaction-scoped lock, so concurrent refreshes cannot overwrite each other."""
+    result = await session.execute(
+        text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": REFRESH_LOCK_ID}
+    )
+    return bool(result.scalar())
+
+
+async def claim_dirty_buckets(*, session: AsyncSession, limit: int) -> list[BucketKey]:
+    key = tuple_(SensorDataDirtyBucketTable.sensor_id, SensorDataDirtyBucketTable.bucket_start)
+    claimed = (
+        select(SensorDataDirtyBucketTable.sensor_id, SensorDataDirtyBucketTable.bucket_start)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    statement = (
+        delete(SensorDataDirtyBucketTable)
+        .where(key.in_(claimed))
+        .returning(SensorDataDirtyBucketTable.sensor_id, SensorDataDirtyBucketTable.bucket_start)
+    )
+    result = await session.execute(statement)
+    return [(row[0], row[1]) for row in result.all()]
+
+
+async def refresh_rollup(
+    *, session: AsyncSession, name: str, keys: Iterable[BucketKey]
+) -> set[BucketKey]:
+    """
+    Recomputes the given buckets of one rollup from its source: raw readings
+    for 1m, the next finer rollup otherwise. Returns the refreshed bucket keys.
+    """
+    index = [rollup[0] for rollup in ROLLUPS].index(name)
+    _, width, unit, table = ROLLUPS[index]
+    bucket_keys = sorted({(sensor_id, truncate(ts, unit)) for sensor_id, ts in keys})
+    if not bucket_keys:
+        return set()
+
+    if name == "1m":
+        source = SensorDataTable
+        timestamp = SensorDataTable.created_at
+        aggregates = [
+            func.count(),
+            func.sum(SensorDataTable.data),
+            func.min(SensorDataTable.data),
+            func.max(SensorDataTable.data),
+        ]
+    else:
+        source = ROLLUPS[index + 1][3]
+        timestamp = source.bucket_start
+        aggregates = [
+            _merged_count(source),
+            func.sum(source.sum),
+            func.min(source.min),
+            func.max(source.max),
+        ]
+
+    for chunk in batched(bucket_keys, _KEYS_PER_STATEMENT):
+        affected = _keys_values(list(chunk))
+        bucket = func.date_trunc(unit, timestamp)
+        aggregated = (
+            select(source.sensor_id, bucket, *aggregates)
+            .join(
+                affected,
+                and_(
+                    source.sensor_id == affected.c.sensor_id,
+                    timestamp >= affected.c.bucket_start,
+                    timestamp < affected.c.bucket_start + width,
+                ),
+            )
+            # Constant bounds let the planner prune sensordata partitions
+            .where(
+                timestamp >= min(b for _, b in chunk),
+                timestamp < max(b for _, b in chunk) + width,
+            )
+            .group_by(source.sensor_id, bucket)
+        )
+        insert_statement = pg_insert(table).from_select(
+            ["sensor_id", "bucket_start", "count", "sum", "min", "max"], aggregated
+        )
+        statement = insert_statement.on_conflict_do_update(
+            index_elements=["sensor_id", "bucket_start"],
+            set_={
+                field: insert_statement.excluded[field]
+                for field in ("count", "sum", "min", "max")
+            },
+        )
+        await session.execute(statement)
+
+    return set(bucket_keys)
+
+
+# Aggregates that can be merged from rollup buckets without raw readings
+ROLLUP_AGGREGATES: dict[str, Callable[[type[SensorDataRollupBase]], ColumnElement]] = {
+    "count": lambda table: _merged_count(table),
+    "sum": lambda table: func.sum(table.sum),
+    "min": lambda table: func.min(table.min),
+    "max": lambda table: func.max(table.max),
+    "avg": lambda table: func.sum(table.sum) / _merged_count(table),
+}
+
+
+async def list_rollup_buckets(
+    *,
+    session: AsyncSession,
+    name: str,
+    sensor_ids: Collection[uuid.UUID],
+    start_time: datetime,
+    end_time: datetime,
+    bucket_width: timedelta,
+    aggregates: Sequence[str],
+) -> list[dict]:
+    """
+    Merges rollup buckets into buckets of bucket_width aligned to start_time.
+    Returns rows shaped like sensor_data.aggregate_sensor_data.
+    """
+    table = next(rollup[3] for rollup in ROLLUPS if rollup[0] == name)
+    bucket = func.date_bin(
+        literal(bucket_width, Interval()), table.bucket_start, literal(start_time, DateTime())
+    ).label("bucket_start")
+    statement = (
+        select(
+            table.sensor_id,
+            bucket,
+            *(ROLLUP_AGGREGATES[agg](table).label(agg) for agg in aggregates),
+        )
+        .where(
+            col(table.sensor_id).in_(list(sensor_ids)),
+            table.bucket_start >= start_time,
+            table.bucket_start < end_time,
+        )
+        .group_by(table.sensor_id, bucket)
+        .order_by(table.sensor_id, bucket)
+    )
+    result = await session.execute(statement)
+    return [row._asdict() for row in result.all()]
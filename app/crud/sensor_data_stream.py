@@ -0,0 +1,191 @@
+import uuid
+from datetime import datetime
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+from app.core.config import settings
+
+StreamEntry = tuple[str, dict[str, str]]
+
+
+def stream_key(shard: int) -> str:
+    return f"{settings.SENSOR_DATA_STREAM_PREFIX}:{shard}"
+
+
+def dead_letter_key() -> str:
+    return f"{settings.SENSOR_DATA_STREAM_PREFIX}:dead"
+
+
+def shard_lock_key(shard: int) -> str:
+    return f"{settings.SENSOR_DATA_STREAM_PREFIX}:{shard}:lock"
+
+
+def shard_for_sensor(sensor_id: uuid.UUID) -> int:
+    """Readings of one sensor always land on the same shard, keeping their order."""
+    return sensor_id.int % settings.SENSOR_DATA_STREAM_SHARDS
+
+
+def encode_row(row: dict) -> dict[str, str]:
+    return {
+        "sensor_id": str(row["sensor_id"]),
+        "data": repr(row["data"]),
+        "created_at": row["created_at"].isoformat(),
+    }
+
+
+def decode_fields(fields: dict[str, str]) -> dict:
+    """Raises ValueError or KeyError for malformed entries."""
+    return {
+        "sensor_id": uuid.UUID(fields["sensor_id"]),
+        "data": float(fields["data"]),
+        "created_at": datetime.fromisoformat(fields["created_at"]),
+    }
+
+
+async def append_sensor_data(*, redis_client: redis.Redis, rows: list[dict]) -> int:
+    """Appends readings to their shard streams in one pipelined round trip."""
+    pipe = redis_client.pipeline(transaction=False)
+    for row in rows:
+        pipe.xadd(
+            stream_key(shard_for_sensor(row["sensor_id"])),
+            encode_row(row),  # type: ignore[arg-type]
+            maxlen=settings.SENSOR_DATA_STREAM_MAXLEN,
+            approximate=True,
+        )
+    await pipe.execute()
+    return len(rows)
+
+
+# Renew or release the lock only while it still holds this drain's token
+_EXTEND_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+async def acquire_shard_lock(*, redis_client: redis.Redis, shard: int) -> str | None:
+    """A token for the shard's drain lock, or None if another drain holds it."""
+    token = uuid.uuid4().hex
+    acquired = await redis_client.set(
+        shard_lock_key(shard),
+        token,
+        nx=True,
+        px=settings.SENSOR_DATA_STREAM_LOCK_TTL_MS,
+    )
+    return token if acquired else None
+
+
+async def extend_shard_lock(*, redis_client: redis.Redis, shard: int, token: str) -> bool:
+    """Whether the lock was still held and now lasts another LOCK_TTL_MS."""
+    extended = await redis_client.eval(  # type: ignore[misc]
+        _EXTEND_LOCK,
+        1,
+        shard_lock_key(shard),
+        token,
+        settings.SENSOR_DATA_STREAM_LOCK_TTL_MS,
+    )
+    return bool(extended)
+
+
+async def release_shard_lock(*, redis_client: redis.Redis, shard: int, token: str) -> None:
+    await redis_client.eval(_RELEASE_LOCK, 1, shard_lock_key(shard), token)  # type: ignore[misc]
+
+
+async def ensure_consumer_group(*, redis_client: redis.Redis, shard: int) -> None:
+    try:
+        await redis_client.xgroup_create(
+            stream_key(shard), settings.SENSOR_DATA_STREAM_GROUP, id="0", mkstream=True
+        )
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def read_new_entries(
+    *, redis_client: redis.Redis, shard: int, consumer: str, count: int
+) -> list[StreamEntry]:
+    response = await redis_client.xreadgroup(
+        settings.SENSOR_DATA_STREAM_GROUP,
+        consumer,
+        {stream_key(shard): ">"},
+        count=count,
+    )
+    if not response:
+        return []
+    _, entries = response[0]
+    return list(entries)
+
+
+async def claim_stale_entries(
+    *, redis_client: redis.Redis, shard: int, consumer: str, count: int
+) -> tuple[list[StreamEntry], list[StreamEntry]]:
+    """
+    Takes over entries left unacknowledged by failed or crashed workers.
+    Returns (entries to retry, entries that ran out of deliveries).
+    """
+    key = stream_key(shard)
+    idle = settings.SENSOR_DATA_STREAM_CLAIM_IDLE_MS
+    pending = await redis_client.xpending_range(
+        key, settings.SENSOR_DATA_STREAM_GROUP, min="-", max="+", count=count, idle=idle
+    )
+    if not pending:
+        return [], []
+
+    exhausted_ids = {
+        p["message_id"]
+        for p in pending
+        if p["times_delivered"] >= settings.SENSOR_DATA_STREAM_MAX_DELIVERIES
+    }
+    claimed = await redis_client.xclaim(
+        key,
+        settings.SENSOR_DATA_STREAM_GROUP,
+        consumer,
+        min_idle_time=idle,
+        message_ids=[p["message_id"] for p in pending],
+    )
+
+    retry, exhausted = [], []
+    for entry_id, fields in claimed:
+        if fields is None:
+            # Trimmed from the stream while pending, nothing left to retry
+            await ack_entries(redis_client=redis_client, shard=shard, ids=[entry_id])
+        elif entry_id in exhausted_ids:
+            exhausted.append((entry_id, fields))
+        else:
+            retry.append((entry_id, fields))
+    return retry, exhausted
+
+
+async def ack_entries(*, redis_client: redis.Redis, shard: int, ids: list[str]) -> None:
+    if ids:
+        await redis_client.xack(stream_key(shard), settings.SENSOR_DATA_STREAM_GROUP, *ids)
+
+
+async def dead_letter_entries(
+    *, redis_client: redis.Redis, shard: int, entries: list[StreamEntry], reason: str
+) -> None:
+    """Moves entries to the dead-letter stream and acknowledges them."""
+    if not entries:
+        return
+
+    pipe = redis_client.pipeline(transaction=False)
+    for entry_id, fields in entries:
+        pipe.xadd(
+            dead_letter_key(),
+            {**fields, "entry_id": entry_id, "shard": shard, "error": reason},
+            maxlen=settings.SENSOR_DATA_STREAM_MAXLEN,
+            approximate=True,
+        )
+    await pipe.execute()
+    await ack_entries(
+        redis_client=redis_client, shard=shard, ids=[entry_id for entry_id, _ in entries]
+    )
@@ -1,22 +1,27 @@
+import uuid
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    String,
+    Uuid,
+    cast,
+    column,
+    insert,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import func, select
-
-from app.models.persistence.sensor import SensorTable, SensorTypeTable
-from app.models.device import Device
-
-
-async def count_sensor_types(*, session: AsyncSession) -> int | None:
-    statement = select(func.count()).select_from(SensorTypeTable)
-    result = await session.execute(statement)
-    return result.scalar()
+from sqlmodel import col, func, select
 
+from app.core.pagination import Page, PageParams
+from app.crud.bulk import insert_rows
+from app.crud.pagination import paginate
 
-async def list_sensor_types(
-    *, session: AsyncSession, skip: int = 0, limit: int = 100
-) -> list[SensorTypeTable]:
-    statement = select(SensorTypeTable).offset(skip).limit(limit)
-    result = await session.execute(statement)
-    return list(result.scalars().all())
+from app.models.persistence.sensor import SensorTable, SensorTypeTable
+from app.models.persistence.device import DeviceTable
+from app.models.persistence.row_version import ROW_VERSION
 
 
 async def get_sensor_type_by_name(
@@ -27,13 +32,20 @@ async def get_sensor_type_by_name(
     return result.scalar_one_or_none()
 
 
+async def list_all_sensor_types(*, session: AsyncSession) -> Sequence[SensorTypeTable]:
+    """Every sensor type ordered by id, for the in-memory catalog."""
+    result = await session.execute(select(SensorTypeTable).order_by(SensorTypeTable.id))
+    return result.scalars().all()
+
+
 async def create_sensor_type(
     *, session: AsyncSession, name: str, unit: str
 ) -> SensorTypeTable:
-    db_obj = SensorTypeTable(name=name, unit=unit)
-    session.add(db_obj)
+    statement = (
+        insert(SensorTypeTable).values(name=name, unit=unit).returning(SensorTypeTable)
+    )
+    db_obj = (await session.execute(statement)).scalar_one()
     await session.commit()
-    await session.refresh(db_obj)
     return db_obj
 
 
@@ -41,49 +53,184 @@ async def get_sensor_by_id(*, session: AsyncSession, sensor_id: str) -> SensorTa
     return await session.get(SensorTable, sensor_id)
 
 
-async def count_user_sensors(*, session: AsyncSession, user_id: str) -> int | None:
-    statement = select(func.count()).select_from(SensorTable).join(Device).where(Device.user_id == user_id)
+async def get_sensor_with_owner(
+    *, session: AsyncSession, sensor_id: uuid.UUID
+) -> tuple[SensorTable, uuid.UUID] | None:
+    """The sensor and the id of the user owning its device, in one joined query."""
+    statement = (
+        select(SensorTable, DeviceTable.user_id)
+        .join(DeviceTable)
+        .where(SensorTable.id == sensor_id)
+    )
     result = await session.execute(statement)
-    return result.scalar()
+    row = result.first()
+    return (row[0], row[1]) if row else None
 
 
 async def list_user_sensors(
-    *, session: AsyncSession, user_id: str, skip: int = 0, limit: int = 100
-) -> list[SensorTable]:
+    *, session: AsyncSession, user_id: uuid.UUID, params: PageParams
+) -> Page[SensorTable]:
+    """Sensors on all of the user's devices, ordered by name."""
+    return await paginate(
+        session=session,
+        statement=(
+            select(SensorTable).join(DeviceTable).where(DeviceTable.user_id == user_id)
+        ),
+        sort_columns=(SensorTable.name, SensorTable.id),
+        params=params,
+    )
+
+
+async def get_user_sensors_watermark(
+    *, session: AsyncSession, user_id: uuid.UUID
+) -> tuple[int, int]:
+    """
+    Count and highest row version of the sensors on the user's devices.
+    Every insert, update or delete among them changes the pair.
+    """
     statement = (
-        select(SensorTable).join(Device).where(Device.user_id == user_id).offset(skip).limit(limit)
+        select(func.count(), func.coalesce(func.max(SensorTable.version), 0))
+        .join(DeviceTable)
+        .where(DeviceTable.user_id == user_id)
     )
+    count, version = (await session.execute(statement)).one()
+    return count, version
+
+
+async def list_device_sensor_ids(
+    *,
+    session: AsyncSession,
+    device_id: uuid.UUID,
+    sensor_ids: Iterable[uuid.UUID] | None = None,
+) -> set[uuid.UUID]:
+    """
+    Returns the subset of the given sensor ids that belong to the device,
+    or all of the device's sensor ids when none are given.
+    """
+    statement = select(SensorTable.id).where(SensorTable.device_id == device_id)
+    if sensor_ids is not None:
+        statement = statement.where(col(SensorTable.id).in_(list(sensor_ids)))
     result = await session.execute(statement)
-    return list(result.scalars().all())
+    return set(result.scalars().all())
+
+
+async def list_user_sensor_ids(
+    *,
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    sensor_ids: Iterable[uuid.UUID] | None = None,
+) -> set[uuid.UUID]:
+    """
+    Returns the subset of the given sensor ids that belong to the user,
+    or all of the user's sensor ids when none are given.
+    """
+    statement = select(SensorTable.id).join(DeviceTable).where(DeviceTable.user_id == user_id)
+    if sensor_ids is not None:
+        statement = statement.where(col(SensorTable.id).in_(list(sensor_ids)))
+    result = await session.execute(statement)
+    return set(result.scalars().all())
+
+
+async def list_existing_sensor_ids(
+    *, session: AsyncSession, sensor_ids: Iterable[uuid.UUID]
+) -> set[uuid.UUID]:
+    """Returns the subset of the given sensor ids that still exist."""
+    statement = select(SensorTable.id).where(col(SensorTable.id).in_(list(sensor_ids)))
+    result = await session.execute(statement)
+    return set(result.scalars().all())
 
 
 async def create_sensor(
     *, session: AsyncSession, name: str, is_active: bool, type_id: int, device_id: str
 ) -> SensorTable:
-    db_obj = SensorTable(
-        name=name, 
-        is_active=is_active, 
-        type_id=type_id, 
-        device_id=device_id
+    statement = (
+        insert(SensorTable)
+        .values(
+            id=uuid.uuid4(),
+            name=name,
+            is_active=is_active,
+            type_id=type_id,
+            device_id=device_id,
+        )
+        .returning(SensorTable)
     )
-    session.add(db_obj)
+    db_obj = (await session.execute(statement)).scalar_one()
     await session.commit()
-    await session.refresh(db_obj)
     return db_obj
 
 
+async def create_sensors(*, session: AsyncSession, rows: Sequence[dict]) -> None:
+    """
+    Inserts sensors given as id, name, is_active, type_id and device_id in
+    one statement. The caller is responsible for committing.
+    """
+    await insert_rows(
+        session=session,
+        table=SensorTable,
+        columns=("id", "name", "is_active", "type_id", "device_id"),
+        rows=rows,
+    )
+
+
 async def update_sensor(
     *, session: AsyncSession, db_sensor: SensorTable, update_data: dict
 ) -> SensorTable:
-    for key, value in update_data.items():
-        setattr(db_sensor, key, value)
+    if not update_data:
+        return db_sensor
 
-    session.add(db_sensor)
+    statement = (
+        update(SensorTable)
+        .where(SensorTable.id == db_sensor.id)
+        .values(**update_data, version=ROW_VERSION.next_value())
+        .returning(SensorTable)
+        .execution_options(populate_existing=True)
+    )
+    db_sensor = (await session.execute(statement)).scalar_one()
     await session.commit()
-    await session.refresh(db_sensor)
     return db_sensor
 
 
+async def bulk_update_user_sensors(
+    *, session: AsyncSession, user_id: uuid.UUID, updates: Sequence[dict]
+) -> list[SensorTable]:
+    """
+    Applies per-sensor changes to sensors on the user's devices in one
+    UPDATE ... FROM VALUES ... RETURNING, shaped like
+    devices.bulk_update_user_devices. The caller is responsible for committing.
+    """
+    changes = values(
+        column("id", Uuid()),
+        column("name", String()),
+        column("is_active", Boolean()),
+        column("type_id", Integer()),
+        name="changes",
+    ).data(
+        [
+            (item["id"], item.get("name"), item.get("is_active"), item.get("type_id"))
+            for item in updates
+        ]
+    )
+    statement = (
+        update(SensorTable)
+        .where(
+            SensorTable.id == changes.c.id,
+            SensorTable.device_id == DeviceTable.id,
+            DeviceTable.user_id == user_id,
+        )
+        .values(
+            # An all-NULL VALUES column is typed text, hence the casts
+            name=func.coalesce(cast(changes.c.name, String), SensorTable.name),
+            is_active=func.coalesce(cast(changes.c.is_active, Boolean), SensorTable.is_active),
+            type_id=func.coalesce(cast(changes.c.type_id, Integer), SensorTable.type_id),
+            version=ROW_VERSION.next_value(),
+        )
+        .returning(SensorTable)
+        .execution_options(synchronize_session="fetch", populate_existing=True)
+    )
+    result = await session.execute(statement)
+    return list(result.scalars().all())
+
+
 async def delete_sensor(*, session: AsyncSession, db_sensor: SensorTable) -> None:
     await session.delete(db_sensor)
     await session.commit()
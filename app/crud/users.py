@@ -1,35 +1,51 @@
+import uuid
+
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import func, select
 
-from app.core.security import get_password_hash, verify_password
+from app.core.pagination import Page, PageParams
+from app.core.security import verify_password_async
+from app.crud.pagination import paginate
+from app.models.persistence.row_version import ROW_VERSION
 from app.models.persistence.user import UserTable
 
 
 async def create_user(*, session: AsyncSession, email: str, hashed_password: str, full_name: str | None = None, is_superuser: bool = False) -> UserTable:
-    db_obj = UserTable(
-        email=email,
-        hashed_password=hashed_password,
-        full_name=full_name,
-        is_superuser=is_superuser,
+    statement = (
+        insert(UserTable)
+        .values(
+            id=uuid.uuid4(),
+            email=email,
+            hashed_password=hashed_password,
+            full_name=full_name,
+            is_superuser=is_superuser,
+        )
+        .returning(UserTable)
     )
-    session.add(db_obj)
+    db_obj = (await session.execute(statement)).scalar_one()
     await session.commit()
-    await session.refresh(db_obj)
     return db_obj
 
 
-async def count_users(*, session: AsyncSession) -> int | None:
-    statement = select(func.count()).select_from(UserTable)
-    result = await session.execute(statement)
-    return result.scalar()
+async def list_users(*, session: AsyncSession, params: PageParams) -> Page[UserTable]:
+    return await paginate(
+        session=session,
+        statement=select(UserTable),
+        sort_columns=(UserTable.email,),
+        params=params,
+    )
 
 
-async def list_users(
-    *, session: AsyncSession, skip: int = 0, limit: int = 100
-) -> list[UserTable]:
-    statement = select(UserTable).offset(skip).limit(limit)
-    result = await session.execute(statement)
-    return list(result.scalars().all())
+async def get_users_watermark(*, session: AsyncSession) -> tuple[int, int]:
+    """Count and highest row version of all users; every write changes the pair."""
+    statement = select(func.count(), func.coalesce(func.max(UserTable.version), 0))
+    count, version = (await session.execute(statement)).one()
+    return count, version
+
+
+async def get_user_by_id(*, session: AsyncSession, user_id: uuid.UUID) -> UserTable | None:
+    return await session.get(UserTable, user_id)
 
 
 async def get_user_by_email(*, session: AsyncSession, email: str) -> UserTable | None:
@@ -41,21 +57,32 @@ async def get_user_by_email(*, session: AsyncSession, email: str) -> UserTable |
 async def update_user(
     *, session: AsyncSession, db_user: UserTable, update_data: dict
 ) -> UserTable:
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
-    
-    session.add(db_user)
+    if not update_data:
+        return db_user
+
+    statement = (
+        update(UserTable)
+        .where(UserTable.id == db_user.id)
+        .values(**update_data, version=ROW_VERSION.next_value())
+        .returning(UserTable)
+        .execution_options(populate_existing=True)
+    )
+    db_user = (await session.execute(statement)).scalar_one()
     await session.commit()
-    await session.refresh(db_user)
     return db_user
 
 
+async def delete_user(*, session: AsyncSession, db_user: UserTable) -> None:
+    await session.delete(db_user)
+    await session.commit()
+
+
 async def authenticate(
     *, session: AsyncSession, email: str, password: str
 ) -> UserTable | None:
     db_user = await get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    if not await verify_password_async(password, db_user.hashed_password):
         return None
     return db_user
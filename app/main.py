@@ -4,9 +4,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.api.main import api_router
+from app.core.compression import mount_compression
 from app.core.config import settings
 from app.core.db import close_async_db, connect_async_db, db_ready
+from app.core.metrics import mount_metrics, start_metrics, stop_metrics
+from app.core.profiling import mount_query_profiler
 from app.core.redis import close_redis, connect_redis
+from app.core.security import shutdown_password_hashing
+from app.services.catalog_cache import start_catalog_cache, stop_catalog_cache
 
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND")
@@ -21,13 +26,23 @@ async def lifespan(app: FastAPI):
     await connect_redis(app)
     await connect_async_db(app)
     await db_ready(app)
+    await start_metrics(app)
+    await start_catalog_cache(app)
 
     yield
 
+    await stop_catalog_cache(app)
+    await stop_metrics(app)
     await close_async_db(app)
     await close_redis(app)
+    shutdown_password_hashing()
 
 
 app = FastAPI(title="IoT Manager API", version="1.0.0", lifespan=lifespan)
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+# Added first so it sits innermost: metrics and the profiler time compression
+mount_compression(app)
+mount_metrics(app)
+if settings.SQL_PROFILER_ENABLED:
+    mount_query_profiler(app)
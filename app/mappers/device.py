@@ -11,6 +11,7 @@ def to_domain(table: DeviceTable) -> Device:
         is_active=table.is_active,
         type_id=table.type_id,
         user_id=table.user_id,
+        version=table.version,
     )
 
 
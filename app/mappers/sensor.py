@@ -11,6 +11,7 @@ def to_domain(table: SensorTable) -> Sensor:
         is_active=table.is_active,
         type_id=table.type_id,
         device_id=table.device_id,
+        version=table.version,
     )
 
 
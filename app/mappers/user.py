@@ -10,6 +10,7 @@ def to_domain(user_table: UserTable) -> User:
         email=user_table.email,
         is_superuser=user_table.is_superuser,
         full_name=user_table.full_name,
+        version=user_table.version,
     )
 
 
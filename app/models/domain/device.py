@@ -13,3 +13,5 @@ class Device:
     is_active: bool
     type_id: int
     user_id: uuid.UUID
+    # Row version, 0 until the row is stored
+    version: int = 0
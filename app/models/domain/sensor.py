@@ -14,3 +14,5 @@ class Sensor:
     is_active: bool
     type_id: int
     device_id: uuid.UUID
+    # Row version, 0 until the row is stored
+    version: int = 0
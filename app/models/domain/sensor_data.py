@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from datetime import datetime
+import uuid
 
 @dataclass
 class SensorData:
     id: int
     data: float
-    sensor_id: str
+    sensor_id: uuid.UUID
     created_at: datetime
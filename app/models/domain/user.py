@@ -7,3 +7,5 @@ class User:
     email: str
     is_superuser: bool
     full_name: str | None
+    # Row version, 0 until the row is stored
+    version: int = 0
@@ -0,0 +1,23 @@
+from .device import DeviceTable, DeviceTypeTable
+from .sensor import SensorTable, SensorTypeTable
+from .sensor_data import SensorDataTable
+from .sensor_data_rollup import (
+    SensorDataDirtyBucketTable,
+    SensorDataRollup1dTable,
+    SensorDataRollup1hTable,
+    SensorDataRollup1mTable,
+)
+from .user import UserTable
+
+__all__ = [
+    "DeviceTable",
+    "DeviceTypeTable",
+    "SensorTable",
+    "SensorTypeTable",
+    "SensorDataTable",
+    "SensorDataDirtyBucketTable",
+    "SensorDataRollup1mTable",
+    "SensorDataRollup1hTable",
+    "SensorDataRollup1dTable",
+    "UserTable",
+]
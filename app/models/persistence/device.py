@@ -1,7 +1,10 @@
 from typing import TYPE_CHECKING, Optional
 import uuid
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
+from app.models.persistence.row_version import version_column
+
 if TYPE_CHECKING:
     from app.models.persistence.user import UserTable
     from app.models.persistence.sensor import SensorTable
@@ -17,11 +20,14 @@ class DeviceTypeTable(SQLModel, table=True):
 
 class DeviceTable(SQLModel, table=True):
     __tablename__ = "device"
+    # Serves the per-user device listing in keyset order
+    __table_args__ = (Index("ix_device_user_id_name_id", "user_id", "name", "id"),)
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str = Field(index=True)
     is_active: bool = Field(default=False)
     type_id: int = Field(foreign_key="devicetype.id", nullable=False)
     user_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, ondelete="CASCADE")
+    version: int = Field(sa_column=version_column())
 
     type: "DeviceTypeTable" = Relationship(back_populates="devices")
     user: "UserTable" = Relationship(back_populates="devices")
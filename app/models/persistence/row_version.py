@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, Sequence
+from sqlmodel import SQLModel
+
+# Shared by every versioned table. Each insert and update stamps its row with
+# the next value, so the count and max(version) of any set of rows change
+# with every write to it; they serve as the watermark of a listing.
+ROW_VERSION = Sequence("row_version_seq", metadata=SQLModel.metadata)
+
+
+def version_column() -> Column:
+    return Column(
+        BigInteger,
+        ROW_VERSION,
+        server_default=ROW_VERSION.next_value(),
+        nullable=False,
+    )
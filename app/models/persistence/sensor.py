@@ -1,8 +1,11 @@
 import uuid
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
+from app.models.persistence.row_version import version_column
+
 if TYPE_CHECKING:
     from app.models.persistence.device import DeviceTable
     from app.models.persistence.sensor_data import SensorDataTable
@@ -19,12 +22,17 @@ class SensorTypeTable(SQLModel, table=True):
 
 class SensorTable(SQLModel, table=True):
     __tablename__ = "sensor"
+    # Serves per-device sensor lookups in keyset order
+    __table_args__ = (Index("ix_sensor_device_id_name_id", "device_id", "name", "id"),)
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str = Field(index=True)
     is_active: bool = Field(default=False)
     type_id: int = Field(foreign_key="sensortype.id", nullable=False)
     device_id: uuid.UUID = Field(foreign_key="device.id", nullable=False, ondelete="CASCADE")
+    version: int = Field(sa_column=version_column())
 
     type: "SensorTypeTable" = Relationship(back_populates="sensors")
     device: "DeviceTable" = Relationship(back_populates="sensors")
-    data: list["SensorDataTable"] = Relationship(back_populates="sensor")
+    data: list["SensorDataTable"] = Relationship(
+        back_populates="sensor", passive_deletes="all"
+    )
@@ -1,6 +1,8 @@
+import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import BigInteger, Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -9,10 +11,32 @@ if TYPE_CHECKING:
 
 class SensorDataTable(SQLModel, table=True):
     __tablename__ = "sensordata"
+    __table_args__ = (
+        # Serves both the per-sensor filter and the newest-first keyset order
+        Index(
+            "ix_sensordata_sensor_id_created_at",
+            "sensor_id",
+            "created_at",
+            "id",
+            postgresql_ops={"created_at": "DESC", "id": "DESC"},
+        ),
+        # Range partitions are managed by app.tasks.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Optional[int] = Field(default=None, primary_key=True)
+    id: Optional[int] = Field(
+        default=None,
+        primary_key=True,
+        sa_type=BigInteger,
+        sa_column_kwargs={"autoincrement": True},
+    )
     data: float = Field(description="The measured sensor value.")
-    sensor_id: str = Field(foreign_key="sensor.id", index=True, nullable=False)
-    created_at: datetime = Field(default_factory=datetime.now, nullable=False)
+    sensor_id: uuid.UUID = Field(
+        foreign_key="sensor.id", nullable=False, ondelete="CASCADE"
+    )
+    # Part of the primary key because Postgres requires the partition key in it
+    created_at: datetime = Field(
+        default_factory=datetime.now, primary_key=True, nullable=False
+    )
 
     sensor: "SensorTable" = Relationship(back_populates="data")
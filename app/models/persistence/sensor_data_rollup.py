@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger
+from sqlmodel import Field, SQLModel
+
+
+class SensorDataRollupBase(SQLModel):
+    """
+    Aggregates of the readings of one sensor over one time bucket.
+    Sum and count are stored instead of the average so that buckets can be
+    merged into coarser ones exactly.
+    """
+
+    sensor_id: uuid.UUID = Field(
+        foreign_key="sensor.id", primary_key=True, ondelete="CASCADE"
+    )
+    bucket_start: datetime = Field(primary_key=True)
+    count: int = Field(sa_type=BigInteger)
+    sum: float
+    min: float
+    max: float
+
+
+class SensorDataRollup1mTable(SensorDataRollupBase, table=True):
+    __tablename__ = "sensordata_rollup_1m"
+
+
+class SensorDataRollup1hTable(SensorDataRollupBase, table=True):
+    __tablename__ = "sensordata_rollup_1h"
+
+
+class SensorDataRollup1dTable(SensorDataRollupBase, table=True):
+    __tablename__ = "sensordata_rollup_1d"
+
+
+class SensorDataDirtyBucketTable(SQLModel, table=True):
+    """Minute buckets that received readings since the rollups were last refreshed."""
+
+    __tablename__ = "sensordata_rollup_dirty"
+
+    sensor_id: uuid.UUID = Field(primary_key=True)
+    bucket_start: datetime = Field(primary_key=True)
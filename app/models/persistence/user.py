@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING
 from pydantic import EmailStr
 from sqlmodel import Field, Relationship, SQLModel
 
+from app.models.persistence.row_version import version_column
+
 if TYPE_CHECKING:
     from app.models.device import Device as DeviceTable
 
@@ -16,5 +18,6 @@ class UserTable(SQLModel, table=True):
     is_superuser: bool = False
     full_name: str | None = Field(default=None, max_length=255)
     hashed_password: str
+    version: int = Field(sa_column=version_column())
 
     devices: list["DeviceTable"] = Relationship(back_populates="user", cascade_delete=True)
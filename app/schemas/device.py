@@ -1,6 +1,12 @@
 import uuid
 from typing import List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.schemas.sensor import SensorBase, SensorPublic
+
+# Upper bounds for one provisioning manifest
+MAX_PROVISION_DEVICES = 10_000
+MAX_PROVISION_SENSORS = 100_000
 
 class DeviceTypeBase(BaseModel):
     name: str = Field(max_length=255)
@@ -13,7 +19,10 @@ class DeviceTypePublic(DeviceTypeBase):
 
 class DeviceTypesPublic(BaseModel):
     data: List[DeviceTypePublic]
-    count: int
+    count: int | None = Field(description="Total rows, null when with_count is false.")
+    next_cursor: str | None = Field(
+        default=None, description="Pass as 'after' to get the next page."
+    )
 
 class DeviceBase(BaseModel):
     name: str = Field(max_length=255)
@@ -27,9 +36,48 @@ class DeviceUpdate(BaseModel):
     is_active: bool | None = Field(default=None)
     type_id: int | None = Field(default=None)
 
+class DeviceBulkUpdateItem(DeviceUpdate):
+    id: uuid.UUID
+
+class DevicesBulkUpdate(BaseModel):
+    data: List[DeviceBulkUpdateItem] = Field(min_length=1, max_length=1000)
+
+    @field_validator("data")
+    @classmethod
+    def check_unique_ids(cls, data: List[DeviceBulkUpdateItem]) -> List[DeviceBulkUpdateItem]:
+        if len({item.id for item in data}) != len(data):
+            raise ValueError("Every device may appear only once")
+        return data
+
+class DeviceProvisionSensor(SensorBase):
+    type_id: int
+
+class DeviceProvision(DeviceCreate):
+    sensors: List[DeviceProvisionSensor] = Field(default_factory=list)
+
+class DevicesProvision(BaseModel):
+    data: List[DeviceProvision] = Field(min_length=1, max_length=MAX_PROVISION_DEVICES)
+
+    @field_validator("data")
+    @classmethod
+    def check_sensor_count(cls, data: List[DeviceProvision]) -> List[DeviceProvision]:
+        if sum(len(device.sensors) for device in data) > MAX_PROVISION_SENSORS:
+            raise ValueError(f"At most {MAX_PROVISION_SENSORS} sensors per manifest")
+        return data
+
 class DevicePublic(DeviceBase):
     id: uuid.UUID
 
+class ProvisionedDevicePublic(DevicePublic):
+    sensors: List[SensorPublic]
+
+class DevicesProvisionedPublic(BaseModel):
+    data: List[ProvisionedDevicePublic]
+    count: int
+
 class DevicesPublic(BaseModel):
     data: List[DevicePublic]
-    count: int
+    count: int | None = Field(description="Total rows, null when with_count is false.")
+    next_cursor: str | None = Field(
+        default=None, description="Pass as 'after' to get the next page."
+    )
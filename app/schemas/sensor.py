@@ -1,6 +1,6 @@
 import uuid
 from typing import List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 class SensorTypeBase(BaseModel):
     name: str = Field(max_length=255)
@@ -14,7 +14,10 @@ class SensorTypePublic(SensorTypeBase):
 
 class SensorTypesPublic(BaseModel):
     data: List[SensorTypePublic]
-    count: int
+    count: int | None = Field(description="Total rows, null when with_count is false.")
+    next_cursor: str | None = Field(
+        default=None, description="Pass as 'after' to get the next page."
+    )
 
 class SensorBase(BaseModel):
     name: str = Field(max_length=255)
@@ -29,9 +32,25 @@ class SensorUpdate(BaseModel):
     is_active: bool | None = Field(default=None)
     type_id: int | None = Field(default=None)
 
+class SensorBulkUpdateItem(SensorUpdate):
+    id: uuid.UUID
+
+class SensorsBulkUpdate(BaseModel):
+    data: List[SensorBulkUpdateItem] = Field(min_length=1, max_length=1000)
+
+    @field_validator("data")
+    @classmethod
+    def check_unique_ids(cls, data: List[SensorBulkUpdateItem]) -> List[SensorBulkUpdateItem]:
+        if len({item.id for item in data}) != len(data):
+            raise ValueError("Every sensor may appear only once")
+        return data
+
 class SensorPublic(SensorBase):
     id: uuid.UUID
 
 class SensorsPublic(BaseModel):
     data: List[SensorPublic]
-    count: int
+    count: int | None = Field(description="Total rows, null when with_count is false.")
+    next_cursor: str | None = Field(
+        default=None, description="Pass as 'after' to get the next page."
+    )
@@ -1,13 +1,18 @@
-from datetime import datetime
-from typing import List
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Literal
 from pydantic import BaseModel, Field
 
+# Upper bound for a single ingestion request; keeps one INSERT well below
+# the 32767 bind parameters asyncpg allows per statement.
+MAX_BATCH_SIZE = 5000
+
 class SensorDataBase(BaseModel):
     data: float = Field(description="The measured sensor value.")
-    sensor_id: str
+    sensor_id: uuid.UUID
 
 class SensorDataCreate(SensorDataBase):
-    pass
+    data: float = Field(description="The measured sensor value.", allow_inf_nan=False)
 
 class SensorDataPublic(SensorDataBase):
     id: int
@@ -16,3 +21,100 @@ class SensorDataPublic(SensorDataBase):
 class SensorDatasPublic(BaseModel):
     data: List[SensorDataPublic]
     count: int
+
+class SensorDataPagePublic(BaseModel):
+    data: List[SensorDataPublic]
+    next_cursor: str | None = Field(
+        default=None, description="Pass as 'after' to get the next page."
+    )
+    prev_cursor: str | None = Field(
+        default=None, description="Pass as 'before' to get the previous page."
+    )
+
+class SensorDataBucketPublic(BaseModel):
+    bucket_start: datetime
+    count: int
+    min: float
+    max: float
+    avg: float
+    sum: float
+
+class SensorDataBucketsPublic(BaseModel):
+    sensor_id: uuid.UUID
+    resolution: timedelta
+    source: str = Field(description="Rollup the buckets were built from, or 'raw'.")
+    data: List[SensorDataBucketPublic]
+
+SensorDataAggregate = Literal["min", "max", "avg", "sum", "count", "first", "last", "stddev"]
+
+class SensorDataAggregatePublic(BaseModel):
+    sensor_id: uuid.UUID
+    bucket_start: datetime
+    # Only the requested aggregates are set
+    min: float | None = None
+    max: float | None = None
+    avg: float | None = None
+    sum: float | None = None
+    count: int | None = None
+    first: float | None = None
+    last: float | None = None
+    stddev: float | None = Field(
+        default=None, description="Sample standard deviation, null for a single reading."
+    )
+
+class SensorDataAggregatesPublic(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    bucket_width: timedelta
+    aggregates: List[SensorDataAggregate]
+    source: str = Field(description="Rollup the buckets were built from, or 'raw'.")
+    data: List[SensorDataAggregatePublic]
+
+class SensorLatestReadingPublic(BaseModel):
+    sensor_id: uuid.UUID
+    data: float | None = Field(default=None, description="Null if the sensor has no readings.")
+    created_at: datetime | None = None
+
+class SensorLatestReadingsPublic(BaseModel):
+    data: List[SensorLatestReadingPublic]
+    count: int
+
+class SensorDataReading(BaseModel):
+    # NaN and infinities would poison every sum and average over the sensor
+    data: float = Field(description="The measured sensor value.", allow_inf_nan=False)
+    created_at: datetime | None = Field(
+        default=None, description="Measurement time, defaults to the time of receipt."
+    )
+
+class DeviceSensorDataReading(SensorDataReading):
+    sensor_id: uuid.UUID
+
+class SensorDataBatchCreate(BaseModel):
+    readings: List[SensorDataReading] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+class DeviceSensorDataBatchCreate(BaseModel):
+    readings: List[DeviceSensorDataReading] = Field(
+        min_length=1, max_length=MAX_BATCH_SIZE
+    )
+
+class SensorDataBatchPublic(BaseModel):
+    accepted: int
+    queued: bool = Field(
+        default=False, description="Readings were queued and will be stored shortly."
+    )
+    sensor_ids: List[uuid.UUID]
+    start_time: datetime
+    end_time: datetime
+
+class SensorDataImportError(BaseModel):
+    line: int
+    detail: str
+
+class SensorDataImportPublic(BaseModel):
+    imported: int
+    rejected: int
+    errors: List[SensorDataImportError] = Field(
+        description="The first rejected rows, the rest are only counted."
+    )
+    elapsed_seconds: float
+    rows_per_second: float
@@ -25,4 +25,7 @@ class UserPublic(UserBase):
 
 class UsersPublic(BaseModel):
     data: list[UserPublic]
-    count: int
+    count: int | None = Field(description="Total rows, null when with_count is false.")
+    next_cursor: str | None = Field(
+        default=None, description="Pass as 'after' to get the next page."
+    )
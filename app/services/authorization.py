@@ -0,0 +1,88 @@
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exceptions.sensor import ErrNotSensorOwner, ErrSensorNotFound
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud import sensors as sensor_crud
+from app.models.domain.user import User
+from app.models.persistence.sensor import SensorTable
+
+
+@dataclass(frozen=True)
+class SensorOwner:
+    device_id: uuid.UUID
+    user_id: uuid.UUID
+
+
+# Sensors never move between devices and devices never change owner,
+# so an entry only goes stale when the sensor or its device is deleted
+_sensor_owners: TTLCache[uuid.UUID, SensorOwner] = TTLCache(
+    maxsize=settings.OWNERSHIP_CACHE_SIZE, ttl=settings.OWNERSHIP_CACHE_TTL
+)
+
+
+def _parse_sensor_id(sensor_id: str | uuid.UUID) -> uuid.UUID:
+    if isinstance(sensor_id, uuid.UUID):
+        return sensor_id
+    try:
+        return uuid.UUID(sensor_id)
+    except ValueError:
+        raise ErrSensorNotFound
+
+
+def _check_owner(user: User, owner: SensorOwner) -> None:
+    if owner.user_id != user.id:
+        raise ErrNotSensorOwner
+
+
+async def authorize_sensor(
+    session: AsyncSession, user: User, sensor_id: str | uuid.UUID
+) -> SensorTable:
+    """
+    Loads a sensor the user owns with one joined query.
+    Raises ErrSensorNotFound or ErrNotSensorOwner.
+    """
+    sensor_uuid = _parse_sensor_id(sensor_id)
+    found = await sensor_crud.get_sensor_with_owner(session=session, sensor_id=sensor_uuid)
+    if not found:
+        _sensor_owners.pop(sensor_uuid)
+        raise ErrSensorNotFound
+
+    sensor, user_id = found
+    owner = SensorOwner(device_id=sensor.device_id, user_id=user_id)
+    _sensor_owners.set(sensor_uuid, owner)
+    _check_owner(user, owner)
+    return sensor
+
+
+async def authorize_sensor_access(
+    session: AsyncSession, user: User, sensor_id: str | uuid.UUID
+) -> uuid.UUID:
+    """
+    Ownership check for operations that do not need the sensor row, such as
+    reading or writing its data: answered from the cache without a query when
+    possible. Returns the parsed sensor id.
+    """
+    sensor_uuid = _parse_sensor_id(sensor_id)
+    owner = _sensor_owners.get(sensor_uuid)
+    if owner is None:
+        await authorize_sensor(session, user, sensor_uuid)
+    else:
+        _check_owner(user, owner)
+    return sensor_uuid
+
+
+def forget_sensor(sensor_id: str | uuid.UUID) -> None:
+    _sensor_owners.pop(uuid.UUID(str(sensor_id)))
+
+
+def forget_device(device_id: str | uuid.UUID) -> None:
+    device_uuid = uuid.UUID(str(device_id))
+    _sensor_owners.pop_where(lambda _, owner: owner.device_id == device_uuid)
+
+
+def forget_user(user_id: uuid.UUID) -> None:
+    _sensor_owners.pop_where(lambda _, owner: owner.user_id == user_id)
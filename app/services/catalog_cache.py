@@ -0,0 +1,251 @@
+import asyncio
+import json
+from bisect import bisect_right
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+import redis.asyncio as redis
+from fastapi import FastAPI
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.compression import compress
+from app.core.config import settings
+from app.core.db import primary_engine
+from app.core.etag import version_etag, weak_etag
+from app.core.pagination import (
+    InvalidCursorError,
+    Page,
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+)
+from app.crud import devices as device_crud
+from app.crud import sensors as sensor_crud
+from app.mappers import device as device_mappers
+from app.mappers import sensor as sensor_mappers
+from app.schemas.device import DeviceTypesPublic
+from app.schemas.sensor import SensorTypesPublic
+
+T = TypeVar("T", bound=BaseModel)
+
+DEVICE_TYPES = "device_types"
+SENSOR_TYPES = "sensor_types"
+
+
+PageBody = tuple[bytes, str | None]
+
+
+def _body_cache() -> TTLCache[tuple, PageBody]:
+    return TTLCache(maxsize=settings.CATALOG_CACHE_BODIES, ttl=settings.CATALOG_CACHE_TTL)
+
+
+@dataclass(frozen=True)
+class Catalog(Generic[T]):
+    """
+    A whole type catalog in id order, with an ETag of its contents and the
+    listing schema its pages are served as.
+    """
+
+    items: list[T]
+    ids: list[int]
+    etag: str
+    listing: type[BaseModel]
+    bodies: TTLCache[tuple, PageBody] = field(
+        default_factory=_body_cache, compare=False, repr=False
+    )
+
+    @classmethod
+    def build(cls, items: list[T], listing: type[BaseModel]) -> "Catalog[T]":
+        payload = json.dumps(
+            [item.model_dump(mode="json") for item in items], separators=(",", ":")
+        )
+        return cls(
+            items=items,
+            ids=[item.id for item in items],  # type: ignore[attr-defined]
+            etag=weak_etag(payload.encode()),
+            listing=listing,
+        )
+
+    def page_etag(self, params: PageParams) -> str:
+        """The ETag of one page, which changes with the catalog and the params."""
+        return version_etag(self.etag, *params.cache_key())
+
+    def page(self, params: PageParams) -> Page[T]:
+        """
+        The page that paginate() returns for this listing ordered by id,
+        cursors included. Raises InvalidCursorError like paginate().
+        """
+        start = 0
+        if params.after:
+            values = decode_cursor(params.after)
+            if len(values) != 1:
+                raise InvalidCursorError("Cursor does not match this listing")
+            try:
+                start = bisect_right(self.ids, int(values[0]))
+            except (TypeError, ValueError) as e:
+                raise InvalidCursorError("Malformed cursor") from e
+
+        start += params.skip
+        items = self.items[start : start + params.limit + 1]
+        has_more = len(items) > params.limit
+        items = items[: params.limit]
+        return Page(
+            items=items,
+            count=len(self.items) if params.with_count else None,
+            next_cursor=encode_cursor(items[-1].id) if has_more else None,  # type: ignore[attr-defined]
+        )
+
+    def body(self, params: PageParams, encoding: str | None) -> PageBody:
+        """
+        The page as a JSON listing body, compressed with encoding when it
+        reaches COMPRESSION_MIN_SIZE, and the content encoding applied. Each
+        page is rendered and compressed once per encoding, then reused until
+        the catalog is dropped.
+        """
+        key = (*params.cache_key(), encoding)
+        cached = self.bodies.get(key)
+        if cached is not None:
+            return cached
+
+        page = self.page(params)
+        body = self.listing(
+            data=page.items, count=page.count, next_cursor=page.next_cursor
+        ).model_dump_json()
+        result: PageBody = (body.encode(), None)
+        if encoding is not None and len(result[0]) >= settings.COMPRESSION_MIN_SIZE:
+            result = (compress(result[0], encoding), encoding)
+        self.bodies.set(key, result)
+        return result
+
+
+async def _load_device_types(session: AsyncSession) -> Catalog:
+    rows = await device_crud.list_all_device_types(session=session)
+    return Catalog.build(
+        [device_mappers.to_public_type(device_mappers.to_domain_type(r)) for r in rows],
+        DeviceTypesPublic,
+    )
+
+
+async def _load_sensor_types(session: AsyncSession) -> Catalog:
+    rows = await sensor_crud.list_all_sensor_types(session=session)
+    return Catalog.build(
+        [sensor_mappers.to_public_type(sensor_mappers.to_domain_type(r)) for r in rows],
+        SensorTypesPublic,
+    )
+
+
+_LOADERS: dict[str, Callable[[AsyncSession], Awaitable[Catalog]]] = {
+    DEVICE_TYPES: _load_device_types,
+    SENSOR_TYPES: _load_sensor_types,
+}
+
+_catalogs: TTLCache[str, Catalog] = TTLCache(
+    maxsize=len(_LOADERS), ttl=settings.CATALOG_CACHE_TTL
+)
+# Bumped by every invalidation, so a load that raced one is not kept
+_generations: dict[str, int] = dict.fromkeys(_LOADERS, 0)
+
+
+async def get_catalog(session: AsyncSession, kind: str) -> Catalog:
+    """The cached catalog, loaded from the primary with one query on a miss."""
+    catalog = _catalogs.get(kind)
+    if catalog is not None:
+        return catalog
+
+    generation = _generations[kind]
+    primary = primary_engine(session)
+    if primary is None:
+        catalog = await _LOADERS[kind](session)
+    else:
+        # A lagging replica could return the catalog from before the latest
+        # invalidation, which would then be served for the whole TTL
+        async with AsyncSession(primary) as primary_session:
+            catalog = await _LOADERS[kind](primary_session)
+    if _generations[kind] == generation:
+        _catalogs.set(kind, catalog)
+    return catalog
+
+
+async def unknown_type_ids(
+    session: AsyncSession, kind: str, type_ids: set[int]
+) -> set[int]:
+    """
+    The ids in type_ids that the catalog does not have. A miss reloads the
+    catalog once, in case another process created the type and its
+    invalidation has not arrived yet.
+    """
+    unknown = type_ids.difference((await get_catalog(session, kind)).ids)
+    if unknown:
+        _drop(kind)
+        unknown = type_ids.difference((await get_catalog(session, kind)).ids)
+    return unknown
+
+
+def _drop(kind: str) -> None:
+    if kind in _generations:
+        _generations[kind] += 1
+        _catalogs.pop(kind)
+
+
+def _drop_all() -> None:
+    for kind in _LOADERS:
+        _drop(kind)
+
+
+async def invalidate_catalog(redis_client: redis.Redis | None, kind: str) -> None:
+    """Drops the catalog here and tells every other API process to drop theirs."""
+    _drop(kind)
+    if redis_client is None:
+        return
+    try:
+        await redis_client.publish(settings.CATALOG_CACHE_CHANNEL, kind)
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish catalog invalidation: {e}")
+
+
+async def _follow_invalidations(redis_client: redis.Redis) -> None:
+    resubscribing = False
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(settings.CATALOG_CACHE_CHANNEL)
+                if resubscribing:
+                    # Anything published while disconnected was missed
+                    _drop_all()
+                resubscribing = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _drop(message["data"])
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Lost the catalog invalidation channel: {e}")
+            await asyncio.sleep(1)
+
+
+async def start_catalog_cache(app: FastAPI) -> None:
+    """Warms the catalogs and follows invalidations published by other processes."""
+    engines = getattr(app.state, "db_engines", None)
+    if engines is not None:
+        try:
+            async with AsyncSession(engines.primary) as session:
+                for kind in _LOADERS:
+                    await get_catalog(session, kind)
+        except Exception as e:
+            logger.warning(f"Could not warm the catalog cache: {e}")
+
+    redis_client = getattr(app.state, "redis_client", None)
+    if redis_client is None:
+        logger.warning(
+            "Catalog changes reach other processes only after CATALOG_CACHE_TTL"
+        )
+        return
+    app.state.catalog_task = asyncio.create_task(_follow_invalidations(redis_client))
+
+
+async def stop_catalog_cache(app: FastAPI) -> None:
+    task: asyncio.Task | None = getattr(app.state, "catalog_task", None)
+    if task:
+        task.cancel()
@@ -1,24 +1,48 @@
+import uuid
+
+import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.exceptions.device import (
     ErrDeviceNotFound,
     ErrDeviceTypeExists,
+    ErrDeviceTypeNotFound,
     ErrNotDeviceOwner,
 )
+from app.api.exceptions.sensor import ErrSensorTypeNotFound
+from app.api.exceptions.conditional import ErrNotModified
+from app.api.exceptions.pagination import ErrInvalidCursor
+from app.core.etag import etag_matches, version_etag
+from app.core.pagination import InvalidCursorError, PageParams
 from app.crud import devices as device_crud
+from app.crud import sensors as sensor_crud
 from app.models.domain.user import User
 from app.models.domain.device import Device
+from app.models.domain.sensor import Sensor
 from app.schemas.device import (
     DeviceCreate,
     DevicePublic,
+    DevicesBulkUpdate,
+    DevicesProvision,
+    DevicesProvisionedPublic,
     DevicesPublic,
     DeviceTypeCreate,
     DeviceTypePublic,
-    DeviceTypesPublic,
     DeviceUpdate,
+    ProvisionedDevicePublic,
+)
+from app.services.authorization import forget_device
+from app.services.catalog_cache import (
+    DEVICE_TYPES,
+    SENSOR_TYPES,
+    get_catalog,
+    invalidate_catalog,
+    unknown_type_ids,
 )
+from app.mappers import sensor as sensor_mappers
 from app.mappers.device import (
     to_domain,
+    to_domain_from_create,
     to_public,
     to_domain_type,
     to_public_type,
@@ -32,24 +56,35 @@ class DeviceService:
     Handles business logic, existence checks, and ownership validation.
     """
 
-    def __init__(self, session: AsyncSession):
-        """Injects the database session into the service instance."""
+    def __init__(
+        self, session: AsyncSession, redis_client: redis.Redis | None = None
+    ):
+        """Injects the database session and Redis client into the service instance."""
         self.session = session
+        self.redis = redis_client
 
     async def list_device_types_service(
-        self, skip: int = 0, limit: int = 100
-    ) -> DeviceTypesPublic:
-        count = await device_crud.count_device_types(session=self.session)
-        if not count:
-            return DeviceTypesPublic(data=[], count=0)
-
-        type_tables = await device_crud.list_device_types(
-            session=self.session, skip=skip, limit=limit
-        )
-        
-        # Map Persistence -> Domain -> Schema
-        types_public = [to_public_type(to_domain_type(tt)) for tt in type_tables]
-        return DeviceTypesPublic(data=types_public, count=count)
+        self,
+        params: PageParams,
+        if_none_match: str | None = None,
+        encoding: str | None = None,
+    ) -> tuple[bytes, str | None, str]:
+        """
+        A page of the cached catalog as a JSON body, precompressed with
+        encoding when large enough, its content encoding and the page's
+        ETag. Raises ErrNotModified when if_none_match already names the
+        same page of the current catalog.
+        """
+        catalog = await get_catalog(self.session, DEVICE_TYPES)
+        etag = catalog.page_etag(params)
+        if etag_matches(if_none_match, etag):
+            raise ErrNotModified(etag)
+        try:
+            body, content_encoding = catalog.body(params, encoding)
+        except InvalidCursorError:
+            raise ErrInvalidCursor
+
+        return body, content_encoding, etag
 
     async def create_device_type_service(
         self, device_type_in: DeviceTypeCreate
@@ -63,18 +98,38 @@ class DeviceService:
         device_type_table = await device_crud.create_device_type(
             session=self.session, name=device_type_in.name
         )
+        await invalidate_catalog(self.redis, DEVICE_TYPES)
         return to_public_type(to_domain_type(device_type_table))
 
-    async def list_user_devices_service(self, user: User) -> DevicesPublic:
-        count = await device_crud.count_user_devices(session=self.session, user_id=user.id)
-        if not count:
-            return DevicesPublic(data=[], count=0)
+    async def list_user_devices_service(
+        self, user: User, params: PageParams, if_none_match: str | None = None
+    ) -> tuple[DevicesPublic, str]:
+        """
+        A page of the user's devices and the ETag of the page. The ETag
+        comes from a count/max(version) watermark read before the page and
+        the page params, so ErrNotModified is raised without reading or
+        serializing the page.
+        """
+        watermark = await device_crud.get_user_devices_watermark(
+            session=self.session, user_id=user.id
+        )
+        etag = version_etag(*watermark, user.id, *params.cache_key())
+        if etag_matches(if_none_match, etag):
+            raise ErrNotModified(etag)
+
+        try:
+            page = await device_crud.list_user_devices(
+                session=self.session, user_id=user.id, params=params
+            )
+        except InvalidCursorError:
+            raise ErrInvalidCursor
 
-        device_tables = await device_crud.list_user_devices(session=self.session, user_id=user.id)
-        
         # Map Persistence -> Domain -> Schema
-        devices_public = [to_public(to_domain(dt)) for dt in device_tables]
-        return DevicesPublic(data=devices_public, count=count)
+        devices_public = [to_public(to_domain(dt)) for dt in page.items]
+        devices = DevicesPublic(
+            data=devices_public, count=page.count, next_cursor=page.next_cursor
+        )
+        return devices, etag
 
     async def create_user_device_service(
         self, user: User, device_in: DeviceCreate
@@ -88,7 +143,84 @@ class DeviceService:
         )
         return to_public(to_domain(device_table))
 
-    async def get_device_info_service(self, user: User, device_id: str) -> DevicePublic:
+    async def provision_user_devices_service(
+        self, user: User, manifest: DevicesProvision
+    ) -> DevicesProvisionedPublic:
+        """
+        Creates every device of the manifest with its sensors in one
+        transaction. Type ids are checked once against the catalogs and the
+        rows go out in a few multi-row INSERTs, not a request per row.
+        """
+        device_type_ids = {device_in.type_id for device_in in manifest.data}
+        unknown = await unknown_type_ids(self.session, DEVICE_TYPES, device_type_ids)
+        if unknown:
+            raise ErrDeviceTypeNotFound(sorted(unknown))
+        sensor_type_ids = {
+            sensor_in.type_id
+            for device_in in manifest.data
+            for sensor_in in device_in.sensors
+        }
+        unknown = await unknown_type_ids(self.session, SENSOR_TYPES, sensor_type_ids)
+        if unknown:
+            raise ErrSensorTypeNotFound(sorted(unknown))
+
+        provisioned: list[tuple[Device, list[Sensor]]] = []
+        for device_in in manifest.data:
+            device = to_domain_from_create(device_in)
+            device.user_id = user.id
+            sensors = [
+                Sensor(
+                    id=uuid.uuid4(),
+                    name=sensor_in.name,
+                    is_active=sensor_in.is_active,
+                    type_id=sensor_in.type_id,
+                    device_id=device.id,
+                )
+                for sensor_in in device_in.sensors
+            ]
+            provisioned.append((device, sensors))
+
+        await device_crud.create_devices(
+            session=self.session,
+            rows=[
+                {
+                    "id": device.id,
+                    "name": device.name,
+                    "is_active": device.is_active,
+                    "type_id": device.type_id,
+                    "user_id": device.user_id,
+                }
+                for device, _ in provisioned
+            ],
+        )
+        await sensor_crud.create_sensors(
+            session=self.session,
+            rows=[
+                {
+                    "id": sensor.id,
+                    "name": sensor.name,
+                    "is_active": sensor.is_active,
+                    "type_id": sensor.type_id,
+                    "device_id": sensor.device_id,
+                }
+                for _, sensors in provisioned
+                for sensor in sensors
+            ],
+        )
+        await self.session.commit()
+
+        devices_public = [
+            ProvisionedDevicePublic(
+                **to_public(device).model_dump(),
+                sensors=[sensor_mappers.to_public(sensor) for sensor in sensors],
+            )
+            for device, sensors in provisioned
+        ]
+        return DevicesProvisionedPublic(data=devices_public, count=len(devices_public))
+
+    async def get_device_info_service(
+        self, user: User, device_id: str, if_none_match: str | None = None
+    ) -> tuple[DevicePublic, str]:
         device_table = await device_crud.get_device_by_id(
             session=self.session, device_id=device_id
         )
@@ -97,7 +229,10 @@ class DeviceService:
         if device_table.user_id != user.id:
             raise ErrNotDeviceOwner
 
-        return to_public(to_domain(device_table))
+        etag = version_etag(device_table.version)
+        if etag_matches(if_none_match, etag):
+            raise ErrNotModified(etag)
+        return to_public(to_domain(device_table)), etag
 
     async def update_user_device_service(
         self, user: User, device_id: str, device_in: DeviceUpdate
@@ -113,6 +248,23 @@ class DeviceService:
         )
         return to_public(to_domain(updated_table))
 
+    async def bulk_update_user_devices_service(
+        self, user: User, devices_in: DevicesBulkUpdate
+    ) -> DevicesPublic:
+        """Updates all given devices in one statement, or none if any is not the user's."""
+        updates = [item.model_dump(exclude_unset=True) for item in devices_in.data]
+        device_tables = await device_crud.bulk_update_user_devices(
+            session=self.session, user_id=user.id, updates=updates
+        )
+        if len(device_tables) != len(updates):
+            await self.session.rollback()
+            raise ErrDeviceNotFound
+        await self.session.commit()
+
+        by_id = {dt.id: dt for dt in device_tables}
+        devices_public = [to_public(to_domain(by_id[item["id"]])) for item in updates]
+        return DevicesPublic(data=devices_public, count=len(devices_public))
+
     async def delete_user_device_service(
         self, user: User, device_id: str
     ) -> None:
@@ -123,3 +275,4 @@ class DeviceService:
             raise ErrNotDeviceOwner
 
         await device_crud.delete_device(session=self.session, db_device=device_table)
+        forget_device(device_table.id)
@@ -0,0 +1,76 @@
+import redis.asyncio as redis
+from loguru import logger
+
+from app.core.config import settings
+
+
+def _account_key(email: str) -> str:
+    return f"{settings.LOGIN_THROTTLE_PREFIX}:account:{email.strip().lower()}"
+
+
+def _ip_key(client_ip: str) -> str:
+    return f"{settings.LOGIN_THROTTLE_PREFIX}:ip:{client_ip}"
+
+
+def _limits(email: str, client_ip: str | None) -> list[tuple[str, int]]:
+    limits = [(_account_key(email), settings.LOGIN_MAX_FAILURES_PER_ACCOUNT)]
+    if client_ip:
+        limits.append((_ip_key(client_ip), settings.LOGIN_MAX_FAILURES_PER_IP))
+    return limits
+
+
+async def login_retry_after(
+    redis_client: redis.Redis | None, email: str, client_ip: str | None
+) -> int | None:
+    """
+    Seconds until the account or the client IP may try again, or None if
+    neither has used up its failures in the current window. Checked before
+    the password, so throttled attempts cost no bcrypt work.
+    Without Redis logins are not throttled.
+    """
+    if redis_client is None:
+        return None
+
+    limits = _limits(email, client_ip)
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, _ in limits:
+                pipe.get(key)
+                pipe.ttl(key)
+            replies = await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not check login throttle: {e}")
+        return None
+
+    retry_after = None
+    for (_, limit), failures, ttl in zip(limits, replies[::2], replies[1::2]):
+        if failures is not None and int(failures) >= limit:
+            wait = ttl if ttl > 0 else settings.LOGIN_THROTTLE_WINDOW
+            retry_after = max(retry_after or 0, wait)
+    return retry_after
+
+
+async def record_login_failure(
+    redis_client: redis.Redis | None, email: str, client_ip: str | None
+) -> None:
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for key, _ in _limits(email, client_ip):
+                # The window starts with the first failure and is not extended
+                pipe.set(key, 0, ex=settings.LOGIN_THROTTLE_WINDOW, nx=True)
+                pipe.incr(key)
+            await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not record login failure: {e}")
+
+
+async def reset_login_failures(redis_client: redis.Redis | None, email: str) -> None:
+    """Clears the account counter; the IP counter keeps running for shared IPs."""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.delete(_account_key(email))
+    except redis.RedisError as e:
+        logger.warning(f"Could not reset login failures: {e}")
@@ -1,25 +1,28 @@
+import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
 from app.api.exceptions.device import ErrDeviceNotFound, ErrNotDeviceOwner
-from app.api.exceptions.sensor import (
-    ErrNotSensorOwner,
-    ErrSensorNotFound,
-    ErrSensorTypeExists,
-)
+from app.api.exceptions.sensor import ErrSensorNotFound, ErrSensorTypeExists
+from app.api.exceptions.conditional import ErrNotModified
+from app.api.exceptions.pagination import ErrInvalidCursor
+from app.core.etag import etag_matches, version_etag
+from app.core.pagination import InvalidCursorError, PageParams
 from app.crud import devices as device_crud
 from app.crud import sensors as sensor_crud
 from app.models.domain.user import User
-from app.models.device import Device
+from app.models.persistence.device import DeviceTable
 from app.schemas.sensor import (
     SensorCreate,
     SensorPublic,
     SensorTypeCreate,
     SensorTypePublic,
     SensorUpdate,
+    SensorsBulkUpdate,
     SensorsPublic,
-    SensorTypesPublic,
 )
+from app.services.authorization import authorize_sensor, forget_sensor
+from app.services.catalog_cache import SENSOR_TYPES, get_catalog, invalidate_catalog
 from app.mappers.sensor import (
     to_domain, 
     to_public, 
@@ -31,12 +34,15 @@ from app.mappers.sensor import (
 
 
 class SensorService:
-    def __init__(self, session: AsyncSession):
-        """Injects the database session into the service instance."""
+    def __init__(
+        self, session: AsyncSession, redis_client: redis.Redis | None = None
+    ):
+        """Injects the database session and Redis client into the service instance."""
         self.session = session
+        self.redis = redis_client
 
     def _check_device_existence_and_owner(
-        self, user: User, device: Device | None
+        self, user: User, device: DeviceTable | None
     ) -> None:
         if not device:
             raise ErrDeviceNotFound
@@ -44,19 +50,27 @@ class SensorService:
             raise ErrNotDeviceOwner
 
     async def list_sensor_types_service(
-        self, skip: int = 0, limit: int = 100
-    ) -> SensorTypesPublic:
-        count = await sensor_crud.count_sensor_types(session=self.session)
-        if not count:
-            return SensorTypesPublic(data=[], count=0)
-
-        type_tables = await sensor_crud.list_sensor_types(
-            session=self.session, skip=skip, limit=limit
-        )
-        
-        # Map Persistence -> Domain -> Schema
-        types_public = [to_public_type(to_domain_type(tt)) for tt in type_tables]
-        return SensorTypesPublic(data=types_public, count=count)
+        self,
+        params: PageParams,
+        if_none_match: str | None = None,
+        encoding: str | None = None,
+    ) -> tuple[bytes, str | None, str]:
+        """
+        A page of the cached catalog as a JSON body, precompressed with
+        encoding when large enough, its content encoding and the page's
+        ETag. Raises ErrNotModified when if_none_match already names the
+        same page of the current catalog.
+        """
+        catalog = await get_catalog(self.session, SENSOR_TYPES)
+        etag = catalog.page_etag(params)
+        if etag_matches(if_none_match, etag):
+            raise ErrNotModified(etag)
+        try:
+            body, content_encoding = catalog.body(params, encoding)
+        except InvalidCursorError:
+            raise ErrInvalidCursor
+
+        return body, content_encoding, etag
 
     async def create_sensor_type_service(
         self, sensor_type_in: SensorTypeCreate
@@ -72,24 +86,42 @@ class SensorService:
             name=sensor_type_in.name, 
             unit=sensor_type_in.unit
         )
+        await invalidate_catalog(self.redis, SENSOR_TYPES)
         return to_public_type(to_domain_type(sensor_type_table))
 
-    async def list_user_sensors_service(self, user: User) -> SensorsPublic:
-        count = await sensor_crud.count_user_sensors(session=self.session, user_id=user.id)
-        if not count:
-            return SensorsPublic(data=[], count=0)
+    async def list_user_sensors_service(
+        self, user: User, params: PageParams, if_none_match: str | None = None
+    ) -> tuple[SensorsPublic, str]:
+        """
+        A page of the user's sensors and the ETag of the listing, from a
+        watermark read before the page; ErrNotModified skips the page.
+        """
+        watermark = await sensor_crud.get_user_sensors_watermark(
+            session=self.session, user_id=user.id
+        )
+        etag = version_etag(*watermark, user.id, *params.cache_key())
+        if etag_matches(if_none_match, etag):
+            raise ErrNotModified(etag)
+
+        try:
+            page = await sensor_crud.list_user_sensors(
+                session=self.session, user_id=user.id, params=params
+            )
+        except InvalidCursorError:
+            raise ErrInvalidCursor
 
-        sensor_tables = await sensor_crud.list_user_sensors(session=self.session, user_id=user.id)
-        
         # Map Persistence -> Domain -> Schema
-        sensors_public = [to_public(to_domain(st)) for st in sensor_tables]
-        return SensorsPublic(data=sensors_public, count=count)
+        sensors_public = [to_public(to_domain(st)) for st in page.items]
+        sensors = SensorsPublic(
+            data=sensors_public, count=page.count, next_cursor=page.next_cursor
+        )
+        return sensors, etag
 
     async def create_user_sensor_service(
         self, user: User, sensor_in: SensorCreate
     ) -> SensorPublic:
         device = await device_crud.get_device_by_id(
-            session=self.session, device_id=sensor_in.device_id
+            session=self.session, device_id=str(sensor_in.device_id)
         )
         self._check_device_existence_and_owner(user, device)
 
@@ -106,19 +138,13 @@ class SensorService:
         self,
         user: User,
         sensor_id: str,
-    ) -> SensorPublic:
-        device = await device_crud.get_device_by_sensor_id(
-            session=self.session, sensor_id=sensor_id
-        )
-        self._check_device_existence_and_owner(user, device)
-
-        sensor_table = await sensor_crud.get_sensor_by_id(
-            session=self.session, sensor_id=sensor_id
-        )
-        if not sensor_table:
-            raise ErrSensorNotFound
-
-        return to_public(to_domain(sensor_table))
+        if_none_match: str | None = None,
+    ) -> tuple[SensorPublic, str]:
+        sensor_table = await authorize_sensor(self.session, user, sensor_id)
+        etag = version_etag(sensor_table.version)
+        if etag_matches(if_none_match, etag):
+            raise ErrNotModified(etag)
+        return to_public(to_domain(sensor_table)), etag
 
     async def update_user_sensor_service(
         self,
@@ -126,36 +152,36 @@ class SensorService:
         sensor_id: str,
         sensor_in: SensorUpdate,
     ) -> SensorPublic:
-        device = await device_crud.get_device_by_sensor_id(
-            session=self.session, sensor_id=sensor_id
-        )
-        self._check_device_existence_and_owner(user, device)
-
-        sensor_table = await sensor_crud.get_sensor_by_id(
-            session=self.session, sensor_id=sensor_id
-        )
-        if not sensor_table:
-            raise ErrSensorNotFound
+        sensor_table = await authorize_sensor(self.session, user, sensor_id)
 
         updated_table = await sensor_crud.update_sensor(
             session=self.session, db_sensor=sensor_table, update_data=sensor_in.model_dump(exclude_unset=True)
         )
         return to_public(to_domain(updated_table))
 
+    async def bulk_update_user_sensors_service(
+        self, user: User, sensors_in: SensorsBulkUpdate
+    ) -> SensorsPublic:
+        """Updates all given sensors in one statement, or none if any is not the user's."""
+        updates = [item.model_dump(exclude_unset=True) for item in sensors_in.data]
+        sensor_tables = await sensor_crud.bulk_update_user_sensors(
+            session=self.session, user_id=user.id, updates=updates
+        )
+        if len(sensor_tables) != len(updates):
+            await self.session.rollback()
+            raise ErrSensorNotFound
+        await self.session.commit()
+
+        by_id = {st.id: st for st in sensor_tables}
+        sensors_public = [to_public(to_domain(by_id[item["id"]])) for item in updates]
+        return SensorsPublic(data=sensors_public, count=len(sensors_public))
+
     async def delete_user_sensor_service(
         self,
         user: User,
         sensor_id: str,
     ) -> None:
-        device = await device_crud.get_device_by_sensor_id(
-            session=self.session, sensor_id=sensor_id
-        )
-        self._check_device_existence_and_owner(user, device)
-
-        sensor_table = await sensor_crud.get_sensor_by_id(
-            session=self.session, sensor_id=sensor_id
-        )
-        if not sensor_table:
-            raise ErrSensorNotFound
+        sensor_table = await authorize_sensor(self.session, user, sensor_id)
 
         await sensor_crud.delete_sensor(session=self.session, db_sensor=sensor_table)
+        forget_sensor(sensor_id)
@@ -0,0 +1,643 @@
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import date, datetime, timedelta
+
+import redis.asyncio as redis
+from fastapi import UploadFile
+from loguru import logger
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exceptions.device import ErrDeviceNotFound, ErrNotDeviceOwner
+from app.api.exceptions.pagination import ErrInvalidCursor
+from app.api.exceptions.sensor import (
+    ErrNotSensorOwner,
+    ErrSensorNotFound,
+    ErrSensorsNotOnDevice,
+)
+from app.api.exceptions.sensor_data import (
+    ErrArrowUnavailable,
+    ErrInvalidImportFile,
+    ErrInvalidTimeRange,
+    ErrTooManyBuckets,
+    ErrTooManySensors,
+    ErrUnsupportedImportFormat,
+)
+from app.api.exceptions.server import ErrServiceUnavailable
+from app.core.config import settings
+from app.core.metrics import SENSOR_DATA_INGESTED_ROWS
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud import devices as device_crud
+from app.crud import sensor_data as sensor_data_crud
+from app.crud import sensor_data_latest as latest_crud
+from app.crud import sensor_data_partitions as partition_crud
+from app.crud import sensor_data_rollups as rollup_crud
+from app.crud import sensor_data_stream as stream_crud
+from app.crud import sensors as sensor_crud
+from app.models.domain.user import User
+from app.schemas.sensor_data import (
+    DeviceSensorDataBatchCreate,
+    SensorDataAggregate,
+    SensorDataBatchCreate,
+    SensorDataBatchPublic,
+    SensorDataBucketPublic,
+    SensorDataBucketsPublic,
+    SensorDataImportError,
+    SensorDataImportPublic,
+    SensorLatestReadingPublic,
+    SensorLatestReadingsPublic,
+)
+from app.services.authorization import authorize_sensor_access, forget_sensor
+from app.services.sensor_data_arrow import (
+    ArrowStreamEncoder,
+    arrow_available,
+    encode_stream,
+)
+from app.services.sensor_data_json import encode_aggregates, encode_page
+from app.services.sensor_data_export import ExportFormat, encode_rows, export_header
+from app.services.sensor_data_import import (
+    ImportFileError,
+    ImportFormat,
+    RejectedRow,
+    detect_format,
+    iter_chunks,
+)
+
+
+def _to_naive(value: datetime) -> datetime:
+    """Stored timestamps are naive local time, same as the table default."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def _decode_sort_key(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, id = decode_cursor(cursor)
+        return datetime.fromisoformat(created_at), int(id)
+    except (TypeError, ValueError):
+        raise ErrInvalidCursor
+
+
+def _encode_sort_key(row: Row) -> str:
+    return encode_cursor(row.created_at, row.id)
+
+
+def _check_bucket_range(
+    start_time: datetime, end_time: datetime, bucket_width: timedelta, sensors: int
+) -> None:
+    if end_time <= start_time or bucket_width <= timedelta(0):
+        raise ErrInvalidTimeRange
+    if (end_time - start_time) / bucket_width * sensors > settings.SENSOR_DATA_MAX_BUCKETS:
+        raise ErrTooManyBuckets(settings.SENSOR_DATA_MAX_BUCKETS)
+
+
+class SensorDataService:
+    """
+    Service layer for sensor readings.
+    Validates ownership once per request and writes readings in batches,
+    either straight to Postgres or through the Redis Streams queue.
+    """
+
+    def __init__(self, session: AsyncSession, redis_client: redis.Redis | None = None):
+        """Injects the database session and Redis client into the service instance."""
+        self.session = session
+        self.redis = redis_client
+
+    async def _check_sensor_owner(self, user: User, sensor_id: str) -> uuid.UUID:
+        return await authorize_sensor_access(self.session, user, sensor_id)
+
+    async def _check_device_owner(self, user: User, device_id: str) -> uuid.UUID:
+        device = await device_crud.get_device_by_id(
+            session=self.session, device_id=device_id
+        )
+        if not device:
+            raise ErrDeviceNotFound
+        if device.user_id != user.id:
+            raise ErrNotDeviceOwner
+
+        return device.id
+
+    async def _cache_latest(
+        self, readings: dict[uuid.UUID, latest_crud.LatestReading]
+    ) -> None:
+        """Best effort: a stale cache entry is replaced by the next reading."""
+        if self.redis is None or not readings:
+            return
+        try:
+            await latest_crud.update_latest_readings(
+                redis_client=self.redis, readings=readings
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Could not cache latest sensor readings: {e}")
+
+    async def _latest_readings(
+        self, sensor_ids: set[uuid.UUID]
+    ) -> SensorLatestReadingsPublic:
+        """
+        Newest reading of every given sensor: cached values from Redis in one
+        round trip, misses from a single DISTINCT ON query, which also refills
+        the cache.
+        """
+        cached: dict[uuid.UUID, latest_crud.LatestReading] = {}
+        if self.redis is not None and sensor_ids:
+            try:
+                cached = await latest_crud.get_latest_readings(
+                    redis_client=self.redis, sensor_ids=sensor_ids
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Could not read cached sensor readings: {e}")
+
+        missing_ids = sensor_ids - cached.keys()
+        if missing_ids:
+            stored = await sensor_data_crud.list_latest_sensor_data(
+                session=self.session, sensor_ids=missing_ids
+            )
+            fetched = {row.sensor_id: (row.data, row.created_at) for row in stored}
+            await self._cache_latest(fetched)
+            cached |= fetched
+
+        readings = []
+        for sensor_id in sorted(sensor_ids):
+            data, created_at = cached.get(sensor_id, (None, None))
+            readings.append(
+                SensorLatestReadingPublic(
+                    sensor_id=sensor_id, data=data, created_at=created_at
+                )
+            )
+        return SensorLatestReadingsPublic(data=readings, count=len(readings))
+
+    async def _store_rows(self, rows: list[dict]) -> SensorDataBatchPublic:
+        queued = settings.SENSOR_DATA_INGESTION_MODE == "stream"
+        if queued:
+            if self.redis is None:
+                raise ErrServiceUnavailable(detail="Ingestion queue is unavailable")
+            accepted = await stream_crud.append_sensor_data(
+                redis_client=self.redis, rows=rows
+            )
+        else:
+            try:
+                accepted = await sensor_data_crud.create_sensor_data_batch(
+                    session=self.session, rows=rows
+                )
+            except IntegrityError:
+                # A sensor was deleted after its ownership had been cached
+                await self.session.rollback()
+                for sensor_id in {row["sensor_id"] for row in rows}:
+                    forget_sensor(sensor_id)
+                raise ErrSensorNotFound
+            # Queued readings are cached by the worker once they are stored
+            await self._cache_latest(
+                latest_crud.newest_readings(
+                    (row["sensor_id"], row["data"], row["created_at"]) for row in rows
+                )
+            )
+
+        SENSOR_DATA_INGESTED_ROWS.labels("stream" if queued else "direct").inc(accepted)
+        timestamps = [row["created_at"] for row in rows]
+        return SensorDataBatchPublic(
+            accepted=accepted,
+            queued=queued,
+            sensor_ids=list(dict.fromkeys(row["sensor_id"] for row in rows)),
+            start_time=min(timestamps),
+            end_time=max(timestamps),
+        )
+
+    async def _list_page(
+        self,
+        list_rows: Callable[..., Awaitable[list]],
+        user: User,
+        sensor_id: str,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        reverse: bool,
+        skip: int,
+        limit: int,
+        after: str | None,
+        before: str | None,
+    ) -> tuple[list, str | None, str | None]:
+        """Fetches one page with list_rows and returns (rows, next_cursor, prev_cursor)."""
+        if after and before:
+            raise ErrInvalidCursor("Pass either 'after' or 'before', not both")
+        await self._check_sensor_owner(user, sensor_id)
+
+        rows = await list_rows(
+            session=self.session,
+            sensor_id=sensor_id,
+            start_time=_to_naive(start_time) if start_time else None,
+            end_time=_to_naive(end_time) if end_time else None,
+            reverse=reverse,
+            skip=skip,
+            # One extra row tells whether there is another page
+            limit=limit + 1,
+            after=_decode_sort_key(after) if after else None,
+            before=_decode_sort_key(before) if before else None,
+        )
+        has_more = len(rows) > limit
+        if before:
+            rows = rows[1:] if has_more else rows
+            has_next, has_prev = bool(rows), has_more
+        else:
+            rows = rows[:limit]
+            has_next, has_prev = has_more, bool(rows) and bool(after or skip)
+
+        return (
+            rows,
+            _encode_sort_key(rows[-1]) if has_next else None,
+            _encode_sort_key(rows[0]) if has_prev else None,
+        )
+
+    async def list_sensor_data_service(
+        self,
+        user: User,
+        sensor_id: str,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        reverse: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        after: str | None = None,
+        before: str | None = None,
+    ) -> bytes:
+        """
+        The page as a SensorDataPagePublic JSON body, encoded straight from
+        the selected columns without building a schema object per row.
+        """
+        rows, next_cursor, prev_cursor = await self._list_page(
+            sensor_data_crud.list_sensor_data_rows_by_sensor_id,
+            user,
+            sensor_id,
+            start_time,
+            end_time,
+            reverse,
+            skip,
+            limit,
+            after,
+            before,
+        )
+        return encode_page(rows, next_cursor, prev_cursor)
+
+    async def list_sensor_data_arrow_service(
+        self,
+        user: User,
+        sensor_id: str,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        reverse: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        after: str | None = None,
+        before: str | None = None,
+    ) -> tuple[bytes, str | None, str | None]:
+        """
+        The same page as an Arrow IPC stream built from the raw rows,
+        returned with its next and previous cursors.
+        """
+        if not arrow_available():
+            raise ErrArrowUnavailable
+        rows, next_cursor, prev_cursor = await self._list_page(
+            sensor_data_crud.list_sensor_data_rows_by_sensor_id,
+            user,
+            sensor_id,
+            start_time,
+            end_time,
+            reverse,
+            skip,
+            limit,
+            after,
+            before,
+        )
+        return encode_stream(rows), next_cursor, prev_cursor
+
+    async def _check_sensors_owner(
+        self, user: User, sensor_ids: list[uuid.UUID]
+    ) -> None:
+        """Ownership of many sensors with one query in the common case."""
+        owned_ids = await sensor_crud.list_user_sensor_ids(
+            session=self.session, user_id=user.id, sensor_ids=sensor_ids
+        )
+        missing_ids = set(sensor_ids) - owned_ids
+        if missing_ids:
+            if await sensor_crud.list_existing_sensor_ids(
+                session=self.session, sensor_ids=missing_ids
+            ):
+                raise ErrNotSensorOwner
+            raise ErrSensorNotFound
+
+    async def _aggregate(
+        self,
+        sensor_ids: list[uuid.UUID],
+        start_time: datetime,
+        end_time: datetime,
+        bucket_width: timedelta,
+        aggregates: list[str],
+    ) -> tuple[str, list[dict]]:
+        """
+        Answers from the coarsest rollup that tiles the range exactly when
+        every aggregate can be merged from rollups, from raw readings otherwise.
+        Rollups trail ingestion by up to one refresh interval.
+        """
+        source = None
+        if set(aggregates) <= rollup_crud.ROLLUP_AGGREGATES.keys():
+            source = rollup_crud.choose_rollup(start_time, end_time, bucket_width)
+
+        if source:
+            rows = await rollup_crud.list_rollup_buckets(
+                session=self.session,
+                name=source,
+                sensor_ids=sensor_ids,
+                start_time=start_time,
+                end_time=end_time,
+                bucket_width=bucket_width,
+                aggregates=aggregates,
+            )
+        else:
+            rows = await sensor_data_crud.aggregate_sensor_data(
+                session=self.session,
+                sensor_ids=sensor_ids,
+                start_time=start_time,
+                end_time=end_time,
+                bucket_width=bucket_width,
+                aggregates=aggregates,
+            )
+        return source or "raw", rows
+
+    async def list_sensor_data_buckets_service(
+        self,
+        user: User,
+        sensor_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        resolution: timedelta,
+    ) -> SensorDataBucketsPublic:
+        """Count, sum, min, max and avg of one sensor's readings per bucket."""
+        start_time, end_time = _to_naive(start_time), _to_naive(end_time)
+        _check_bucket_range(start_time, end_time, resolution, sensors=1)
+        sensor_uuid = await self._check_sensor_owner(user, sensor_id)
+
+        source, rows = await self._aggregate(
+            [sensor_uuid], start_time, end_time, resolution, ["count", "sum", "min", "max"]
+        )
+        return SensorDataBucketsPublic(
+            sensor_id=sensor_uuid,
+            resolution=resolution,
+            source=source,
+            data=[
+                SensorDataBucketPublic(
+                    bucket_start=row["bucket_start"],
+                    count=row["count"],
+                    min=row["min"],
+                    max=row["max"],
+                    avg=row["sum"] / row["count"],
+                    sum=row["sum"],
+                )
+                for row in rows
+            ],
+        )
+
+    async def aggregate_sensor_data_service(
+        self,
+        user: User,
+        sensor_ids: list[uuid.UUID],
+        start_time: datetime,
+        end_time: datetime,
+        bucket_width: timedelta,
+        aggregates: list[SensorDataAggregate],
+    ) -> bytes:
+        """
+        Requested aggregates of several sensors' readings per time bucket,
+        computed in the database so only one row per sensor and bucket is sent.
+        Returned as a SensorDataAggregatesPublic JSON body encoded from the rows.
+        """
+        sensor_ids = list(dict.fromkeys(sensor_ids))
+        if len(sensor_ids) > settings.SENSOR_DATA_MAX_AGGREGATE_SENSORS:
+            raise ErrTooManySensors(settings.SENSOR_DATA_MAX_AGGREGATE_SENSORS)
+        start_time, end_time = _to_naive(start_time), _to_naive(end_time)
+        aggregates = list(dict.fromkeys(aggregates))
+        _check_bucket_range(start_time, end_time, bucket_width, sensors=len(sensor_ids))
+        await self._check_sensors_owner(user, sensor_ids)
+
+        source, rows = await self._aggregate(
+            sensor_ids, start_time, end_time, bucket_width, aggregates
+        )
+        return encode_aggregates(
+            start_time, end_time, bucket_width, aggregates, source, rows
+        )
+
+    async def export_sensor_data_service(
+        self,
+        user: User,
+        sensor_id: str,
+        file_format: ExportFormat,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> AsyncIterator[str | bytes]:
+        """
+        Checks ownership up front and returns the export body as an async
+        iterator of CSV, NDJSON or Arrow IPC chunks, oldest reading first.
+        """
+        if file_format == "arrow" and not arrow_available():
+            raise ErrArrowUnavailable
+        await self._check_sensor_owner(user, sensor_id)
+        return self._export_chunks(
+            sensor_id,
+            file_format,
+            _to_naive(start_time) if start_time else None,
+            _to_naive(end_time) if end_time else None,
+        )
+
+    async def _export_chunks(
+        self,
+        sensor_id: str,
+        file_format: ExportFormat,
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> AsyncIterator[str | bytes]:
+        arrow_encoder = ArrowStreamEncoder() if file_format == "arrow" else None
+        header = export_header(file_format)
+        if header:
+            yield header
+        # The request session is closed before the response body is sent,
+        # so the cursor lives in a session owned by the generator
+        async with AsyncSession(self.session.bind) as session:
+            async for rows in sensor_data_crud.stream_sensor_data(
+                session=session,
+                sensor_id=sensor_id,
+                start_time=start_time,
+                end_time=end_time,
+                chunk_size=settings.SENSOR_DATA_EXPORT_CHUNK_SIZE,
+            ):
+                if arrow_encoder:
+                    yield arrow_encoder.write(rows)
+                else:
+                    yield encode_rows(rows, file_format)
+        if arrow_encoder:
+            yield arrow_encoder.close()
+
+    async def list_latest_readings_service(self, user: User) -> SensorLatestReadingsPublic:
+        """Current value of every sensor on the user's devices."""
+        sensor_ids = await sensor_crud.list_user_sensor_ids(
+            session=self.session, user_id=user.id
+        )
+        return await self._latest_readings(sensor_ids)
+
+    async def list_device_latest_readings_service(
+        self, user: User, device_id: str
+    ) -> SensorLatestReadingsPublic:
+        """Current value of every sensor of one device."""
+        device_uuid = await self._check_device_owner(user, device_id)
+        sensor_ids = await sensor_crud.list_device_sensor_ids(
+            session=self.session, device_id=device_uuid
+        )
+        return await self._latest_readings(sensor_ids)
+
+    async def create_sensor_data_batch_service(
+        self, user: User, sensor_id: str, batch_in: SensorDataBatchCreate
+    ) -> SensorDataBatchPublic:
+        sensor_uuid = await self._check_sensor_owner(user, sensor_id)
+
+        received_at = datetime.now()
+        rows = [
+            {
+                "sensor_id": sensor_uuid,
+                "data": reading.data,
+                "created_at": _to_naive(reading.created_at or received_at),
+            }
+            for reading in batch_in.readings
+        ]
+        return await self._store_rows(rows)
+
+    async def create_device_sensor_data_batch_service(
+        self, user: User, device_id: str, batch_in: DeviceSensorDataBatchCreate
+    ) -> SensorDataBatchPublic:
+        device_uuid = await self._check_device_owner(user, device_id)
+
+        requested_ids = {reading.sensor_id for reading in batch_in.readings}
+        device_sensor_ids = await sensor_crud.list_device_sensor_ids(
+            session=self.session, device_id=device_uuid, sensor_ids=requested_ids
+        )
+        unknown_ids = requested_ids - device_sensor_ids
+        if unknown_ids:
+            raise ErrSensorsNotOnDevice(sorted(str(id) for id in unknown_ids))
+
+        received_at = datetime.now()
+        rows = [
+            {
+                "sensor_id": reading.sensor_id,
+                "data": reading.data,
+                "created_at": _to_naive(reading.created_at or received_at),
+            }
+            for reading in batch_in.readings
+        ]
+        return await self._store_rows(rows)
+
+    async def _create_import_partitions(
+        self,
+        records: list[tuple[uuid.UUID, float, datetime]],
+        partitions: list[tuple[str, datetime, datetime]] | None,
+    ) -> list[tuple[str, datetime, datetime]]:
+        """
+        Creates the missing partitions for the periods the records cover, in
+        the import's transaction, so that historical readings do not pile up
+        in the default partition. Returns the partitions known afterwards.
+        """
+        if not records:
+            return partitions or []
+        if partitions is None:
+            partitions = await partition_crud.list_partitions(session=self.session)
+
+        interval = settings.SENSOR_DATA_PARTITION_INTERVAL
+        cutoff = partition_crud.retention_cutoff(
+            date.today(), settings.SENSOR_DATA_RETENTION_DAYS
+        )
+        for start, end in partition_crud.uncovered_ranges(
+            partition_crud.covering_ranges((record[2] for record in records), interval),
+            partitions,
+            cutoff,
+        ):
+            await partition_crud.create_partition(
+                session=self.session, start=start, end=end
+            )
+            partitions.append(
+                (
+                    partition_crud.partition_name(start),
+                    datetime.combine(start, datetime.min.time()),
+                    datetime.combine(end, datetime.min.time()),
+                )
+            )
+        return partitions
+
+    async def import_sensor_data_service(
+        self, user: User, file: UploadFile, file_format: ImportFormat | None = None
+    ) -> SensorDataImportPublic:
+        """
+        Loads a CSV or NDJSON file of historical readings with COPY in one
+        transaction. Ownership is checked once per distinct sensor, rows of
+        unknown or foreign sensors and unparsable rows are rejected.
+        """
+        file_format = file_format or detect_format(file.filename, file.content_type)
+        if file_format is None:
+            raise ErrUnsupportedImportFormat
+
+        started_at = time.perf_counter()
+        received_at = datetime.now()
+        owned_ids: set[uuid.UUID] = set()
+        foreign_ids: set[uuid.UUID] = set()
+        imported = 0
+        partitions: list[tuple[str, datetime, datetime]] | None = None
+        newest: dict[uuid.UUID, latest_crud.LatestReading] = {}
+        rejected: list[RejectedRow] = []
+        rejected_count = 0
+
+        def reject(rows: list[RejectedRow]) -> None:
+            nonlocal rejected_count
+            rejected_count += len(rows)
+            room = settings.SENSOR_DATA_IMPORT_MAX_REPORTED_ERRORS - len(rejected)
+            rejected.extend(rows[: max(room, 0)])
+
+        try:
+            async for rows, invalid in iter_chunks(
+                file, file_format, settings.SENSOR_DATA_IMPORT_CHUNK_SIZE
+            ):
+                reject(invalid)
+
+                unchecked_ids = {row[0] for _, row in rows} - owned_ids - foreign_ids
+                if unchecked_ids:
+                    found_ids = await sensor_crud.list_user_sensor_ids(
+                        session=self.session, user_id=user.id, sensor_ids=unchecked_ids
+                    )
+                    owned_ids |= found_ids
+                    foreign_ids |= unchecked_ids - found_ids
+
+                records = []
+                for line, (sensor_id, data, created_at) in rows:
+                    if sensor_id in owned_ids:
+                        records.append(
+                            (sensor_id, data, _to_naive(created_at or received_at))
+                        )
+                    else:
+                        reject([RejectedRow(line, f"unknown sensor {sensor_id}")])
+
+                partitions = await self._create_import_partitions(records, partitions)
+                imported += await sensor_data_crud.copy_sensor_data(
+                    session=self.session, records=records
+                )
+                latest_crud.newest_readings(records, newest)
+        except ImportFileError as e:
+            await self.session.rollback()
+            raise ErrInvalidImportFile(str(e))
+
+        await self.session.commit()
+        SENSOR_DATA_INGESTED_ROWS.labels("import").inc(imported)
+        await self._cache_latest(newest)
+
+        elapsed = time.perf_counter() - started_at
+        return SensorDataImportPublic(
+            imported=imported,
+            rejected=rejected_count,
+            errors=[SensorDataImportError(line=r.line, detail=r.detail) for r in rejected],
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(imported / elapsed, 1) if elapsed else 0.0,
+        )
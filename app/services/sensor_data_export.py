@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from collections.abc import Sequence
+from typing import Any, Literal
+
+from app.services.sensor_data_arrow import ARROW_STREAM_MEDIA_TYPE
+
+ExportFormat = Literal["csv", "ndjson", "arrow"]
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+}
+FILE_EXTENSIONS: dict[ExportFormat, str] = {
+    "csv": "csv",
+    "ndjson": "ndjson",
+    "arrow": "arrows",
+}
+# Same columns the import accepts, so an export can be loaded back as is
+COLUMNS = ("id", "sensor_id", "data", "created_at")
+
+
+def export_header(file_format: ExportFormat) -> str:
+    return ",".join(COLUMNS) + "\r\n" if file_format == "csv" else ""
+
+
+def encode_rows(rows: Sequence[Sequence[Any]], file_format: ExportFormat) -> str:
+    """
+    Encodes (id, sensor_id, data, created_at) rows into one text chunk.
+    Arrow is binary and encoded by sensor_data_arrow.ArrowStreamEncoder.
+    """
+    if file_format == "ndjson":
+        return "".join(
+            json.dumps(
+                {
+                    "id": id,
+                    "sensor_id": str(sensor_id),
+                    "data": data,
+                    "created_at": created_at.isoformat(),
+                },
+                separators=(",", ":"),
+            )
+            + "\n"
+            for id, sensor_id, data, created_at in rows
+        )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        (id, sensor_id, repr(data), created_at.isoformat())
+        for id, sensor_id, data, created_at in rows
+    )
+    return buffer.getvalue()
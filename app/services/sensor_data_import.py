@@ -0,0 +1,163 @@
+import asyncio
+import codecs
+import csv
+import io
+import json
+import math
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal
+
+from fastapi import UploadFile
+
+ImportFormat = Literal["csv", "ndjson"]
+ParsedRow = tuple[uuid.UUID, float, datetime | None]
+
+REQUIRED_COLUMNS = ("sensor_id", "data")
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class ImportFileError(ValueError):
+    """The file as a whole cannot be imported (e.g. a bad CSV header)."""
+
+
+@dataclass
+class RejectedRow:
+    line: int
+    detail: str
+
+
+def detect_format(filename: str | None, content_type: str | None) -> ImportFormat | None:
+    name = (filename or "").lower()
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if name.endswith(".csv") or media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or media_type in (
+        "application/x-ndjson",
+        "application/ndjson",
+        "application/jsonl",
+    ):
+        return "ndjson"
+    return None
+
+
+def parse_record(record: dict) -> ParsedRow:
+    """Raises KeyError for missing fields and ValueError/TypeError for bad values."""
+    sensor_id = uuid.UUID(str(record["sensor_id"]))
+    data = float(record["data"])
+    if not math.isfinite(data):
+        raise ValueError("data must be a finite number")
+    created_at = record.get("created_at")
+    return sensor_id, data, datetime.fromisoformat(created_at) if created_at else None
+
+
+async def iter_lines(file: UploadFile) -> AsyncIterator[str]:
+    """Yields decoded lines while reading the upload in fixed-size blocks."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    while block := await file.read(READ_BLOCK_SIZE):
+        buffer += decoder.decode(block)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def _parse_records(
+    records: list[tuple[int, str | dict]], file_format: ImportFormat
+) -> tuple[list[tuple[int, ParsedRow]], list[RejectedRow]]:
+    rows: list[tuple[int, ParsedRow]] = []
+    rejected: list[RejectedRow] = []
+    for line_no, record in records:
+        try:
+            if file_format == "ndjson":
+                record = json.loads(record)  # type: ignore[arg-type]
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            rows.append((line_no, parse_record(record)))
+        except KeyError as e:
+            rejected.append(RejectedRow(line_no, f"missing field {e}"))
+        except (TypeError, ValueError) as e:
+            rejected.append(RejectedRow(line_no, f"invalid value: {e}"))
+    return rows, rejected
+
+
+def _read_csv_records(
+    reader, fieldnames: list[str], count: int
+) -> list[tuple[int, str | dict]]:
+    """
+    Up to count records, each tagged with the line it starts on. A quoted
+    field may span lines, so the reader alone decides where records end.
+    """
+    records: list[tuple[int, str | dict]] = []
+    start = reader.line_num + 1
+    for values in reader:
+        if any(value.strip() for value in values):
+            records.append((start, dict(zip(fieldnames, values))))
+            if len(records) >= count:
+                break
+        start = reader.line_num + 1
+    return records
+
+
+async def _iter_csv_records(
+    file: UploadFile, chunk_size: int
+) -> AsyncIterator[list[tuple[int, str | dict]]]:
+    # Parsed from the spooled upload in a worker thread, a chunk at a time
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    try:
+        header = await asyncio.to_thread(next, reader, None)
+        if header is None:
+            raise ImportFileError("The file is empty")
+        fieldnames = [name.strip() for name in header]
+        missing = [name for name in REQUIRED_COLUMNS if name not in fieldnames]
+        if missing:
+            raise ImportFileError(f"Missing CSV columns: {', '.join(missing)}")
+
+        while records := await asyncio.to_thread(
+            _read_csv_records, reader, fieldnames, chunk_size
+        ):
+            yield records
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFileError(f"Unreadable CSV at line {reader.line_num}: {e}")
+    finally:
+        # Leaves the upload open for its owner to close
+        text.detach()
+
+
+async def _iter_ndjson_records(
+    file: UploadFile, chunk_size: int
+) -> AsyncIterator[list[tuple[int, str | dict]]]:
+    records: list[tuple[int, str | dict]] = []
+    line_no = 0
+    async for line in iter_lines(file):
+        line_no += 1
+        if not line.strip():
+            continue
+        records.append((line_no, line))
+        if len(records) >= chunk_size:
+            yield records
+            records = []
+    if records:
+        yield records
+
+
+async def iter_chunks(
+    file: UploadFile, file_format: ImportFormat, chunk_size: int
+) -> AsyncIterator[tuple[list[tuple[int, ParsedRow]], list[RejectedRow]]]:
+    """
+    Parses the upload into chunks of at most chunk_size rows, so memory use
+    does not depend on the file size. Yields (parsed rows, rejected rows),
+    every row tagged with the 1-based line number it starts on.
+    """
+    if file_format == "csv":
+        chunks = _iter_csv_records(file, chunk_size)
+    else:
+        chunks = _iter_ndjson_records(file, chunk_size)
+    async for records in chunks:
+        yield _parse_records(records, file_format)
@@ -0,0 +1,72 @@
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+import orjson
+from pydantic_core import to_jsonable_python
+
+# Readings are encoded straight from core rows to JSON bytes, skipping the
+# domain and schema objects and FastAPI's second validation pass. The output
+# matches what the response models produce: orjson writes UUIDs as strings
+# and naive datetimes in the same ISO format as pydantic.
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        # asyncpg's own UUID subclass, which orjson does not take natively
+        return str(value)
+    if isinstance(value, timedelta):
+        # ISO 8601 duration, as pydantic writes it
+        return to_jsonable_python(value)
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+def encode_page(
+    rows: Sequence[Sequence[Any]], next_cursor: str | None, prev_cursor: str | None
+) -> bytes:
+    """A SensorDataPagePublic body from (id, sensor_id, data, created_at) rows."""
+    return dumps(
+        {
+            "data": [
+                {
+                    "data": data,
+                    "sensor_id": sensor_id,
+                    "id": id,
+                    "created_at": created_at,
+                }
+                for id, sensor_id, data, created_at in rows
+            ],
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        }
+    )
+
+
+def encode_aggregates(
+    start_time: datetime,
+    end_time: datetime,
+    bucket_width: timedelta,
+    aggregates: Sequence[str],
+    source: str,
+    rows: Sequence[dict],
+) -> bytes:
+    """
+    A SensorDataAggregatesPublic body. The rows already hold only sensor_id,
+    bucket_start and the requested aggregates, as the response model would
+    with exclude_unset.
+    """
+    return dumps(
+        {
+            "start_time": start_time,
+            "end_time": end_time,
+            "bucket_width": bucket_width,
+            "aggregates": aggregates,
+            "source": source,
+            "data": rows,
+        }
+    )
@@ -1,7 +1,20 @@
+import uuid
+
+import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from app.api.exceptions.user import ErrNotEnoughPrivileges, ErrUserExists
+from app.api.exceptions.conditional import ErrNotModified
+from app.api.exceptions.pagination import ErrInvalidCursor
+from app.api.exceptions.server import ErrPasswordHashBusy
+from app.api.exceptions.user import (
+    ErrNotEnoughPrivileges,
+    ErrTooManyLoginAttempts,
+    ErrUserExists,
+    ErrUserNotFound,
+)
+from app.core.etag import etag_matches, version_etag
+from app.core.pagination import InvalidCursorError, PageParams
 from app.crud import users as user_crud
 from app.models.domain.user import User
 from app.schemas.user import (
@@ -12,28 +25,82 @@ from app.schemas.user import (
     UserUpdate,
 )
 from app.mappers.user import to_domain, to_public, to_domain_from_create
-from app.core.security import get_password_hash
+from app.core.security import PasswordHashBusyError, get_password_hash_async
+from app.services.authorization import forget_user
+from app.services.login_throttle import (
+    login_retry_after,
+    record_login_failure,
+    reset_login_failures,
+)
+from app.services.user_cache import invalidate_user
+
+
+async def _hash_password(password: str) -> str:
+    try:
+        return await get_password_hash_async(password)
+    except PasswordHashBusyError:
+        raise ErrPasswordHashBusy
 
 
 class UserService:
-    def __init__(self, session: AsyncSession):
-        """Injects the database session into the service instance."""
+    def __init__(
+        self, session: AsyncSession, redis_client: redis.Redis | None = None
+    ):
+        """Injects the database session and Redis client into the service instance."""
         self.session = session
+        self.redis = redis_client
+
+    async def authenticate_service(
+        self, email: str, password: str, client_ip: str | None
+    ) -> User | None:
+        """
+        The user with these credentials, or None. Refused with 429 while the
+        account or the client IP is over its failure limit.
+        """
+        retry_after = await login_retry_after(self.redis, email, client_ip)
+        if retry_after is not None:
+            raise ErrTooManyLoginAttempts(retry_after)
 
-    async def list_users_service(self, skip: int = 0, limit: int = 100) -> UsersPublic:
-        count = await user_crud.count_users(session=self.session)
-        if not count:
-            return UsersPublic(data=[], count=0)
+        try:
+            user_table = await user_crud.authenticate(
+                session=self.session, email=email, password=password
+            )
+        except PasswordHashBusyError:
+            raise ErrPasswordHashBusy
+
+        if not user_table:
+            await record_login_failure(self.redis, email, client_ip)
+            return None
+        await reset_login_failures(self.redis, email)
+        return to_domain(user_table)
+
+    async def list_users_service(
+        self, params: PageParams, if_none_match: str | None = None
+    ) -> tuple[UsersPublic, str]:
+        """
+        A page of users and the ETag of the listing, from a watermark read
+        before the page; ErrNotModified skips the page.
+        """
+        watermark = await user_crud.get_users_watermark(session=self.session)
+        etag = version_etag(*watermark, *params.cache_key())
+        if etag_matches(if_none_match, etag):
+            raise ErrNotModified(etag)
+
+        try:
+            page = await user_crud.list_users(session=self.session, params=params)
+        except InvalidCursorError:
+            raise ErrInvalidCursor
 
-        user_tables = await user_crud.list_users(session=self.session, skip=skip, limit=limit)
-        
         # Map Persistence -> Domain -> Schema
-        users_public = [to_public(to_domain(ut)) for ut in user_tables]
+        users_public = [to_public(to_domain(ut)) for ut in page.items]
 
-        return UsersPublic(data=users_public, count=count)
+        users = UsersPublic(
+            data=users_public, count=page.count, next_cursor=page.next_cursor
+        )
+        return users, etag
 
     async def create_user_service(self, user_in: UserCreate) -> UserPublic:
-        hashed_password = get_password_hash(user_in.password)
+        hashed_password = await _hash_password(user_in.password)
         user_table = await user_crud.create_user(
             session=self.session,
             email=user_in.email,
@@ -43,9 +110,14 @@ class UserService:
         )
         return to_public(to_domain(user_table))
 
-    async def read_user_me_service(self, user: User) -> UserPublic:
+    async def read_user_me_service(
+        self, user: User, if_none_match: str | None = None
+    ) -> tuple[UserPublic, str]:
         logger.debug(f"Reading user: {user.email}")
-        return to_public(user)
+        etag = version_etag(user.version)
+        if etag_matches(if_none_match, etag):
+            raise ErrNotModified(etag)
+        return to_public(user), etag
 
     async def update_user_me_service(self, user: User, user_in: UserUpdate) -> UserPublic:
         if user_in.is_superuser is True and not user.is_superuser:
@@ -55,7 +127,7 @@ class UserService:
         update_data = user_in.model_dump(exclude_unset=True)
         if "password" in update_data:
             password = update_data.pop("password")
-            update_data["hashed_password"] = get_password_hash(password)
+            update_data["hashed_password"] = await _hash_password(password)
 
         # We need the persistence model to update
         user_table = await user_crud.get_user_by_email(session=self.session, email=user.email)
@@ -68,8 +140,23 @@ class UserService:
             db_user=user_table, 
             update_data=update_data
         )
+        await invalidate_user(self.redis, user.id)
         return to_public(to_domain(updated_table))
 
+    async def delete_user_service(self, user_id: uuid.UUID) -> None:
+        user_table = await user_crud.get_user_by_id(session=self.session, user_id=user_id)
+        if not user_table:
+            raise ErrUserNotFound
+
+        await user_crud.delete_user(session=self.session, db_user=user_table)
+        await invalidate_user(self.redis, user_id)
+        forget_user(user_id)
+
+    async def delete_user_me_service(self, user: User) -> None:
+        if user.is_superuser:
+            raise ErrNotEnoughPrivileges("Superusers are not allowed to delete themselves")
+        await self.delete_user_service(user.id)
+
     async def register_user_service(self, user_in: UserRegister) -> UserPublic:
         user_table = await user_crud.get_user_by_email(
             session=self.session, email=user_in.email
@@ -77,7 +164,7 @@ class UserService:
         if user_table:
             raise ErrUserExists
 
-        hashed_password = get_password_hash(user_in.password)
+        hashed_password = await _hash_password(user_in.password)
         user_table = await user_crud.create_user(
             session=self.session,
             email=user_in.email,
@@ -0,0 +1,77 @@
+import dataclasses
+import json
+import uuid
+
+import redis.asyncio as redis
+from loguru import logger
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.domain.user import User
+
+# First tier, per process. Its TTL is kept short because an invalidation
+# only reaches the process that made it; other processes notice it when
+# their local entry expires and they fall through to Redis.
+_local_users: TTLCache[uuid.UUID, User] = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_LOCAL_TTL
+)
+
+
+def _key(user_id: uuid.UUID) -> str:
+    return f"{settings.USER_CACHE_PREFIX}:{user_id}"
+
+
+def _encode(user: User) -> str:
+    return json.dumps(dataclasses.asdict(user), default=str)
+
+
+def _decode(payload: str) -> User:
+    fields = json.loads(payload)
+    fields["id"] = uuid.UUID(fields["id"])
+    return User(**fields)
+
+
+async def get_cached_user(
+    redis_client: redis.Redis | None, user_id: uuid.UUID
+) -> User | None:
+    """The in-process entry, else the Redis one (copied into the process)."""
+    user = _local_users.get(user_id)
+    if user is not None or redis_client is None:
+        return user
+
+    try:
+        payload = await redis_client.get(_key(user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not read cached user: {e}")
+        return None
+    if payload is None:
+        return None
+
+    try:
+        user = _decode(payload)
+    except (KeyError, TypeError, ValueError):
+        return None
+    _local_users.set(user_id, user)
+    return user
+
+
+async def cache_user(redis_client: redis.Redis | None, user: User) -> None:
+    _local_users.set(user.id, user)
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(
+            _key(user.id), _encode(user), ex=settings.USER_CACHE_REDIS_TTL
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Could not cache user: {e}")
+
+
+async def invalidate_user(redis_client: redis.Redis | None, user_id: uuid.UUID) -> None:
+    _local_users.pop(user_id)
+    if redis_client is None:
+        return
+    try:
+        await redis_client.delete(_key(user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate cached user: {e}")
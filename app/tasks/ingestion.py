@@ -0,0 +1,184 @@
+import os
+import socket
+
+import redis.asyncio as redis
+from celery import current_app
+from loguru import logger
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.worker import run_task, worker_redis, worker_session
+from app.crud import sensor_data as sensor_data_crud
+from app.crud import sensor_data_latest as latest_crud
+from app.crud import sensor_data_stream as stream_crud
+from app.crud import sensors as sensor_crud
+from app.crud.sensor_data_stream import StreamEntry
+
+
+def _consumer_name() -> str:
+    # Resolved per call: prefork workers import this module before forking
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+async def _store_or_split(
+    session: AsyncSession,
+    client: redis.Redis,
+    shard: int,
+    batch: list[tuple[StreamEntry, dict]],
+) -> list[tuple[StreamEntry, dict]]:
+    """
+    Inserts the batch, halving it on every rejection until the offending
+    entries are isolated and dead-lettered, so a single bad reading does not
+    hold back the rest. Returns the stored entries with their rows.
+    """
+    if not batch:
+        return []
+    try:
+        await sensor_data_crud.create_sensor_data_batch(
+            session=session, rows=[row for _, row in batch]
+        )
+        return batch
+    except (IntegrityError, DataError) as e:
+        await session.rollback()
+        if len(batch) == 1:
+            await stream_crud.dead_letter_entries(
+                redis_client=client,
+                shard=shard,
+                entries=[batch[0][0]],
+                reason=f"rejected by the database: {e.orig}",
+            )
+            return []
+
+    middle = len(batch) // 2
+    return await _store_or_split(
+        session, client, shard, batch[:middle]
+    ) + await _store_or_split(session, client, shard, batch[middle:])
+
+
+async def _store_entries(
+    session: AsyncSession, client: redis.Redis, shard: int, entries: list[StreamEntry]
+) -> int:
+    valid: list[StreamEntry] = []
+    malformed: list[StreamEntry] = []
+    rows: list[dict] = []
+    for entry_id, fields in entries:
+        try:
+            rows.append(stream_crud.decode_fields(fields))
+            valid.append((entry_id, fields))
+        except (KeyError, ValueError):
+            malformed.append((entry_id, fields))
+
+    await stream_crud.dead_letter_entries(
+        redis_client=client, shard=shard, entries=malformed, reason="malformed entry"
+    )
+    if not rows:
+        return 0
+
+    batch = list(zip(valid, rows))
+    try:
+        await sensor_data_crud.create_sensor_data_batch(session=session, rows=rows)
+    except (IntegrityError, DataError):
+        # Most likely a sensor was deleted while its readings were queued
+        await session.rollback()
+        existing_ids = await sensor_crud.list_existing_sensor_ids(
+            session=session, sensor_ids={row["sensor_id"] for row in rows}
+        )
+        orphaned = [
+            entry for entry, row in batch if row["sensor_id"] not in existing_ids
+        ]
+        await stream_crud.dead_letter_entries(
+            redis_client=client, shard=shard, entries=orphaned, reason="unknown sensor"
+        )
+        batch = await _store_or_split(
+            session,
+            client,
+            shard,
+            [(entry, row) for entry, row in batch if row["sensor_id"] in existing_ids],
+        )
+        if not batch:
+            return 0
+        valid = [entry for entry, _ in batch]
+        rows = [row for _, row in batch]
+
+    try:
+        await latest_crud.update_latest_readings(
+            redis_client=client,
+            readings=latest_crud.newest_readings(
+                (row["sensor_id"], row["data"], row["created_at"]) for row in rows
+            ),
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Could not cache latest sensor readings: {e}")
+
+    await stream_crud.ack_entries(
+        redis_client=client, shard=shard, ids=[entry_id for entry_id, _ in valid]
+    )
+    return len(rows)
+
+
+async def drain_shard(shard: int) -> int:
+    """
+    Moves queued readings of one shard into Postgres in large batches.
+    Entries are acknowledged only after their INSERT has been committed,
+    so a failed batch stays pending and is retried by the next drain.
+    The shard's lock is held for the whole drain, so readings of a sensor
+    are written in order; a drain that finds it taken does nothing.
+    """
+    client = worker_redis()
+    token = await stream_crud.acquire_shard_lock(redis_client=client, shard=shard)
+    if token is None:
+        return 0
+
+    consumer = _consumer_name()
+    inserted = 0
+    try:
+        await stream_crud.ensure_consumer_group(redis_client=client, shard=shard)
+        async with worker_session() as session:
+            retry, exhausted = await stream_crud.claim_stale_entries(
+                redis_client=client,
+                shard=shard,
+                consumer=consumer,
+                count=settings.SENSOR_DATA_STREAM_BATCH_SIZE,
+            )
+            await stream_crud.dead_letter_entries(
+                redis_client=client,
+                shard=shard,
+                entries=exhausted,
+                reason="max deliveries exceeded",
+            )
+            if retry:
+                inserted += await _store_entries(session, client, shard, retry)
+
+            for _ in range(settings.SENSOR_DATA_STREAM_MAX_BATCHES):
+                if not await stream_crud.extend_shard_lock(
+                    redis_client=client, shard=shard, token=token
+                ):
+                    logger.warning(f"Lost the drain lock of shard {shard}")
+                    break
+                entries = await stream_crud.read_new_entries(
+                    redis_client=client,
+                    shard=shard,
+                    consumer=consumer,
+                    count=settings.SENSOR_DATA_STREAM_BATCH_SIZE,
+                )
+                if not entries:
+                    break
+                inserted += await _store_entries(session, client, shard, entries)
+    finally:
+        await stream_crud.release_shard_lock(
+            redis_client=client, shard=shard, token=token
+        )
+
+    if inserted:
+        logger.info(f"Stored {inserted} readings from shard {shard}")
+    return inserted
+
+
+def drain_sensor_data_stream(shard: int) -> int:
+    return run_task(drain_shard(shard))
+
+
+def drain_sensor_data_streams() -> None:
+    for shard in range(settings.SENSOR_DATA_STREAM_SHARDS):
+        current_app.send_task("tasks.drain_sensor_data_stream", args=(shard,))
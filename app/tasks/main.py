@@ -1,6 +1,9 @@
 from celery import Celery
 
 from app.core.config import settings
+from app.tasks.ingestion import drain_sensor_data_stream, drain_sensor_data_streams
+from app.tasks.partitions import maintain_sensor_data_partitions
+from app.tasks.rollups import refresh_sensor_data_rollups
 from app.tasks.utils import healthcheck
 
 celery = Celery(
@@ -9,3 +12,31 @@ celery = Celery(
 
 healthcheck_task = celery.task(healthcheck, name="tasks.check_health")
 
+drain_sensor_data_stream_task = celery.task(
+    drain_sensor_data_stream, name="tasks.drain_sensor_data_stream", ignore_result=True
+)
+drain_sensor_data_streams_task = celery.task(
+    drain_sensor_data_streams, name="tasks.drain_sensor_data_streams", ignore_result=True
+)
+maintain_sensor_data_partitions_task = celery.task(
+    maintain_sensor_data_partitions, name="tasks.maintain_sensor_data_partitions"
+)
+refresh_sensor_data_rollups_task = celery.task(
+    refresh_sensor_data_rollups, name="tasks.refresh_sensor_data_rollups", ignore_result=True
+)
+
+celery.conf.beat_schedule = {
+    "maintain-sensor-data-partitions": {
+        "task": "tasks.maintain_sensor_data_partitions",
+        "schedule": settings.SENSOR_DATA_PARTITION_MAINTENANCE_INTERVAL,
+    },
+    "refresh-sensor-data-rollups": {
+        "task": "tasks.refresh_sensor_data_rollups",
+        "schedule": settings.SENSOR_DATA_ROLLUP_INTERVAL,
+    },
+}
+if settings.SENSOR_DATA_INGESTION_MODE == "stream":
+    celery.conf.beat_schedule["drain-sensor-data-streams"] = {
+        "task": "tasks.drain_sensor_data_streams",
+        "schedule": settings.SENSOR_DATA_STREAM_DRAIN_INTERVAL,
+    }
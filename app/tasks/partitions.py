@@ -0,0 +1,70 @@
+from datetime import date
+
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core.worker import run_task, worker_session
+from app.crud import sensor_data_partitions as partition_crud
+
+
+async def maintain_partitions(today: date | None = None) -> dict[str, list[str]]:
+    """
+    Pre-creates sensordata partitions for the coming periods and for the
+    periods of rows that landed in the default partition, such as backfilled
+    readings, and retires what fell out of the retention window. Retiring a
+    partition is a catalog change instead of a DELETE over millions of rows.
+    """
+    today = today or date.today()
+    interval = settings.SENSOR_DATA_PARTITION_INTERVAL
+    cutoff = partition_crud.retention_cutoff(today, settings.SENSOR_DATA_RETENTION_DAYS)
+    created: list[str] = []
+    retired: list[str] = []
+
+    async with worker_session() as session:
+        wanted = set(
+            partition_crud.upcoming_partition_ranges(
+                today, interval, settings.SENSOR_DATA_PARTITIONS_AHEAD
+            )
+        )
+        wanted |= await partition_crud.list_default_partition_ranges(
+            session=session, interval=interval
+        )
+        for start, end in partition_crud.uncovered_ranges(
+            wanted, await partition_crud.list_partitions(session=session), cutoff
+        ):
+            name = partition_crud.partition_name(start)
+            try:
+                if await partition_crud.create_partition(
+                    session=session, start=start, end=end
+                ):
+                    created.append(name)
+                await session.commit()
+            except DBAPIError as e:
+                await session.rollback()
+                logger.warning(f"Could not create partition {name}: {e}")
+
+        if cutoff is not None:
+            for name, _, end in await partition_crud.list_partitions(session=session):
+                if end > cutoff:
+                    break
+                await partition_crud.detach_partition(session=session, name=name)
+                if settings.SENSOR_DATA_RETENTION_ACTION == "drop":
+                    await partition_crud.drop_partition(session=session, name=name)
+                await session.commit()
+                retired.append(name)
+
+            deleted = await partition_crud.delete_expired_default_rows(
+                session=session, cutoff=cutoff
+            )
+            await session.commit()
+            if deleted:
+                logger.info(f"Deleted {deleted} expired rows of the default partition")
+
+    if created or retired:
+        logger.info(f"sensordata partitions created: {created}, retired: {retired}")
+    return {"created": created, "retired": retired}
+
+
+def maintain_sensor_data_partitions() -> dict[str, list[str]]:
+    return run_task(maintain_partitions())
@@ -0,0 +1,43 @@
+from loguru import logger
+
+from app.core.config import settings
+from app.core.worker import run_task, worker_session
+from app.crud import sensor_data_rollups as rollup_crud
+
+
+async def refresh_rollups() -> int:
+    """
+    Recomputes the 1m/1h/1d rollup buckets touched by readings written since
+    the last run, late-arriving ones included. Only the dirty buckets are
+    re-aggregated, each level from the one below it.
+    Returns the number of refreshed minute buckets.
+    """
+    refreshed = 0
+    async with worker_session() as session:
+        for _ in range(settings.SENSOR_DATA_ROLLUP_MAX_BATCHES):
+            if not await rollup_crud.try_lock_refresh(session=session):
+                logger.debug("Rollups are being refreshed by another worker")
+                break
+
+            keys = await rollup_crud.claim_dirty_buckets(
+                session=session, limit=settings.SENSOR_DATA_ROLLUP_BATCH_SIZE
+            )
+            if not keys:
+                await session.commit()
+                break
+            refreshed += len(keys)
+
+            # Finest first, so coarser buckets are merged from fresh ones
+            for name, _, _, _ in reversed(rollup_crud.ROLLUPS):
+                keys = list(
+                    await rollup_crud.refresh_rollup(session=session, name=name, keys=keys)
+                )
+            await session.commit()
+
+    if refreshed:
+        logger.info(f"Refreshed rollups of {refreshed} minute buckets")
+    return refreshed
+
+
+def refresh_sensor_data_rollups() -> int:
+    return run_task(refresh_rollups())
@@ -4,7 +4,8 @@ from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlmodel import select
 
-from app.core.db import async_engine
+from app.core.db import create_engine
+from app.core.config import settings
 
 
 async def init(db_engine: AsyncEngine) -> None:
@@ -22,7 +23,11 @@ async def init(db_engine: AsyncEngine) -> None:
 
 async def main() -> None:
     logger.info("Initializing database for tests")
-    await init(db_engine=async_engine)
+    engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URL), pooled=False)
+    try:
+        await init(db_engine=engine)
+    finally:
+        await engine.dispose()
     logger.info("✅ Database initialized for tests")
 
 
@@ -0,0 +1,91 @@
+"""
+Compares the two ways a page of readings can be turned into a JSON body.
+
+    python scripts/bench_json_encoding.py --rows 100 1000 5000
+
+"models" is the former path: ORM object -> domain dataclass -> public schema,
+then FastAPI validating and serializing it again through the response model.
+"rows" is the current one: (id, sensor_id, data, created_at) core rows encoded
+straight to bytes by orjson. Database time is not included.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app.mappers.sensor_data import to_domain, to_public  # noqa: E402
+from app.models.persistence.sensor_data import SensorDataTable  # noqa: E402
+from app.schemas.sensor_data import SensorDataPagePublic  # noqa: E402
+from app.services.sensor_data_json import encode_page  # noqa: E402
+
+RESPONSE_FIELD = create_model_field(
+    "Response_list_sensor_data", SensorDataPagePublic, mode="serialization"
+)
+
+
+def _rows(count: int) -> list[tuple]:
+    sensor_id = uuid.uuid4()
+    start = datetime(2025, 1, 1)
+    return [
+        (i, sensor_id, 20 + i / 7, start + timedelta(seconds=i)) for i in range(count)
+    ]
+
+
+async def _models_path(rows: list[tuple]) -> bytes:
+    tables = [
+        SensorDataTable(id=id, sensor_id=sensor_id, data=data, created_at=created_at)
+        for id, sensor_id, data, created_at in rows
+    ]
+    page = SensorDataPagePublic(
+        data=[to_public(to_domain(table)) for table in tables], next_cursor="cursor"
+    )
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=page)
+    return JSONResponse(content).body
+
+
+def _rows_path(rows: list[tuple]) -> bytes:
+    return encode_page(rows, "cursor", None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    print(f"{'rows':>6} {'models ms':>10} {'rows ms':>9} {'speedup':>8}")
+    for count in args.rows:
+        rows = _rows(count)
+        models_body = loop.run_until_complete(_models_path(rows))
+        assert json.loads(models_body) == json.loads(_rows_path(rows))
+        number = max(1, 20_000 // count)
+        models = min(
+            timeit.repeat(
+                lambda: loop.run_until_complete(_models_path(rows)),
+                number=number,
+                repeat=args.repeat,
+            )
+        ) / number
+        fast = min(
+            timeit.repeat(lambda: _rows_path(rows), number=number, repeat=args.repeat)
+        ) / number
+        print(
+            f"{count:>6} {models * 1000:>10.3f} {fast * 1000:>9.3f} "
+            f"{models / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""
+Load test with a simulated device fleet.
+
+    python scripts/load_test.py run --devices 50 --sensors 4 --rate 1 --duration 60
+    python scripts/load_test.py compare results/before.json results/after.json
+
+`run` signs up a fleet owner and registers N devices with M sensors each
+through the API. For --duration seconds every device then posts one reading
+per sensor --rate times a second, while --dashboards clients read latest
+values, history pages, aggregates and device lists. Throughput, p50/p95/p99
+latency and error rate are reported per endpoint and written as JSON, tagged
+with the git commit, so runs on the same box can be compared.
+
+The fleet owner is deleted afterwards, which removes its devices, sensors and
+readings, unless --keep is given. Device and sensor types are taken from the
+API; if there are none, --admin-email/--admin-password create them.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+API = "/api/v1"
+PASSWORD = "load-test-password"
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    errors: int = 0
+
+    def record(self, seconds: float, status: int) -> None:
+        self.latencies.append(seconds)
+        self.statuses[status] += 1
+        if status >= 400:
+            self.errors += 1
+
+    def summary(self, duration: float) -> dict:
+        count = len(self.latencies)
+        ordered = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not count:
+                return 0.0
+            return round(ordered[min(count - 1, int(p * count))] * 1000, 2)
+
+        return {
+            "requests": count,
+            "throughput_rps": round(count / duration, 2) if duration else 0.0,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if count else 0.0,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+        }
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.readings_sent = 0
+        self.max_send_lag = 0.0
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs
+    ) -> httpx.Response | None:
+        """Sends a request and records it under name, a route template."""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.endpoints[name].record(time.perf_counter() - started, 599)
+            return None
+        seconds = time.perf_counter() - started
+        self.endpoints[name].record(seconds, response.status_code)
+        return response
+
+
+@dataclass
+class Fleet:
+    token: str
+    devices: dict[str, list[str]]  # device id -> sensor ids
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    @property
+    def sensor_ids(self) -> list[str]:
+        return [sensor_id for sensors in self.devices.values() for sensor_id in sensors]
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post(
+        f"{API}/login/access-token", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _type_id(
+    client: httpx.AsyncClient, kind: str, create: dict, admin_headers: dict | None
+) -> int:
+    response = await client.get(f"{API}/{kind}/types", params={"limit": 1})
+    response.raise_for_status()
+    types = response.json()["data"]
+    if types:
+        return types[0]["id"]
+    if admin_headers is None:
+        raise SystemExit(f"No {kind} types exist, pass --admin-email/--admin-password")
+    response = await client.post(
+        f"{API}/{kind}/types", json=create, headers=admin_headers
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def register_fleet(
+    client: httpx.AsyncClient, recorder: Recorder, args: argparse.Namespace
+) -> Fleet:
+    admin_headers = None
+    if args.admin_email:
+        admin_token = await _login(client, args.admin_email, args.admin_password)
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    device_type_id = await _type_id(
+        client, "devices", {"name": "load-test"}, admin_headers
+    )
+    sensor_type_id = await _type_id(
+        client, "sensors", {"name": "load-test", "unit": "unit"}, admin_headers
+    )
+
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post(
+        f"{API}/users/signup", json={"email": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    fleet = Fleet(token=await _login(client, email, PASSWORD), devices={})
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def register_device(index: int) -> None:
+        async with limit:
+            response = await recorder.request(
+                client, "POST /devices/", "POST", f"{API}/devices/",
+                json={
+                    "name": f"device-{index}",
+                    "type_id": device_type_id,
+                    "is_active": True,
+                },
+                headers=fleet.headers,
+            )
+        if response is None or response.status_code >= 400:
+            return
+        device_id = response.json()["id"]
+        fleet.devices[device_id] = []
+        for sensor in range(args.sensors):
+            async with limit:
+                response = await recorder.request(
+                    client, "POST /sensors/", "POST", f"{API}/sensors/",
+                    json={
+                        "name": f"sensor-{index}-{sensor}",
+                        "type_id": sensor_type_id,
+                        "device_id": device_id,
+                        "is_active": True,
+                    },
+                    headers=fleet.headers,
+                )
+            if response is not None and response.status_code < 400:
+                fleet.devices[device_id].append(response.json()["id"])
+
+    await asyncio.gather(*(register_device(index) for index in range(args.devices)))
+    return fleet
+
+
+async def run_device(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    fleet: Fleet,
+    device_id: str,
+    args: argparse.Namespace,
+    deadline: float,
+) -> None:
+    """Posts one reading per sensor on a fixed schedule, catching up when late."""
+    sensor_ids = fleet.devices[device_id]
+    if not sensor_ids:
+        return
+    interval = 1 / args.rate
+    next_send = time.perf_counter() + random.uniform(0, interval)
+    while next_send < deadline:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            recorder.max_send_lag = max(recorder.max_send_lag, -delay)
+        readings = [
+            {"sensor_id": sensor_id, "data": round(random.gauss(20, 5), 3)}
+            for sensor_id in sensor_ids
+        ]
+        response = await recorder.request(
+            client, "POST /devices/{device_id}/data", "POST",
+            f"{API}/devices/{device_id}/data",
+            json={"readings": readings},
+            headers=fleet.headers,
+        )
+        if response is not None and response.status_code < 400:
+            recorder.readings_sent += len(readings)
+        next_send += interval
+
+
+async def run_dashboard(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    fleet: Fleet,
+    args: argparse.Namespace,
+    deadline: float,
+) -> None:
+    """Cycles through the reads a dashboard makes, with a short think time."""
+    device_ids = list(fleet.devices)
+    sensor_ids = fleet.sensor_ids
+    if not sensor_ids:
+        return
+    while time.perf_counter() < deadline:
+        sensor_id = random.choice(sensor_ids)
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        reads = [
+            ("GET /sensors/data/latest", f"{API}/sensors/data/latest", {}),
+            (
+                "GET /devices/{device_id}/data/latest",
+                f"{API}/devices/{random.choice(device_ids)}/data/latest",
+                {},
+            ),
+            (
+                "GET /sensors/{sensor_id}/data",
+                f"{API}/sensors/{sensor_id}/data",
+                {"limit": 100},
+            ),
+            (
+                "GET /sensors/data/aggregate",
+                f"{API}/sensors/data/aggregate",
+                {
+                    "sensor_id": random.sample(sensor_ids, min(5, len(sensor_ids))),
+                    "start_time": (now - timedelta(hours=1)).isoformat(),
+                    "end_time": now.isoformat(),
+                    "bucket": "PT1M",
+                    "aggregate": ["avg", "min", "max"],
+                },
+            ),
+            ("GET /devices/", f"{API}/devices/", {"limit": 50}),
+        ]
+        for name, url, params in reads:
+            if time.perf_counter() >= deadline:
+                return
+            await recorder.request(
+                client, name, "GET", url, params=params, headers=fleet.headers
+            )
+            await asyncio.sleep(random.uniform(0, args.think_time))
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict) -> None:
+    print(
+        f"\n{'endpoint':45} {'req':>7} {'rps':>8} {'err%':>6} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for name, stats in results["endpoints"].items():
+        print(
+            f"{name:45} {stats['requests']:>7} {stats['throughput_rps']:>8} "
+            f"{stats['error_rate'] * 100:>6.2f} {stats['p50_ms']:>8} "
+            f"{stats['p95_ms']:>8} {stats['p99_ms']:>8}"
+        )
+    print(
+        f"\nreadings/s: {results['readings_per_second']}, "
+        f"max send lag: {results['max_send_lag_ms']} ms"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=timeout
+    ) as client:
+        setup = Recorder()
+        fleet = await register_fleet(client, setup, args)
+        print(
+            f"Registered {len(fleet.devices)} devices, "
+            f"{len(fleet.sensor_ids)} sensors"
+        )
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        try:
+            await asyncio.gather(
+                *(
+                    run_device(client, recorder, fleet, device_id, args, deadline)
+                    for device_id in fleet.devices
+                ),
+                *(
+                    run_dashboard(client, recorder, fleet, args, deadline)
+                    for _ in range(args.dashboards)
+                ),
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            if not args.keep:
+                await client.delete(f"{API}/users/me/", headers=fleet.headers)
+
+    results = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "config": {
+            key: getattr(args, key)
+            for key in (
+                "base_url", "devices", "sensors", "rate", "duration",
+                "dashboards", "think_time", "concurrency",
+            )
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "readings_per_second": round(recorder.readings_sent / elapsed, 1),
+        "max_send_lag_ms": round(recorder.max_send_lag * 1000, 1),
+        "setup": {
+            name: s.summary(elapsed) for name, s in sorted(setup.endpoints.items())
+        },
+        "endpoints": {
+            name: s.summary(elapsed) for name, s in sorted(recorder.endpoints.items())
+        },
+    }
+    print_report(results)
+
+    output = Path(args.output) if args.output else Path("results") / (
+        f"load-{datetime.now():%Y%m%d-%H%M%S}-{results['commit'] or 'unknown'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+
+def compare(args: argparse.Namespace) -> None:
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    print(f"{base.get('commit')} -> {new.get('commit')}")
+    if base["config"] != new["config"]:
+        print("Warning: the runs used different configurations")
+
+    print(
+        f"\n{'endpoint':45} {'rps':>16} {'p95 ms':>18} {'p99 ms':>18} {'err%':>12}"
+    )
+    for name in sorted(set(base["endpoints"]) | set(new["endpoints"])):
+        old_stats = base["endpoints"].get(name)
+        new_stats = new["endpoints"].get(name)
+        if old_stats is None or new_stats is None:
+            print(f"{name:45} only in {'new' if old_stats is None else 'base'} run")
+            continue
+
+        def change(key: str, scale: float = 1) -> str:
+            old, current = old_stats[key] * scale, new_stats[key] * scale
+            percent = f"{(current - old) / old * 100:+.0f}%" if old else "n/a"
+            return f"{current:.1f} ({percent})"
+
+        print(
+            f"{name:45} {change('throughput_rps'):>16} {change('p95_ms'):>18} "
+            f"{change('p99_ms'):>18} {change('error_rate', 100):>12}"
+        )
+    print(
+        f"\nreadings/s: {base['readings_per_second']} -> {new['readings_per_second']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the load test")
+    run_parser.add_argument("--base-url", default="http://localhost:8000")
+    run_parser.add_argument("--devices", type=int, default=20)
+    run_parser.add_argument("--sensors", type=int, default=4, help="Sensors per device")
+    run_parser.add_argument(
+        "--rate", type=float, default=1.0, help="Posts per device per second"
+    )
+    run_parser.add_argument("--duration", type=float, default=60.0, help="Seconds")
+    run_parser.add_argument(
+        "--dashboards", type=int, default=5, help="Concurrent readers"
+    )
+    run_parser.add_argument(
+        "--think-time", type=float, default=0.5, help="Max seconds between reads"
+    )
+    run_parser.add_argument(
+        "--concurrency", type=int, default=100, help="Max open connections"
+    )
+    run_parser.add_argument("--timeout", type=float, default=30.0)
+    run_parser.add_argument("--admin-email")
+    run_parser.add_argument("--admin-password")
+    run_parser.add_argument("--output", help="JSON results path")
+    run_parser.add_argument("--keep", action="store_true", help="Keep the fleet's data")
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        asyncio.run(run(args))
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import gzip
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import ENCODERS, CompressionMiddleware, choose_encoding
+from app.core.config import settings
+
+
+def test_negotiation():
+    assert choose_encoding(None) is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("*;q=0") is None
+    assert choose_encoding("br;q=0.5, gzip") == "gzip"
+    assert choose_encoding("*") == next(iter(ENCODERS))
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/small")
+    async def small() -> dict:
+        return {"ok": True}
+
+    @app.get("/large")
+    async def large() -> dict:
+        return {"data": list(range(settings.COMPRESSION_MIN_SIZE))}
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines():
+            for i in range(100):
+                yield f'{{"n": {i}}}\n'.encode()
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/precompressed")
+    async def precompressed() -> Response:
+        return Response(
+            gzip.compress(b'{"ok": true}'),
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    return app
+
+
+def test_threshold_and_vary():
+    client = TestClient(_app())
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+
+    large = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert int(large.headers["content-length"]) < len(large.content)
+    assert len(large.json()["data"]) == settings.COMPRESSION_MIN_SIZE
+
+    identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["vary"] == "Accept-Encoding"
+
+
+def test_streaming_round_trip():
+    response = TestClient(_app()).get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.splitlines() == [f'{{"n": {i}}}' for i in range(100)]
+
+
+def test_encoded_responses_pass_through():
+    response = TestClient(_app()).get(
+        "/precompressed", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert "vary" not in response.headers
+    assert response.json() == {"ok": True}
@@ -0,0 +1,17 @@
+from app.core.etag import etag_matches, version_etag, weak_etag
+
+
+def test_weak_comparison():
+    etag = weak_etag(b"payload")
+    assert etag.startswith('W/"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches(f'W/"other", {etag}', etag)
+    assert etag_matches("*", etag)
+
+
+def test_mismatch():
+    assert not etag_matches(None, version_etag(1))
+    assert not etag_matches("", version_etag(1))
+    assert not etag_matches(version_etag(1), version_etag(2))
+    assert version_etag(3, 7) != version_etag(3, 8)
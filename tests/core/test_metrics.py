@@ -0,0 +1,82 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core import metrics
+from app.core.metrics import MetricsMiddleware
+
+
+def _duration_count(route: str, status: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "http_request_duration_seconds_count",
+        {"method": "GET", "route": route, "status": status},
+    )
+    return value or 0.0
+
+
+def test_latency_is_recorded_per_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/things/{thing_id}")
+    async def get_thing(thing_id: int) -> dict:
+        return {"id": thing_id}
+
+    before = _duration_count("/things/{thing_id}", "200")
+    unmatched_before = _duration_count("<unmatched>", "404")
+
+    client = TestClient(app)
+    assert client.get("/things/1").status_code == 200
+    assert client.get("/things/2").status_code == 200
+    assert client.get("/nowhere").status_code == 404
+
+    assert _duration_count("/things/{thing_id}", "200") == before + 2
+    assert _duration_count("<unmatched>", "404") == unmatched_before + 1
+    assert REGISTRY.get_sample_value("http_requests_in_flight", {"method": "GET"}) == 0
+
+
+class _FakeRedis:
+    """Just the commands the queue length sharing uses."""
+
+    def __init__(self) -> None:
+        self.values: dict = {}
+
+    async def hgetall(self, key):
+        return self.values.get(key, {})
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def hset(self, key, mapping):
+        self.values[key] = {k: str(v) for k, v in mapping.items()}
+
+    def pexpire(self, key, ttl):
+        pass
+
+    async def execute(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_one_process_reads_the_broker(monkeypatch):
+    reads = []
+
+    def queue_lengths():
+        reads.append(1)
+        return {"celery": 4}
+
+    monkeypatch.setattr(metrics, "_queue_lengths", queue_lengths)
+    shared = _FakeRedis()
+
+    assert await metrics._shared_queue_lengths(shared) == {"celery": 4}
+    # Other API processes get the lengths from Redis
+    assert await metrics._shared_queue_lengths(shared) == {"celery": 4}
+    assert await metrics._shared_queue_lengths(shared) == {"celery": 4}
+    assert len(reads) == 1
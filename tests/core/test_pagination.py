@@ -0,0 +1,18 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2025, 10, 8, 17, 38, 16, 922151)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == [created_at.isoformat(), 42]
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor()[:-1] + "!"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
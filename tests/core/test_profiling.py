@@ -0,0 +1,41 @@
+from sqlalchemy import create_engine, text
+
+from app.core import profiling
+from app.core.profiling import install_query_hooks, profile_queries, statement_shape
+
+
+def test_statement_shape_collapses_bind_lists():
+    assert statement_shape("SELECT 1 WHERE id IN ($1::UUID, $2::UUID)") == (
+        statement_shape("SELECT 1\n WHERE id IN ($1::UUID, $2::UUID, $3::UUID)")
+    )
+    assert statement_shape("INSERT INTO t VALUES ($1), ($2)") == (
+        statement_shape("INSERT INTO t VALUES ($1), ($2), ($3)")
+    )
+
+
+def test_profile_counts_repeated_statements():
+    install_query_hooks()
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 0"))
+        with profile_queries() as profile:
+            for i in range(3):
+                connection.execute(text("SELECT :i"), {"i": i})
+            connection.execute(text("SELECT 2"))
+
+    assert profile.count == 4
+    assert profile.repeated(2) == {"SELECT ?": 3}
+    assert len(profile.slowest) <= 3
+
+
+def test_nested_profiles_share_one_shape(monkeypatch):
+    shapes = []
+    monkeypatch.setattr(
+        profiling, "statement_shape", lambda statement: shapes.append(statement) or statement
+    )
+    with profile_queries() as outer, profile_queries() as inner:
+        inner.record("SELECT 1", 0.001)
+
+    assert shapes == ["SELECT 1"]
+    assert outer.count == inner.count == 1
+    assert outer.shapes == inner.shapes
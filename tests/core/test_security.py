@@ -0,0 +1,32 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import security
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_rejects_beyond_max_pending(monkeypatch):
+    monkeypatch.setattr(security.settings, "PASSWORD_HASH_MAX_PENDING", 1)
+    release = threading.Event()
+    before = security.password_hash_stats()
+
+    running = asyncio.create_task(security._run_in_hash_pool(release.wait, 5))
+    await asyncio.sleep(0)
+    with pytest.raises(security.PasswordHashBusyError):
+        await security._run_in_hash_pool(lambda: None)
+
+    release.set()
+    assert await running is True
+    stats = security.password_hash_stats()
+    assert stats.pending == 0
+    assert stats.rejected == before.rejected + 1
+    assert stats.completed == before.completed + 1
+
+
+@pytest.mark.asyncio
+async def test_password_roundtrip_off_the_event_loop():
+    hashed = await security.get_password_hash_async("secret")
+    assert await security.verify_password_async("secret", hashed)
+    assert not await security.verify_password_async("wrong", hashed)
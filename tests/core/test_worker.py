@@ -0,0 +1,12 @@
+import asyncio
+
+from app.core import worker
+
+
+def test_tasks_share_one_event_loop():
+    async def current_loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    first = worker.run_task(current_loop())
+    assert worker.run_task(current_loop()) is first
+    assert not first.is_closed()
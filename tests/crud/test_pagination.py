@@ -0,0 +1,25 @@
+import uuid
+
+import pytest
+
+from app.core.pagination import InvalidCursorError, encode_cursor
+from app.crud.pagination import _decode_key
+from app.models.persistence.device import DeviceTable, DeviceTypeTable
+
+
+def test_cursor_key_is_typed_by_column():
+    device_id = uuid.uuid4()
+    cursor = encode_cursor("kitchen", device_id)
+    assert _decode_key(cursor, (DeviceTable.name, DeviceTable.id)) == (
+        "kitchen",
+        device_id,
+    )
+    assert _decode_key(encode_cursor(7), (DeviceTypeTable.id,)) == (7,)
+
+
+@pytest.mark.parametrize(
+    "cursor", [encode_cursor("kitchen"), encode_cursor("kitchen", "not-a-uuid")]
+)
+def test_cursor_of_another_listing(cursor):
+    with pytest.raises(InvalidCursorError):
+        _decode_key(cursor, (DeviceTable.name, DeviceTable.id))
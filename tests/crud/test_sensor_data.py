@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.crud import sensor_data as sensor_data_crud
+
+START = datetime(2024, 3, 5)
+
+
+@pytest.mark.asyncio
+async def test_first_and_last_per_bucket(db_session, owned_sensor):
+    readings = [
+        (START + timedelta(minutes=1), 4.0),
+        (START + timedelta(minutes=3), 2.0),
+        # Same timestamp: the later id is the last reading
+        (START + timedelta(minutes=9), 7.0),
+        (START + timedelta(minutes=9), 8.0),
+        (START + timedelta(minutes=12), 5.0),
+        # Past end_time, must not leak into the last bucket
+        (START + timedelta(minutes=16), 9.0),
+    ]
+    for created_at, data in readings:
+        await sensor_data_crud.create_sensor_data_batch(
+            session=db_session,
+            rows=[
+                {
+                    "sensor_id": owned_sensor.sensor_id,
+                    "data": data,
+                    "created_at": created_at,
+                }
+            ],
+        )
+
+    rows = await sensor_data_crud.aggregate_sensor_data(
+        session=db_session,
+        sensor_ids=[owned_sensor.sensor_id],
+        start_time=START,
+        end_time=START + timedelta(minutes=15),
+        bucket_width=timedelta(minutes=10),
+        aggregates=["last", "count", "first"],
+    )
+
+    assert [list(row) for row in rows] == [
+        ["sensor_id", "bucket_start", "last", "count", "first"]
+    ] * 2
+    assert [(row["first"], row["last"], row["count"]) for row in rows] == [
+        (4.0, 8.0, 4),
+        (5.0, 5.0, 1),
+    ]
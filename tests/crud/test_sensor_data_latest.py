@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+
+from app.crud.sensor_data_latest import newest_readings
+
+
+def test_newest_reading_per_sensor():
+    first, second = uuid.uuid4(), uuid.uuid4()
+    readings = [
+        (first, 1.0, datetime(2025, 10, 8, 12, 0)),
+        (first, 3.0, datetime(2025, 10, 8, 12, 2)),
+        (first, 2.0, datetime(2025, 10, 8, 12, 1)),
+        (second, 5.0, datetime(2025, 10, 8, 11, 0)),
+    ]
+    assert newest_readings(readings) == {
+        first: (3.0, datetime(2025, 10, 8, 12, 2)),
+        second: (5.0, datetime(2025, 10, 8, 11, 0)),
+    }
+
+
+def test_newest_readings_accumulate_across_chunks():
+    sensor_id = uuid.uuid4()
+    newest = newest_readings([(sensor_id, 2.0, datetime(2025, 10, 8, 12, 1))])
+    newest_readings([(sensor_id, 1.0, datetime(2025, 10, 8, 12, 0))], newest)
+    assert newest == {sensor_id: (2.0, datetime(2025, 10, 8, 12, 1))}
@@ -0,0 +1,119 @@
+import io
+from datetime import date, datetime
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import text
+
+from app.crud import sensor_data as sensor_data_crud
+from app.crud import sensor_data_partitions as partition_crud
+from app.services.sensor_data import SensorDataService
+
+DEFAULT = partition_crud.DEFAULT_PARTITION
+
+
+def test_monthly_ranges_cross_year_boundary():
+    ranges = partition_crud.partition_ranges(date(2025, 11, 17), date(2026, 1, 2), "month")
+    assert ranges == [
+        (date(2025, 11, 1), date(2025, 12, 1)),
+        (date(2025, 12, 1), date(2026, 1, 1)),
+        (date(2026, 1, 1), date(2026, 2, 1)),
+    ]
+
+
+def test_upcoming_daily_ranges():
+    ranges = partition_crud.upcoming_partition_ranges(date(2024, 2, 28), "day", 2)
+    assert ranges == [
+        (date(2024, 2, 28), date(2024, 2, 29)),
+        (date(2024, 2, 29), date(2024, 3, 1)),
+        (date(2024, 3, 1), date(2024, 3, 2)),
+    ]
+
+
+def test_create_partition_sql():
+    sql = partition_crud.create_partition_sql(date(2025, 10, 1), date(2025, 11, 1))
+    assert sql == (
+        "CREATE TABLE IF NOT EXISTS sensordata_p20251001 PARTITION OF sensordata "
+        "FOR VALUES FROM ('2025-10-01') TO ('2025-11-01')"
+    )
+
+
+def test_uncovered_ranges_skip_existing_and_expired():
+    partitions = [
+        ("sensordata_p20251001", datetime(2025, 10, 1), datetime(2025, 11, 1))
+    ]
+    ranges = {
+        (date(2025, 9, 1), date(2025, 10, 1)),
+        (date(2025, 10, 1), date(2025, 11, 1)),
+        (date(2025, 10, 5), date(2025, 10, 6)),
+        (date(2025, 11, 1), date(2025, 12, 1)),
+    }
+    assert partition_crud.uncovered_ranges(ranges, partitions) == [
+        (date(2025, 9, 1), date(2025, 10, 1)),
+        (date(2025, 11, 1), date(2025, 12, 1)),
+    ]
+    assert partition_crud.uncovered_ranges(
+        ranges, partitions, cutoff=datetime(2025, 10, 15)
+    ) == [(date(2025, 11, 1), date(2025, 12, 1))]
+
+
+async def _count(session, table: str, sensor_id) -> int:
+    result = await session.execute(
+        text(f"SELECT count(*) FROM {table} WHERE sensor_id = :id"), {"id": sensor_id}
+    )
+    return result.scalar()
+
+
+@pytest.mark.asyncio
+async def test_partition_takes_over_default_rows(db_session, owned_sensor):
+    await sensor_data_crud.create_sensor_data_batch(
+        session=db_session,
+        rows=[
+            {"sensor_id": owned_sensor.sensor_id, "data": 1.0, "created_at": ts}
+            for ts in (datetime(2019, 7, 1), datetime(2019, 7, 31, 23, 59))
+        ],
+    )
+    assert await _count(db_session, DEFAULT, owned_sensor.sensor_id) == 2
+
+    created = await partition_crud.create_partition(
+        session=db_session, start=date(2019, 7, 1), end=date(2019, 8, 1)
+    )
+    assert created
+    assert await _count(db_session, "sensordata_p20190701", owned_sensor.sensor_id) == 2
+    assert await _count(db_session, DEFAULT, owned_sensor.sensor_id) == 0
+    assert not await partition_crud.create_partition(
+        session=db_session, start=date(2019, 7, 1), end=date(2019, 8, 1)
+    )
+
+
+@pytest.mark.asyncio
+async def test_backfill_older_than_first_partition(db_session, owned_sensor):
+    content = "sensor_id,data,created_at\n" + "".join(
+        f"{owned_sensor.sensor_id},{i},{ts}\n"
+        for i, ts in enumerate(["2019-03-10T08:00:00", "2019-04-02T09:30:00"])
+    )
+    upload = UploadFile(io.BytesIO(content.encode()), filename="history.csv")
+    report = await SensorDataService(db_session).import_sensor_data_service(
+        owned_sensor.user, upload
+    )
+
+    assert report.imported == 2
+    partitions = await partition_crud.list_partitions(session=db_session)
+    names = {name for name, _, _ in partitions}
+    assert {"sensordata_p20190301", "sensordata_p20190401"} <= names
+    assert await _count(db_session, DEFAULT, owned_sensor.sensor_id) == 0
+
+
+@pytest.mark.asyncio
+async def test_retention_reaches_default_partition(db_session, owned_sensor):
+    await sensor_data_crud.create_sensor_data_batch(
+        session=db_session,
+        rows=[
+            {"sensor_id": owned_sensor.sensor_id, "data": 1.0, "created_at": ts}
+            for ts in (datetime(2018, 1, 5), datetime(2018, 3, 5))
+        ],
+    )
+    await partition_crud.delete_expired_default_rows(
+        session=db_session, cutoff=datetime(2018, 2, 1)
+    )
+    assert await _count(db_session, DEFAULT, owned_sensor.sensor_id) == 1
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+from typing import get_args
+
+from app.crud.sensor_data import AGGREGATES, EDGE_AGGREGATES
+from app.crud.sensor_data_rollups import ROLLUP_AGGREGATES, choose_rollup, truncate
+from app.schemas.sensor_data import SensorDataAggregate
+
+
+def test_truncate():
+    value = datetime(2025, 10, 8, 17, 38, 16, 922151)
+    assert truncate(value, "minute") == datetime(2025, 10, 8, 17, 38)
+    assert truncate(value, "hour") == datetime(2025, 10, 8, 17)
+    assert truncate(value, "day") == datetime(2025, 10, 8)
+
+
+def test_choose_coarsest_rollup():
+    day = datetime(2025, 10, 1)
+    assert choose_rollup(day, day + timedelta(days=30), timedelta(days=7)) == "1d"
+    assert choose_rollup(day, day + timedelta(days=1), timedelta(hours=6)) == "1h"
+    # Unaligned range start rules out the daily rollup
+    start = day + timedelta(hours=3)
+    assert choose_rollup(start, start + timedelta(days=2), timedelta(days=1)) == "1h"
+    assert choose_rollup(day, day + timedelta(hours=1), timedelta(minutes=5)) == "1m"
+
+
+def test_raw_fallback():
+    day = datetime(2025, 10, 1)
+    assert choose_rollup(day, day + timedelta(minutes=5), timedelta(seconds=10)) is None
+    assert choose_rollup(day, day + timedelta(seconds=90), timedelta(minutes=1)) is None
+
+
+def test_every_aggregate_has_an_expression():
+    assert set(AGGREGATES) | set(EDGE_AGGREGATES) == set(get_args(SensorDataAggregate))
+    assert set(ROLLUP_AGGREGATES) <= set(AGGREGATES)
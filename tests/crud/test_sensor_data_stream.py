@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.crud import sensor_data_stream as stream_crud
+
+
+def test_encode_decode_roundtrip():
+    row = {
+        "sensor_id": uuid.uuid4(),
+        "data": 21.375,
+        "created_at": datetime(2025, 10, 8, 17, 38, 16, 922151),
+    }
+    assert stream_crud.decode_fields(stream_crud.encode_row(row)) == row
+
+
+def test_decode_malformed_entry():
+    with pytest.raises(ValueError):
+        stream_crud.decode_fields(
+            {"sensor_id": "not-a-uuid", "data": "1.0", "created_at": "2025-10-08"}
+        )
+    with pytest.raises(KeyError):
+        stream_crud.decode_fields({"data": "1.0"})
+
+
+def test_sensor_is_pinned_to_one_shard():
+    sensor_id = uuid.uuid4()
+    shard = stream_crud.shard_for_sensor(sensor_id)
+    assert 0 <= shard < settings.SENSOR_DATA_STREAM_SHARDS
+    assert stream_crud.shard_for_sensor(uuid.UUID(str(sensor_id))) == shard
+    assert stream_crud.stream_key(shard).startswith(settings.SENSOR_DATA_STREAM_PREFIX)
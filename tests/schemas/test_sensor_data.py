@@ -0,0 +1,27 @@
+import uuid
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.sensor_data import (
+    DeviceSensorDataBatchCreate,
+    SensorDataBatchCreate,
+    SensorDataCreate,
+)
+
+
+@pytest.mark.parametrize("value", ["NaN", "Infinity", "-Infinity"])
+def test_readings_must_be_finite(value):
+    with pytest.raises(ValidationError):
+        SensorDataBatchCreate.model_validate_json(f'{{"readings": [{{"data": {value}}}]}}')
+    with pytest.raises(ValidationError):
+        DeviceSensorDataBatchCreate.model_validate(
+            {"readings": [{"sensor_id": str(uuid.uuid4()), "data": value}]}
+        )
+    with pytest.raises(ValidationError):
+        SensorDataCreate(sensor_id=uuid.uuid4(), data=float(value.lower()))
+
+
+def test_finite_readings_pass():
+    batch = SensorDataBatchCreate.model_validate({"readings": [{"data": -1.5e300}]})
+    assert batch.readings[0].data == -1.5e300
@@ -0,0 +1,31 @@
+import pytest
+
+from app.api.exceptions.conditional import ErrNotModified
+from app.core.pagination import Page, PageParams, encode_cursor
+from app.crud import users as user_crud
+from app.services.user import UserService
+
+
+@pytest.mark.asyncio
+async def test_listing_etag_covers_page_params(monkeypatch):
+    async def watermark(**kwargs):
+        return 3, 7
+
+    async def list_users(**kwargs):
+        return Page(items=[], count=3, next_cursor=None)
+
+    monkeypatch.setattr(user_crud, "get_users_watermark", watermark)
+    monkeypatch.setattr(user_crud, "list_users", list_users)
+    service = UserService(None)
+
+    _, etag = await service.list_users_service(PageParams(limit=2))
+    with pytest.raises(ErrNotModified):
+        await service.list_users_service(PageParams(limit=2), if_none_match=etag)
+
+    for params in (
+        PageParams(limit=3),
+        PageParams(limit=2, after=encode_cursor("a@example.com", 1)),
+        PageParams(limit=2, with_count=False),
+    ):
+        _, other = await service.list_users_service(params, if_none_match=etag)
+        assert other != etag
@@ -0,0 +1,29 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.services.sensor_data_arrow import ArrowStreamEncoder, encode_stream
+
+pa = pytest.importorskip("pyarrow")
+
+SENSOR_ID = uuid.uuid4()
+ROWS = [
+    (1, SENSOR_ID, 21.375, datetime(2025, 10, 8, 17, 38, 16, 922151)),
+    (2, SENSOR_ID, -0.1, datetime(2025, 10, 8, 17, 38, 17)),
+]
+
+
+def test_encode_stream_columns():
+    table = pa.ipc.open_stream(encode_stream(ROWS)).read_all()
+    assert table.column_names == ["id", "sensor_id", "data", "created_at"]
+    assert table.column("sensor_id").to_pylist() == [str(SENSOR_ID)] * 2
+    assert table.column("data").to_pylist() == [21.375, -0.1]
+    assert table.column("created_at").to_pylist() == [row[3] for row in ROWS]
+
+
+def test_chunked_stream_is_one_table():
+    encoder = ArrowStreamEncoder()
+    body = encoder.write(ROWS) + encoder.write([]) + encoder.write(ROWS[:1])
+    body += encoder.close()
+    assert pa.ipc.open_stream(body).read_all().column("id").to_pylist() == [1, 2, 1]
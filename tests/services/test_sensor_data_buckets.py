@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.crud import sensor_data as sensor_data_crud
+from app.crud import sensor_data_rollups as rollup_crud
+from app.services.sensor_data import SensorDataService
+
+DAY = datetime(2024, 3, 5)
+
+
+@pytest.mark.asyncio
+async def test_buckets_from_refreshed_rollups(db_session, owned_sensor):
+    readings = [
+        (DAY + timedelta(minutes=1, seconds=5), 1.0),
+        (DAY + timedelta(minutes=1, seconds=40), 2.0),
+        (DAY + timedelta(minutes=30), 6.0),
+        (DAY + timedelta(hours=2, minutes=15), 10.0),
+    ]
+    await sensor_data_crud.create_sensor_data_batch(
+        session=db_session,
+        rows=[
+            {"sensor_id": owned_sensor.sensor_id, "data": data, "created_at": ts}
+            for ts, data in readings
+        ],
+    )
+    keys = [(owned_sensor.sensor_id, ts) for ts, _ in readings]
+    for name, _, _, _ in reversed(rollup_crud.ROLLUPS):
+        keys = list(
+            await rollup_crud.refresh_rollup(session=db_session, name=name, keys=keys)
+        )
+
+    service = SensorDataService(db_session)
+    hourly = await service.list_sensor_data_buckets_service(
+        owned_sensor.user,
+        str(owned_sensor.sensor_id),
+        DAY,
+        DAY + timedelta(days=1),
+        timedelta(hours=1),
+    )
+    assert hourly.source == "1h"
+    assert [(b.bucket_start, b.count, b.sum, b.avg) for b in hourly.data] == [
+        (DAY, 3, 9.0, 3.0),
+        (DAY + timedelta(hours=2), 1, 10.0, 10.0),
+    ]
+
+    daily = await service.list_sensor_data_buckets_service(
+        owned_sensor.user,
+        str(owned_sensor.sensor_id),
+        DAY,
+        DAY + timedelta(days=1),
+        timedelta(days=1),
+    )
+    assert daily.source == "1d"
+    [bucket] = daily.data
+    assert (bucket.count, bucket.min, bucket.max, bucket.avg) == (4, 1.0, 10.0, 4.75)
+
+    rows = await rollup_crud.list_rollup_buckets(
+        session=db_session,
+        name="1m",
+        sensor_ids=[owned_sensor.sensor_id],
+        start_time=DAY,
+        end_time=DAY + timedelta(hours=1),
+        bucket_width=timedelta(hours=1),
+        aggregates=["count", "avg"],
+    )
+    assert rows[0]["count"] == 3 and type(rows[0]["count"]) is int
+    assert rows[0]["avg"] == 3.0
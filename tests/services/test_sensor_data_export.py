@@ -0,0 +1,39 @@
+import io
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.sensor_data_export import encode_rows, export_header
+from app.services.sensor_data_import import iter_chunks
+
+SENSOR_ID = uuid.uuid4()
+ROWS = [
+    (1, SENSOR_ID, 21.375, datetime(2025, 10, 8, 17, 38, 16, 922151)),
+    (2, SENSOR_ID, -0.1, datetime(2025, 10, 8, 17, 38, 17)),
+]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_can_be_imported_back():
+    content = (export_header("csv") + encode_rows(ROWS, "csv")).encode()
+    upload = UploadFile(io.BytesIO(content), filename="export.csv")
+    [(rows, rejected)] = [chunk async for chunk in iter_chunks(upload, "csv", 100)]
+    assert rejected == []
+    assert [row for _, row in rows] == [
+        (sensor_id, data, created_at) for _, sensor_id, data, created_at in ROWS
+    ]
+
+
+def test_ndjson_export():
+    lines = encode_rows(ROWS, "ndjson").splitlines()
+    assert export_header("ndjson") == ""
+    assert json.loads(lines[0]) == {
+        "id": 1,
+        "sensor_id": str(SENSOR_ID),
+        "data": 21.375,
+        "created_at": "2025-10-08T17:38:16.922151",
+    }
+    assert len(lines) == 2
@@ -0,0 +1,79 @@
+import io
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.sensor_data_import import (
+    ImportFileError,
+    detect_format,
+    iter_chunks,
+)
+
+
+def make_upload(content: str, filename: str) -> UploadFile:
+    return UploadFile(io.BytesIO(content.encode()), filename=filename)
+
+
+def test_detect_format():
+    assert detect_format("history.CSV", None) == "csv"
+    assert detect_format("history.jsonl", None) == "ndjson"
+    assert detect_format(None, "application/x-ndjson; charset=utf-8") == "ndjson"
+    assert detect_format("history.xlsx", "application/octet-stream") is None
+
+
+@pytest.mark.asyncio
+async def test_csv_chunks_and_rejections():
+    sensor_id = uuid.uuid4()
+    content = "sensor_id,data,created_at\n" + "".join(
+        f"{sensor_id},{i}.5,2025-01-01T00:00:0{i}\n" for i in range(5)
+    ) + "\nnot-a-uuid,1.0,\n"
+    chunks = [c async for c in iter_chunks(make_upload(content, "a.csv"), "csv", 2)]
+
+    assert [len(rows) for rows, _ in chunks] == [2, 2, 1]
+    line, (parsed_id, data, created_at) = chunks[0][0][1]
+    assert (line, parsed_id, data) == (3, sensor_id, 1.5)
+    assert created_at == datetime(2025, 1, 1, 0, 0, 1)
+    assert [r.line for r in chunks[-1][1]] == [8]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_rejections():
+    sensor_id = uuid.uuid4()
+    content = (
+        f'{{"sensor_id": "{sensor_id}", "data": 3}}\n'
+        '{"sensor_id": "x"\n'
+        f'{{"sensor_id": "{sensor_id}"}}\n'
+        "[1, 2]"
+    )
+    chunks = [c async for c in iter_chunks(make_upload(content, "a.ndjson"), "ndjson", 100)]
+
+    rows, rejected = chunks[0]
+    assert rows == [(1, (sensor_id, 3.0, None))]
+    assert [r.line for r in rejected] == [2, 3, 4]
+    assert "missing field" in rejected[1].detail
+
+
+@pytest.mark.asyncio
+async def test_csv_without_required_columns():
+    with pytest.raises(ImportFileError):
+        async for _ in iter_chunks(make_upload("sensor,value\n", "a.csv"), "csv", 10):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_csv_quoted_newlines_keep_line_numbers():
+    sensor_id = uuid.uuid4()
+    content = (
+        "sensor_id,note,data\n"
+        f'{sensor_id},"two\nlines",1\n'
+        f"{sensor_id},plain,2\n"
+        f'{sensor_id},"three\n\nlines",3\n'
+        "not-a-uuid,plain,4\n"
+    )
+    chunks = [c async for c in iter_chunks(make_upload(content, "a.csv"), "csv", 2)]
+
+    rows = [row for rows, _ in chunks for row in rows]
+    assert [(line, data) for line, (_, data, _) in rows] == [(2, 1.0), (4, 2.0), (5, 3.0)]
+    assert [r.line for _, rejected in chunks for r in rejected] == [8]
@@ -0,0 +1,60 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from app.schemas.sensor_data import (
+    SensorDataAggregatePublic,
+    SensorDataAggregatesPublic,
+    SensorDataPagePublic,
+    SensorDataPublic,
+)
+from app.services.sensor_data_json import encode_aggregates, encode_page
+
+
+class DriverUUID(uuid.UUID):
+    """Stands in for the UUID subclass asyncpg returns."""
+
+
+SENSOR_ID = DriverUUID(str(uuid.uuid4()))
+ROWS = [
+    (1, SENSOR_ID, 21.375, datetime(2025, 10, 8, 17, 38, 16, 922151)),
+    (2, SENSOR_ID, -0.1, datetime(2025, 10, 8, 17, 38, 17)),
+    (3, SENSOR_ID, 1e-07, datetime(2025, 10, 8, 17, 38, 18)),
+]
+
+
+def test_page_matches_response_model():
+    page = SensorDataPagePublic(
+        data=[
+            SensorDataPublic(id=id, sensor_id=sensor_id, data=data, created_at=created_at)
+            for id, sensor_id, data, created_at in ROWS
+        ],
+        next_cursor="next",
+    )
+    assert encode_page(ROWS, "next", None) == page.model_dump_json().encode()
+
+
+def test_aggregates_match_response_model():
+    start = datetime(2025, 10, 8)
+    rows = [
+        {"sensor_id": SENSOR_ID, "bucket_start": start, "count": 3, "avg": 2.5},
+        {
+            "sensor_id": SENSOR_ID,
+            "bucket_start": start + timedelta(minutes=10),
+            "count": 1,
+            "avg": 0.5,
+        },
+    ]
+    aggregates = SensorDataAggregatesPublic(
+        start_time=start,
+        end_time=start + timedelta(hours=1),
+        bucket_width=timedelta(minutes=10),
+        aggregates=["count", "avg"],
+        source="raw",
+        data=[SensorDataAggregatePublic(**row) for row in rows],
+    )
+    body = encode_aggregates(
+        start, start + timedelta(hours=1), timedelta(minutes=10), ["count", "avg"], "raw", rows
+    )
+    # Aggregates follow the requested order rather than the model's
+    assert json.loads(body) == json.loads(aggregates.model_dump_json(exclude_unset=True))
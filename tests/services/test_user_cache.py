@@ -0,0 +1,23 @@
+import uuid
+
+import pytest
+
+from app.models.domain.user import User
+from app.services import user_cache
+
+
+@pytest.mark.asyncio
+async def test_local_tier_without_redis():
+    user = User(id=uuid.uuid4(), email="a@example.com", is_superuser=False, full_name=None)
+    assert await user_cache.get_cached_user(None, user.id) is None
+
+    await user_cache.cache_user(None, user)
+    assert await user_cache.get_cached_user(None, user.id) == user
+
+    await user_cache.invalidate_user(None, user.id)
+    assert await user_cache.get_cached_user(None, user.id) is None
+
+
+def test_redis_payload_roundtrip():
+    user = User(id=uuid.uuid4(), email="a@example.com", is_superuser=True, full_name="A")
+    assert user_cache._decode(user_cache._encode(user)) == user
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.crud import sensor_data_latest as latest_crud
+from app.crud import sensor_data_stream as stream_crud
+from app.tasks import ingestion
+
+
+@pytest.mark.asyncio
+async def test_drain_skips_a_locked_shard(monkeypatch):
+    calls = []
+
+    async def locked(**kwargs):
+        return None
+
+    async def record(**kwargs):
+        calls.append(kwargs)
+
+    monkeypatch.setattr(ingestion, "worker_redis", lambda: None)
+    monkeypatch.setattr(stream_crud, "acquire_shard_lock", locked)
+    monkeypatch.setattr(stream_crud, "ensure_consumer_group", record)
+    monkeypatch.setattr(stream_crud, "release_shard_lock", record)
+
+    assert await ingestion.drain_shard(3) == 0
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_only_rejected_entries_are_dead_lettered(
+    monkeypatch, db_session, owned_sensor
+):
+    dead_lettered, acked = [], []
+
+    async def dead_letter(*, entries, reason, **kwargs):
+        dead_lettered.extend((entry_id, reason) for entry_id, _ in entries)
+
+    async def ack(*, ids, **kwargs):
+        acked.extend(ids)
+
+    async def update_latest(**kwargs):
+        pass
+
+    monkeypatch.setattr(stream_crud, "dead_letter_entries", dead_letter)
+    monkeypatch.setattr(stream_crud, "ack_entries", ack)
+    monkeypatch.setattr(latest_crud, "update_latest_readings", update_latest)
+
+    # A constraint other than the sensor foreign key
+    await db_session.execute(
+        text("ALTER TABLE sensordata ADD CONSTRAINT test_data_range CHECK (data < 100)")
+    )
+    await db_session.commit()
+
+    entries = [
+        (
+            f"1-{i}",
+            {
+                "sensor_id": str(owned_sensor.sensor_id),
+                "data": str(1000 if i == 5 else i),
+                "created_at": datetime(2024, 3, 5, 0, i).isoformat(),
+            },
+        )
+        for i in range(8)
+    ]
+    stored = await ingestion._store_entries(db_session, None, 0, entries)
+
+    assert stored == 7
+    assert [entry_id for entry_id, _ in dead_lettered] == ["1-5"]
+    assert "test_data_range" in dead_lettered[0][1]
+    assert sorted(acked) == sorted(f"1-{i}" for i in range(8) if i != 5)
+    count = await db_session.execute(
+        text("SELECT count(*) FROM sensordata WHERE sensor_id = :id"),
+        {"id": owned_sensor.sensor_id},
+    )
+    assert count.scalar() == 7